@@ -1,13 +1,27 @@
-from fastapi import APIRouter, Depends
+from fastapi import APIRouter, Depends, HTTPException
 from sqlalchemy.orm import Session
-from datetime import date
-from typing import List
-from ..database import get_db
+from sqlalchemy import Date, Integer, case, cast, literal, select
+from datetime import date, timedelta
+from typing import List, Optional
+from ..database import get_db, dialect_insert
 from ..models import models
+from ..schemas import master as schemas
 from ..api import deps
+from ..services.student_summary import refresh_student_summary
+from ..services.attendance_recap import attendance_recap, month_start, refresh_attendance_rollup
 
 router = APIRouter()
 
+def _on_conflict_update_status(stmt):
+    # Resubmitting the same (id_siswa, tanggal) overwrites instead of duplicating
+    return stmt.on_conflict_do_update(
+        index_elements=[models.Absensi.id_siswa, models.Absensi.tanggal],
+        set_={
+            "id_kelas": stmt.excluded.id_kelas,
+            "status": stmt.excluded.status
+        }
+    )
+
 @router.post("/")
 def create_absensi(
     id_siswa: int,
@@ -16,17 +30,83 @@ def create_absensi(
     db: Session = Depends(get_db),
     current_guru = Depends(deps.get_current_guru)
 ):
-    db_obj = models.Absensi(
+    insert = dialect_insert(db)
+    stmt = insert(models.Absensi).values(
         id_siswa=id_siswa,
         id_kelas=id_kelas,
         tanggal=date.today(),
         status=status
     )
-    db.add(db_obj)
+    db_obj = db.scalars(
+        _on_conflict_update_status(stmt).returning(models.Absensi),
+        execution_options={"populate_existing": True}
+    ).one()
+    refresh_student_summary(db, [id_siswa])
+    refresh_attendance_rollup(db, [id_siswa], db_obj.tanggal)
     db.commit()
     db.refresh(db_obj)
     return db_obj
 
+@router.post("/kelas/{id_kelas}")
+def create_absensi_kelas(
+    id_kelas: int,
+    absensi_in: schemas.AbsensiKelasCreate,
+    db: Session = Depends(get_db),
+    current_guru = Depends(deps.get_current_guru)
+):
+    kelas = db.query(models.Kelas.id_kelas).filter(models.Kelas.id_kelas == id_kelas).first()
+    if not kelas:
+        raise HTTPException(status_code=404, detail="Kelas not found")
+
+    status_column = models.Absensi.__table__.c.status
+    if absensi_in.status:
+        status_expr = case(
+            {id_siswa: status.value for id_siswa, status in absensi_in.status.items()},
+            value=models.Siswa.id_siswa,
+            else_="Hadir"
+        )
+    else:
+        status_expr = literal("Hadir")
+
+    # One INSERT .. SELECT over the whole class roster
+    roster = select(
+        models.Siswa.id_siswa,
+        literal(id_kelas, Integer),
+        literal(absensi_in.tanggal, Date),
+        cast(status_expr, status_column.type)
+    ).where(models.Siswa.id_kelas == id_kelas)
+
+    insert = dialect_insert(db)
+    stmt = insert(models.Absensi).from_select(
+        ["id_siswa", "id_kelas", "tanggal", "status"], roster
+    )
+    stmt = _on_conflict_update_status(stmt).returning(
+        models.Absensi.id_siswa, models.Absensi.status
+    )
+    rows = db.execute(stmt).all()
+    # A mistyped id would otherwise leave the intended student recorded as Hadir
+    tidak_dikenal = sorted(set(absensi_in.status or {}) - {row.id_siswa for row in rows})
+    if tidak_dikenal:
+        db.rollback()
+        raise HTTPException(
+            status_code=400,
+            detail=f"Siswa bukan anggota kelas ini: {', '.join(map(str, tidak_dikenal))}"
+        )
+    refresh_student_summary(db, [row.id_siswa for row in rows])
+    refresh_attendance_rollup(db, [row.id_siswa for row in rows], absensi_in.tanggal)
+    db.commit()
+
+    rekap = {status.value: 0 for status in schemas.StatusAbsensiEnum}
+    for row in rows:
+        rekap[row.status] += 1
+
+    return {
+        "id_kelas": id_kelas,
+        "tanggal": absensi_in.tanggal,
+        "total": len(rows),
+        "rekap": rekap
+    }
+
 @router.get("/siswa/{id_siswa}")
 def get_absensi_siswa(
     id_siswa: int,
@@ -34,3 +114,43 @@ def get_absensi_siswa(
     current_user = Depends(deps.get_current_active_user)
 ):
     return db.query(models.Absensi).filter(models.Absensi.id_siswa == id_siswa).all()
+
+# Longest range one recap may cover
+REKAP_MAX_DAYS = 3660
+
+@router.get("/rekap")
+def get_rekap(
+    tanggal_mulai: Optional[date] = None,
+    tanggal_selesai: Optional[date] = None,
+    group_by: schemas.RekapGroupEnum = schemas.RekapGroupEnum.kelas,
+    id_kelas: Optional[int] = None,
+    id_siswa: Optional[int] = None,
+    db: Session = Depends(get_db),
+    current_user = Depends(deps.get_current_active_user)
+):
+    # Hadir/Izin/Sakit/Alpa per kelas, siswa or bulan; defaults to the current month
+    tanggal_selesai = tanggal_selesai or date.today()
+    tanggal_mulai = tanggal_mulai or month_start(tanggal_selesai)
+    if tanggal_mulai > tanggal_selesai:
+        raise HTTPException(status_code=400, detail="tanggal_mulai harus sebelum tanggal_selesai")
+    if tanggal_selesai - tanggal_mulai > timedelta(days=REKAP_MAX_DAYS):
+        raise HTTPException(status_code=400, detail=f"Rentang rekap maksimal {REKAP_MAX_DAYS} hari")
+
+    if current_user.role == "Siswa":
+        # Students only see their own attendance; an unlinked account sees nothing
+        if current_user.id_siswa is None or (id_siswa is not None and id_siswa != current_user.id_siswa):
+            raise HTTPException(status_code=403, detail="The user doesn't have enough privileges")
+        id_siswa, id_kelas = current_user.id_siswa, None
+    elif current_user.role == "Guru":
+        allowed = deps.guru_kelas_ids(db, current_user.id_guru)
+        if id_kelas is None and id_siswa is None:
+            # Homeroom teachers default to their own class
+            id_kelas = db.scalar(select(models.Guru.id_kelas).where(models.Guru.id_guru == current_user.id_guru))
+        if id_kelas is None and id_siswa is not None:
+            id_kelas = db.scalar(select(models.Siswa.id_kelas).where(models.Siswa.id_siswa == id_siswa))
+        if id_kelas not in allowed:
+            raise HTTPException(status_code=403, detail="The user doesn't have enough privileges")
+
+    return attendance_recap(
+        db, tanggal_mulai, tanggal_selesai, group_by.value, id_kelas=id_kelas, id_siswa=id_siswa
+    )
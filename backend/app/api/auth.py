@@ -1,38 +1,74 @@
 from fastapi import APIRouter, Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordRequestForm
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
+from sqlalchemy import select
 from datetime import timedelta
-from ..database import get_db
+from ..database import get_db, get_async_db
 from ..core import security
+from ..core.hashing import HashingBusy
+from ..core.login_throttle import login_throttle
+from ..services.statistics import invalidate_admin_statistics
 from ..models import models
 from ..schemas import auth as auth_schemas
 from ..api import deps
 
 router = APIRouter()
 
+def _token_claims(user: models.Pengguna) -> dict:
+    # Everything deps.get_current_user needs to authorize without a query
+    return {
+        "sub": user.username,
+        "id_user": user.id_user,
+        "role": user.role,
+        "id_guru": user.id_guru,
+        "id_siswa": user.id_siswa,
+        "ver": user.token_version or 0,
+    }
+
 @router.post("/login", response_model=auth_schemas.Token)
-def login_access_token(
-    db: Session = Depends(get_db),
+async def login_access_token(
+    db: AsyncSession = Depends(get_async_db),
     form_data: OAuth2PasswordRequestForm = Depends()
 ):
-    user = db.query(models.Pengguna).filter(models.Pengguna.username == form_data.username).first()
-    if not user or not security.verify_password(form_data.password, user.password):
+    # Locked-out usernames are refused before spending any CPU on bcrypt
+    retry_after = login_throttle.retry_after(form_data.username)
+    if retry_after:
+        raise HTTPException(
+            status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+            detail="Too many failed login attempts, try again later",
+            headers={"Retry-After": str(retry_after)},
+        )
+
+    user = await db.scalar(select(models.Pengguna).where(models.Pengguna.username == form_data.username))
+    if not user or not await security.averify_password(form_data.password, user.password):
+        login_throttle.record_failure(form_data.username)
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Incorrect username or password",
             headers={"WWW-Authenticate": "Bearer"},
         )
+    login_throttle.reset(form_data.username)
+
+    # Upgrade the stored hash when BCRYPT_ROUNDS changed; retried next login if busy
+    if security.needs_rehash(user.password):
+        try:
+            user.password = await security.aget_password_hash(form_data.password)
+            await db.commit()
+        except HashingBusy:
+            pass
     
     access_token_expires = timedelta(minutes=security.ACCESS_TOKEN_EXPIRE_MINUTES)
     refresh_token_expires = timedelta(minutes=security.REFRESH_TOKEN_EXPIRE_MINUTES)
     
+    claims = _token_claims(user)
     return {
         "access_token": security.create_access_token(
-            data={"sub": user.username, "role": user.role},
+            data=claims,
             expires_delta=access_token_expires
         ),
         "refresh_token": security.create_refresh_token(
-            data={"sub": user.username, "role": user.role},
+            data=claims,
             expires_delta=refresh_token_expires
         ),
         "token_type": "bearer",
@@ -130,18 +166,20 @@ def register_user(
     db.add(db_obj)
     db.commit()
     db.refresh(db_obj)
+    # Registration may have created a new siswa or guru
+    invalidate_admin_statistics()
     return db_obj
 
 @router.get("/me", response_model=auth_schemas.UserResponse)
 def read_user_me(
-    current_user: models.Pengguna = Depends(deps.get_current_active_user)
+    current_user: auth_schemas.TokenData = Depends(deps.get_current_active_user)
 ):
     return current_user
 
 @router.get("/profile")
 def get_user_profile(
     db: Session = Depends(get_db),
-    current_user: models.Pengguna = Depends(deps.get_current_active_user)
+    current_user: models.Pengguna = Depends(deps.get_current_user_db)
 ):
     profile_data = {
         "username": current_user.username,
@@ -160,7 +198,7 @@ def get_user_profile(
 def update_user_profile(
     data: dict,
     db: Session = Depends(get_db),
-    current_user: models.Pengguna = Depends(deps.get_current_active_user)
+    current_user: models.Pengguna = Depends(deps.get_current_user_db)
 ):
     if current_user.role == "Guru" and current_user.guru:
         guru = current_user.guru
@@ -174,11 +212,15 @@ def update_user_profile(
         for key, value in data.items():
             if hasattr(siswa, key) and key not in ["id_siswa", "nisn"]:
                 setattr(siswa, key, value)
-    db.add(siswa)
+        db.add(siswa)
     
-    if "password" in data and data["password"]:
+    password_changed = bool(data.get("password"))
+    if password_changed:
         current_user.password = security.get_password_hash(data["password"])
+        deps.revoke_tokens(current_user)
         db.add(current_user)
 
     db.commit()
+    if password_changed:
+        deps.forget_token_version(current_user.id_user)
     return {"message": "Profile updated successfully"}
@@ -1,16 +1,28 @@
-from fastapi import APIRouter, Depends, HTTPException, File, UploadFile, Form
-from sqlalchemy.orm import Session
-from typing import List, Optional
+from fastapi import APIRouter, Depends, HTTPException, File, UploadFile, Form, Query, Request, Response
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session, defer, joinedload
+from sqlalchemy import func, tuple_, update
+from typing import Dict, List, Optional
 import os
-import shutil
-import uuid
-from pydantic import BaseModel
+import time
+import hashlib
+import logging
+import threading
+from email.utils import formatdate, parsedate_to_datetime
+from pydantic import BaseModel, Field, computed_field
 from datetime import datetime
-from ..database import get_db
+from ..core.cache import TTLCache
+from ..core.responses import type_adapter
+from ..database import SessionLocal, get_db, get_async_db
 from ..models import models
 from ..api import deps
+from ..services.statistics import invalidate_admin_statistics
+from ..services.berita_search import search_berita
+from ..services.images import UPLOAD_DIR, ImageTooLarge, UnsupportedImage, image_pool, remove_image, save_upload, variant_paths, variants_on_disk
+from ..services.upload_sweeper import UPLOAD_SWEEP_GRACE
 
 router = APIRouter()
+logger = logging.getLogger(__name__)
 
 class BeritaBase(BaseModel):
     judul: str
@@ -29,53 +41,306 @@ class BeritaResponse(BeritaBase):
     role_penulis: Optional[str] = None
     gambar: Optional[str] = None
     tanggal_post: datetime
+
+    varian_siap: bool = Field(False, exclude=True)
+
+    # Resized, EXIF-free copies of gambar: {"thumbnail"|"card"|"full": {"webp": path, "jpeg": path}}.
+    # None until background processing has finished.
+    @computed_field
+    @property
+    def gambar_varian(self) -> Optional[Dict[str, Dict[str, str]]]:
+        return variant_paths(self.gambar) if self.gambar and self.varian_siap else None
     
     class Config:
         from_attributes = True
 
+class BeritaSearchResponse(BaseModel):
+    id_berita: int
+    id_user: int
+    judul: str
+    # HTML-escaped, matched terms wrapped in <mark>
+    judul_highlight: str
+    cuplikan: str
+    gambar: Optional[str] = None
+    tanggal_post: datetime
+    nama_penulis: Optional[str] = None
+    role_penulis: Optional[str] = None
+    rank: float
+    varian_siap: bool = Field(False, exclude=True)
+
+    @computed_field
+    @property
+    def gambar_varian(self) -> Optional[Dict[str, Dict[str, str]]]:
+        return variant_paths(self.gambar) if self.gambar and self.varian_siap else None
+
+RINGKASAN_LENGTH = 200
+BERITA_CACHE_TTL = int(os.getenv("BERITA_CACHE_TTL", "60"))
+
+# Rendered public responses: key -> (body, etag, last_modified, headers)
+public_cache = TTLCache(ttl=BERITA_CACHE_TTL, maxsize=256)
+
+# Cache tag -> whole-second unix time of the last write that invalidated it. A tag first
+# seen by this worker counts as changed when it is first rendered.
+_changed_at: Dict[str, int] = {}
+_changed_at_lock = threading.Lock()
+
+def _mark_changed(tags: List[str]):
+    now = int(time.time())
+    with _changed_at_lock:
+        for tag in tags:
+            # Last-Modified has one-second resolution: keep two writes within the same
+            # second apart so the second one still beats If-Modified-Since
+            _changed_at[tag] = max(now, _changed_at.get(tag, 0) + 1)
+
+def _last_modified(tags: List[str]) -> int:
+    now = int(time.time())
+    with _changed_at_lock:
+        return max(_changed_at.setdefault(tag, now) for tag in tags)
+
+def _invalidate_public_cache(id_berita: Optional[int] = None):
+    tags = ["berita:list"]
+    if id_berita is not None:
+        tags.append(f"berita:{id_berita}")
+    _mark_changed(tags)
+    public_cache.invalidate(*tags)
+    # The admin dashboard lists recent news
+    invalidate_admin_statistics()
+
+def _save_gambar(gambar: UploadFile) -> str:
+    try:
+        return save_upload(gambar.file)
+    except UnsupportedImage as exc:
+        raise HTTPException(status_code=415, detail=str(exc))
+    except ImageTooLarge as exc:
+        raise HTTPException(status_code=413, detail=str(exc))
+
+def _release_gambar(db: Session, gambar: Optional[str]):
+    # Content-addressed files can be shared by several berita, including uploads whose row
+    # is not committed yet: a file touched within the sweep grace period is left to the sweeper
+    if not gambar or db.query(models.Berita.id_berita).filter(models.Berita.gambar == gambar).first():
+        return
+    try:
+        if time.time() - os.stat(os.path.join(UPLOAD_DIR, gambar)).st_mtime < UPLOAD_SWEEP_GRACE:
+            return
+    except FileNotFoundError:
+        pass
+    remove_image(gambar)
+
+def _mark_varian_siap(db: Session, file_path: str):
+    # Every berita sharing the content-addressed file gets its variants at once
+    db.execute(update(models.Berita).where(models.Berita.gambar == file_path).values(varian_siap=True))
+    db.commit()
+
+def _process_gambar(db: Session, id_berita: int, file_path: str):
+    if variants_on_disk(file_path):
+        # Deduplicated upload whose variants were rendered before
+        _mark_varian_siap(db, file_path)
+        return
+
+    def done(future):
+        if future.cancelled():
+            return
+        if future.exception() is not None:
+            logger.warning("Image variants failed for %s: %s", file_path, future.exception())
+            return
+        session = SessionLocal()
+        try:
+            _mark_varian_siap(session, file_path)
+        finally:
+            session.close()
+        # Cached public responses were rendered before the variants existed
+        _invalidate_public_cache(id_berita)
+
+    image_pool.submit(file_path, on_done=done)
+
+def _etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    if not if_none_match:
+        return False
+    candidates = [c.strip() for c in if_none_match.split(",")]
+    return "*" in candidates or any(c.removeprefix("W/") == etag for c in candidates)
+
+def _not_modified_since(if_modified_since: Optional[str], last_modified: int) -> bool:
+    if not if_modified_since:
+        return False
+    try:
+        return last_modified <= parsedate_to_datetime(if_modified_since).timestamp()
+    except (TypeError, ValueError):
+        return False
+
+async def _cached_public_response(request: Request, key, tags, db: AsyncSession, build):
+    async def render():
+        # Read before building, so a write racing the build can only make the date too old
+        last_modified = _last_modified(tags)
+        body, headers = await db.run_sync(build)
+        return body, '"' + hashlib.sha1(body).hexdigest() + '"', last_modified, headers
+
+    body, etag, last_modified, extra_headers = await public_cache.aget_or_set(key, render, tags)
+    headers = {
+        "ETag": etag,
+        "Last-Modified": formatdate(last_modified, usegmt=True),
+        "Cache-Control": "public, max-age=0, must-revalidate",
+        **extra_headers
+    }
+    # If-None-Match takes precedence; If-Modified-Since only counts without it (RFC 9110)
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match:
+        not_modified = _etag_matches(if_none_match, etag)
+    else:
+        not_modified = _not_modified_since(request.headers.get("if-modified-since"), last_modified)
+    if not_modified:
+        return Response(status_code=304, headers=headers)
+    return Response(content=body, media_type="application/json", headers=headers)
+
+async def _cached_public_list(request: Request, key, cursor, limit, summary, db: AsyncSession):
+    def build(session: Session):
+        scratch = Response()
+        results = _list_berita(session, scratch, cursor, limit, summary)
+        headers = {}
+        if "X-Next-Cursor" in scratch.headers:
+            headers["X-Next-Cursor"] = scratch.headers["X-Next-Cursor"]
+        return type_adapter(List[BeritaResponse]).dump_json(results), headers
+
+    return await _cached_public_response(
+        request, (key, cursor, limit, summary), ["berita:list"], db, build
+    )
+
+def _with_penulis(query):
+    # Load the author and their guru/siswa row in the same query as the berita
+    return query.options(
+        joinedload(models.Berita.pengguna).joinedload(models.Pengguna.guru),
+        joinedload(models.Berita.pengguna).joinedload(models.Pengguna.siswa)
+    )
+
+def _parse_cursor(cursor: str):
+    try:
+        tanggal_post, id_berita = cursor.rsplit("_", 1)
+        return datetime.fromisoformat(tanggal_post), int(id_berita)
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Cursor tidak valid")
+
+def _list_berita(
+    db: Session,
+    response: Response,
+    cursor: Optional[str],
+    limit: Optional[int],
+    summary: bool
+):
+    query = _with_penulis(db.query(models.Berita))
+    if summary:
+        # Only transfer the excerpt of isi, not the full article body
+        query = query.options(defer(models.Berita.isi)).add_columns(
+            func.substr(models.Berita.isi, 1, RINGKASAN_LENGTH + 1).label("ringkasan")
+        )
+
+    if cursor:
+        tanggal_post, id_berita = _parse_cursor(cursor)
+        query = query.filter(
+            tuple_(models.Berita.tanggal_post, models.Berita.id_berita) < tuple_(tanggal_post, id_berita)
+        )
+
+    query = query.order_by(models.Berita.tanggal_post.desc(), models.Berita.id_berita.desc())
+    if limit is not None:
+        query = query.limit(limit + 1)
+    rows = query.all()
+
+    if limit is not None and len(rows) > limit:
+        rows = rows[:limit]
+        last = rows[-1][0] if summary else rows[-1]
+        response.headers["X-Next-Cursor"] = f"{last.tanggal_post.isoformat()}_{last.id_berita}"
+
+    results = []
+    for row in rows:
+        if summary:
+            item, ringkasan = row
+            isi = ringkasan or ""
+            if len(isi) > RINGKASAN_LENGTH:
+                isi = isi[:RINGKASAN_LENGTH].rstrip() + "..."
+        else:
+            item, isi = row, row.isi
+        results.append(BeritaResponse(
+            id_berita=item.id_berita,
+            id_user=item.id_user,
+            judul=item.judul,
+            isi=isi,
+            gambar=item.gambar,
+            varian_siap=item.varian_siap,
+            tanggal_post=item.tanggal_post,
+            nama_penulis=item.pengguna.nama if item.pengguna else None,
+            role_penulis=item.pengguna.role if item.pengguna else None
+        ))
+    return results
+
 @router.get("/", response_model=List[BeritaResponse])
-def read_berita(
-    db: Session = Depends(get_db),
+async def read_berita(
+    response: Response,
+    cursor: Optional[str] = None,
+    limit: Optional[int] = Query(None, ge=1, le=100),
+    summary: bool = False,
+    db: AsyncSession = Depends(get_async_db),
     current_user = Depends(deps.get_current_active_user)
 ):
-    results = db.query(models.Berita).order_by(models.Berita.tanggal_post.desc()).all()
-    for item in results:
-        item.nama_penulis = item.pengguna.nama
-        item.role_penulis = item.pengguna.role
-    return results
+    return await db.run_sync(_list_berita, response, cursor, limit, summary)
 
 @router.get("/public", response_model=List[BeritaResponse])
-def read_berita_public(
-    db: Session = Depends(get_db)
+async def read_berita_public(
+    request: Request,
+    cursor: Optional[str] = None,
+    limit: int = Query(6, ge=1, le=100),
+    summary: bool = False,
+    db: AsyncSession = Depends(get_async_db)
 ):
-    results = db.query(models.Berita).order_by(models.Berita.tanggal_post.desc()).limit(6).all()
-    for item in results:
-        item.nama_penulis = item.pengguna.nama
-        item.role_penulis = item.pengguna.role
-    return results
+    return await _cached_public_list(request, "public", cursor, limit, summary, db)
 
 @router.get("/public/all", response_model=List[BeritaResponse])
-def read_berita_public_all(
-    db: Session = Depends(get_db)
+async def read_berita_public_all(
+    request: Request,
+    cursor: Optional[str] = None,
+    limit: Optional[int] = Query(None, ge=1, le=100),
+    summary: bool = False,
+    db: AsyncSession = Depends(get_async_db)
 ):
-    results = db.query(models.Berita).order_by(models.Berita.tanggal_post.desc()).all()
-    for item in results:
-        item.nama_penulis = item.pengguna.nama
-        item.role_penulis = item.pengguna.role
-    return results
+    return await _cached_public_list(request, "public/all", cursor, limit, summary, db)
+
+@router.get("/search", response_model=List[BeritaSearchResponse])
+async def search_berita_public(
+    request: Request,
+    q: str = Query(..., min_length=2, max_length=100),
+    skip: int = Query(0, ge=0),
+    limit: int = Query(10, ge=1, le=50),
+    db: AsyncSession = Depends(get_async_db)
+):
+    # Ranked full-text search; X-Total-Count carries the number of matches
+    q = " ".join(q.split())
+
+    def build(session: Session):
+        results, total = search_berita(session, q, skip, limit)
+        body = type_adapter(List[BeritaSearchResponse]).dump_json(
+            [BeritaSearchResponse(**item) for item in results]
+        )
+        return body, {"X-Total-Count": str(total)}
+
+    return await _cached_public_response(
+        request, ("search", q.lower(), skip, limit), ["berita:list"], db, build
+    )
 
 @router.get("/public/{id_berita}", response_model=BeritaResponse)
-def read_single_berita_public(
+async def read_single_berita_public(
     id_berita: int,
-    db: Session = Depends(get_db)
+    request: Request,
+    db: AsyncSession = Depends(get_async_db)
 ):
-    db_obj = db.query(models.Berita).filter(models.Berita.id_berita == id_berita).first()
-    if not db_obj:
-        raise HTTPException(status_code=404, detail="Berita tidak ditemukan")
-    
-    db_obj.nama_penulis = db_obj.pengguna.nama
-    db_obj.role_penulis = db_obj.pengguna.role
-    return db_obj
+    def build(session: Session):
+        db_obj = _with_penulis(session.query(models.Berita)).filter(models.Berita.id_berita == id_berita).first()
+        if not db_obj:
+            raise HTTPException(status_code=404, detail="Berita tidak ditemukan")
+
+        db_obj.nama_penulis = db_obj.pengguna.nama
+        db_obj.role_penulis = db_obj.pengguna.role
+        return BeritaResponse.model_validate(db_obj).model_dump_json().encode(), {}
+
+    return await _cached_public_response(
+        request, ("public", id_berita), [f"berita:{id_berita}"], db, build
+    )
 
 @router.post("/", response_model=BeritaResponse)
 def create_berita(
@@ -85,18 +350,7 @@ def create_berita(
     db: Session = Depends(get_db),
     current_user = Depends(deps.get_current_active_user)
 ):
-    file_path = None
-    if gambar:
-        file_extension = os.path.splitext(gambar.filename)[1]
-        file_name = f"{uuid.uuid4()}{file_extension}"
-        file_path = f"berita/{file_name}"
-        save_path = os.path.join("uploads", file_path)
-        
-        # Ensure the directory exists
-        os.makedirs(os.path.dirname(save_path), exist_ok=True)
-
-        with open(save_path, "wb") as buffer:
-            shutil.copyfileobj(gambar.file, buffer)
+    file_path = _save_gambar(gambar) if gambar else None
 
     db_obj = models.Berita(
         id_user=current_user.id_user,
@@ -107,6 +361,10 @@ def create_berita(
     db.add(db_obj)
     db.commit()
     db.refresh(db_obj)
+    _invalidate_public_cache()
+    if file_path:
+        _process_gambar(db, db_obj.id_berita, file_path)
+        db.refresh(db_obj)
     
     # Add author info for response
     db_obj.nama_penulis = db_obj.pengguna.nama
@@ -129,29 +387,23 @@ def update_berita(
     if current_user.role != "Admin" and db_obj.id_user != current_user.id_user:
         raise HTTPException(status_code=403, detail="Anda tidak memiliki akses untuk mengedit berita ini")
     
+    old_gambar = None
     if gambar:
-        if db_obj.gambar:
-            old_path = os.path.join("uploads", db_obj.gambar)
-            if os.path.exists(old_path):
-                os.remove(old_path)
-        
-        file_extension = os.path.splitext(gambar.filename)[1]
-        file_name = f"{uuid.uuid4()}{file_extension}"
-        file_path = f"berita/{file_name}"
-        save_path = os.path.join("uploads", file_path)
-
-        # Ensure the directory exists
-        os.makedirs(os.path.dirname(save_path), exist_ok=True)
-        
-        with open(save_path, "wb") as buffer:
-            shutil.copyfileobj(gambar.file, buffer)
-        db_obj.gambar = file_path
-        pass
+        old_gambar = db_obj.gambar
+        db_obj.gambar = _save_gambar(gambar)
+        if db_obj.gambar != old_gambar:
+            db_obj.varian_siap = False
     
     db_obj.judul = judul
     db_obj.isi = isi
     db.commit()
     db.refresh(db_obj)
+    _invalidate_public_cache(id_berita)
+    if gambar:
+        if old_gambar != db_obj.gambar:
+            _release_gambar(db, old_gambar)
+        _process_gambar(db, id_berita, db_obj.gambar)
+        db.refresh(db_obj)
     
     # Add author info for response
     db_obj.nama_penulis = db_obj.pengguna.nama
@@ -171,6 +423,9 @@ def delete_berita(
     if current_user.role != "Admin" and db_obj.id_user != current_user.id_user:
         raise HTTPException(status_code=403, detail="Anda tidak memiliki akses untuk menghapus berita ini")
     
+    old_gambar = db_obj.gambar
     db.delete(db_obj)
     db.commit()
+    _invalidate_public_cache(id_berita)
+    _release_gambar(db, old_gambar)
     return {"message": "Berita berhasil dihapus"}
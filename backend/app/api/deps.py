@@ -1,19 +1,49 @@
-from typing import Generator, Optional
+import os
+from typing import Generator, Optional, Set
 from fastapi import Depends, HTTPException, status
+from fastapi.concurrency import run_in_threadpool
 from fastapi.security import OAuth2PasswordBearer
 from jose import jwt, JWTError
+from sqlalchemy import select
 from sqlalchemy.orm import Session
-from ..database import get_db
+from ..database import get_db, SessionLocal
+from ..core.cache import TTLCache
 from ..core.security import SECRET_KEY, ALGORITHM
 from ..models import models
 from ..schemas import auth as auth_schemas
 
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="api/auth/login")
 
-def get_current_user(
-    db: Session = Depends(get_db),
+TOKEN_VERSION_TTL = int(os.getenv("TOKEN_VERSION_TTL", "60"))
+
+# id_user -> current token_version (None once the user is gone)
+token_versions = TTLCache(ttl=TOKEN_VERSION_TTL, maxsize=10000)
+_MISSING = object()
+
+def _load_token_version(id_user: int) -> Optional[int]:
+    db = SessionLocal()
+    try:
+        return db.query(models.Pengguna.token_version).filter(
+            models.Pengguna.id_user == id_user
+        ).scalar()
+    finally:
+        db.close()
+
+def get_token_version(id_user: int) -> Optional[int]:
+    return token_versions.get_or_set(
+        id_user, lambda: _load_token_version(id_user), tags=[f"user:{id_user}"]
+    )
+
+def revoke_tokens(user: models.Pengguna):
+    # Caller commits; every token carrying the old version stops working
+    user.token_version = (user.token_version or 0) + 1
+
+def forget_token_version(id_user: int):
+    token_versions.invalidate(f"user:{id_user}")
+
+async def get_current_user(
     token: str = Depends(oauth2_scheme)
-) -> models.Pengguna:
+) -> auth_schemas.TokenData:
     credentials_exception = HTTPException(
         status_code=status.HTTP_401_UNAUTHORIZED,
         detail="Could not validate credentials",
@@ -22,25 +52,50 @@ def get_current_user(
     try:
         payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
         username: str = payload.get("sub")
-        if username is None:
+        id_user: int = payload.get("id_user")
+        if username is None or id_user is None or payload.get("type") != "access":
             raise credentials_exception
-        token_data = auth_schemas.TokenData(username=username)
-    except JWTError:
+        token_data = auth_schemas.TokenData(
+            username=username,
+            role=payload.get("role"),
+            id_user=id_user,
+            id_guru=payload.get("id_guru"),
+            id_siswa=payload.get("id_siswa"),
+            token_version=payload.get("ver", 0)
+        )
+    except (JWTError, ValueError):
         raise credentials_exception
-        
-    user = db.query(models.Pengguna).filter(models.Pengguna.username == token_data.username).first()
-    if user is None:
+
+    # Authorization comes from the claims; only the revocation version is checked
+    version = token_versions.get(token_data.id_user, _MISSING)
+    if version is _MISSING:
+        version = await run_in_threadpool(get_token_version, token_data.id_user)
+    if version != token_data.token_version:
         raise credentials_exception
-    return user
+    return token_data
 
-def get_current_active_user(
-    current_user: models.Pengguna = Depends(get_current_user)
-) -> models.Pengguna:
+async def get_current_active_user(
+    current_user: auth_schemas.TokenData = Depends(get_current_user)
+) -> auth_schemas.TokenData:
     return current_user
 
-def get_current_admin(
-    current_user: models.Pengguna = Depends(get_current_active_user)
+def get_current_user_db(
+    db: Session = Depends(get_db),
+    current_user: auth_schemas.TokenData = Depends(get_current_active_user)
 ) -> models.Pengguna:
+    # For endpoints that need the Pengguna row itself (profile, password)
+    user = db.get(models.Pengguna, current_user.id_user)
+    if user is None:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Could not validate credentials",
+            headers={"WWW-Authenticate": "Bearer"},
+        )
+    return user
+
+async def get_current_admin(
+    current_user: auth_schemas.TokenData = Depends(get_current_active_user)
+) -> auth_schemas.TokenData:
     if current_user.role != "Admin":
         raise HTTPException(
             status_code=status.HTTP_403_FORBIDDEN,
@@ -48,12 +103,20 @@ def get_current_admin(
         )
     return current_user
 
-def get_current_guru(
-    current_user: models.Pengguna = Depends(get_current_active_user)
-) -> models.Pengguna:
+async def get_current_guru(
+    current_user: auth_schemas.TokenData = Depends(get_current_active_user)
+) -> auth_schemas.TokenData:
     if current_user.role not in ["Admin", "Guru"]:
         raise HTTPException(
             status_code=status.HTTP_403_FORBIDDEN,
             detail="The user doesn't have enough privileges"
         )
     return current_user
+
+def guru_kelas_ids(db: Session, id_guru: Optional[int]) -> Set[int]:
+    # Homeroom class plus every class the guru teaches
+    if id_guru is None:
+        return set()
+    wali = select(models.Guru.id_kelas).where(models.Guru.id_guru == id_guru)
+    diampu = select(models.MapelDiampu.id_kelas).where(models.MapelDiampu.id_guru == id_guru)
+    return {id_kelas for id_kelas in db.scalars(wali.union(diampu)) if id_kelas is not None}
@@ -0,0 +1,39 @@
+from datetime import date
+from typing import Optional
+from fastapi import APIRouter, Depends
+from fastapi.responses import StreamingResponse
+from ..schemas import master as schemas
+from ..api import deps
+from ..services.export import iter_csv, iter_xlsx
+
+router = APIRouter()
+
+MEDIA_TYPES = {
+    "csv": "text/csv; charset=utf-8",
+    "xlsx": "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
+}
+
+@router.get("/{resource}")
+def export_resource(
+    resource: schemas.ExportResourceEnum,
+    format: schemas.ExportFormatEnum = schemas.ExportFormatEnum.xlsx,
+    id_kelas: Optional[int] = None,
+    id_mapel: Optional[int] = None,
+    tanggal_mulai: Optional[date] = None,
+    tanggal_selesai: Optional[date] = None,
+    current_guru = Depends(deps.get_current_guru)
+):
+    writer = iter_csv if format == schemas.ExportFormatEnum.csv else iter_xlsx
+    rows = writer(
+        resource.value,
+        id_kelas=id_kelas,
+        id_mapel=id_mapel,
+        tanggal_mulai=tanggal_mulai,
+        tanggal_selesai=tanggal_selesai
+    )
+    filename = f"{resource.value}-{date.today().isoformat()}.{format.value}"
+    return StreamingResponse(
+        rows,
+        media_type=MEDIA_TYPES[format.value],
+        headers={"Content-Disposition": f'attachment; filename="{filename}"'}
+    )
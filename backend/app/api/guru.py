@@ -1,21 +1,38 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, File, HTTPException, Response, UploadFile, status
 from sqlalchemy.orm import Session
-from typing import List
+from sqlalchemy import select
+from typing import List, Optional
 from ..database import get_db
 from ..models import models
 from ..schemas import master as schemas
 from ..api import deps
+from ..api.pagination import PageParams, paginate, prefix_filter
+from ..api.imports import import_upload
+from ..services.projections import guru_json
+from ..core.responses import trusted_json
+from ..services.statistics import invalidate_admin_statistics
 
 router = APIRouter()
 
 @router.get("/", response_model=List[schemas.GuruResponse])
 def read_guru(
+    response: Response,
+    id_kelas: Optional[int] = None,
+    jenis_kelamin: Optional[schemas.JenisKelaminEnum] = None,
+    nama: Optional[str] = None,
+    page: PageParams = Depends(),
     db: Session = Depends(get_db),
-    skip: int = 0,
-    limit: int = 100,
     current_user = Depends(deps.get_current_active_user)
 ):
-    return db.query(models.Guru).offset(skip).limit(limit).all()
+    stmt = select(models.Guru)
+    if id_kelas is not None:
+        stmt = stmt.where(models.Guru.id_kelas == id_kelas)
+    if jenis_kelamin is not None:
+        stmt = stmt.where(models.Guru.jenis_kelamin == jenis_kelamin.value)
+    if nama:
+        stmt = stmt.where(prefix_filter(models.Guru.nama, nama))
+    gurus = paginate(db, stmt, models.Guru.id_guru, page, response)
+    return trusted_json(guru_json(db, gurus), response)
 
 @router.post("/", response_model=schemas.GuruResponse)
 def create_guru(
@@ -42,9 +59,20 @@ def create_guru(
     if assignments:
         db.commit()
         db.refresh(db_obj)
-        
+
+    invalidate_admin_statistics()
     return db_obj
 
+@router.post("/import")
+def import_guru(
+    file: UploadFile = File(...),
+    dry_run: bool = False,
+    db: Session = Depends(get_db),
+    current_admin = Depends(deps.get_current_admin)
+):
+    # Teaching assignments are not part of the sheet; add them per guru afterwards
+    return import_upload(db, "guru", file, dry_run)
+
 @router.get("/{id_guru}", response_model=schemas.GuruResponse)
 def read_guru_by_id(
     id_guru: int,
@@ -87,4 +115,5 @@ def delete_guru(
         raise HTTPException(status_code=404, detail="Guru not found")
     db.delete(db_obj)
     db.commit()
+    invalidate_admin_statistics()
     return {"message": "Guru deleted successfully"}
@@ -0,0 +1,28 @@
+import os
+from fastapi import HTTPException, UploadFile
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+from ..services.bulk_import import SpreadsheetError, import_spreadsheet, read_spreadsheet
+from ..services.statistics import invalidate_admin_statistics
+from ..services.grade_statistics import invalidate_grade_statistics
+
+IMPORT_MAX_BYTES = int(os.getenv("IMPORT_MAX_BYTES", str(5 * 1024 * 1024)))
+
+def import_upload(db: Session, resource: str, file: UploadFile, dry_run: bool) -> dict:
+    content = file.file.read(IMPORT_MAX_BYTES + 1)
+    if len(content) > IMPORT_MAX_BYTES:
+        raise HTTPException(status_code=413, detail="File too large")
+
+    try:
+        report = import_spreadsheet(db, resource, read_spreadsheet(content, file.filename), dry_run=dry_run)
+    except SpreadsheetError as exc:
+        raise HTTPException(status_code=400, detail=str(exc))
+    except IntegrityError:
+        # A conflicting row was written between validation and insert
+        db.rollback()
+        raise HTTPException(status_code=409, detail="Import conflicts with existing data, please retry")
+
+    if report["inserted"]:
+        invalidate_admin_statistics()
+        invalidate_grade_statistics()
+    return report
@@ -1,20 +1,31 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Response, status
 from sqlalchemy.orm import Session
-from typing import List
+from sqlalchemy import select
+from typing import List, Optional
 from ..database import get_db
 from ..models import models
 from ..schemas import master as schemas
 from ..api import deps
+from ..api.pagination import PageParams, paginate, prefix_filter
+from ..services.statistics import invalidate_admin_statistics
+from ..services.grade_statistics import invalidate_grade_statistics
 
 router = APIRouter()
 
 @router.get("/", response_model=List[schemas.KelasResponse])
 def read_kelas(
-    db: Session = Depends(get_db),
-    skip: int = 0,
-    limit: int = 100
+    response: Response,
+    jurusan: Optional[str] = None,
+    kelas: Optional[str] = None,
+    page: PageParams = Depends(),
+    db: Session = Depends(get_db)
 ):
-    return db.query(models.Kelas).offset(skip).limit(limit).all()
+    stmt = select(models.Kelas)
+    if jurusan:
+        stmt = stmt.where(models.Kelas.jurusan == jurusan)
+    if kelas:
+        stmt = stmt.where(prefix_filter(models.Kelas.kelas, kelas))
+    return paginate(db, stmt, models.Kelas.id_kelas, page, response)
 
 @router.post("/", response_model=schemas.KelasResponse)
 def create_kelas(
@@ -26,6 +37,7 @@ def create_kelas(
     db.add(db_obj)
     db.commit()
     db.refresh(db_obj)
+    invalidate_admin_statistics()
     return db_obj
 
 @router.get("/{id_kelas}", response_model=schemas.KelasResponse)
@@ -57,6 +69,7 @@ def update_kelas(
     db.add(db_obj)
     db.commit()
     db.refresh(db_obj)
+    invalidate_grade_statistics()
     return db_obj
 
 @router.delete("/{id_kelas}")
@@ -70,4 +83,6 @@ def delete_kelas(
         raise HTTPException(status_code=404, detail="Kelas not found")
     db.delete(db_obj)
     db.commit()
+    invalidate_admin_statistics()
+    invalidate_grade_statistics()
     return {"message": "Kelas deleted successfully"}
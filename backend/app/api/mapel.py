@@ -1,20 +1,31 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Response, status
 from sqlalchemy.orm import Session
-from typing import List
+from sqlalchemy import select
+from typing import List, Optional
 from ..database import get_db
 from ..models import models
 from ..schemas import master as schemas
 from ..api import deps
+from ..api.pagination import PageParams, paginate, prefix_filter
+from ..services.statistics import invalidate_admin_statistics
+from ..services.grade_statistics import invalidate_grade_statistics
 
 router = APIRouter()
 
 @router.get("/", response_model=List[schemas.MapelResponse])
 def read_mapel(
-    db: Session = Depends(get_db),
-    skip: int = 0,
-    limit: int = 100
+    response: Response,
+    kategori: Optional[schemas.KategoriMapelEnum] = None,
+    nama_mapel: Optional[str] = None,
+    page: PageParams = Depends(),
+    db: Session = Depends(get_db)
 ):
-    return db.query(models.MataPelajaran).offset(skip).limit(limit).all()
+    stmt = select(models.MataPelajaran)
+    if kategori is not None:
+        stmt = stmt.where(models.MataPelajaran.kategori == kategori.value)
+    if nama_mapel:
+        stmt = stmt.where(prefix_filter(models.MataPelajaran.nama_mapel, nama_mapel))
+    return paginate(db, stmt, models.MataPelajaran.id_mapel, page, response)
 
 @router.post("/", response_model=schemas.MapelResponse)
 def create_mapel(
@@ -26,6 +37,7 @@ def create_mapel(
     db.add(db_obj)
     db.commit()
     db.refresh(db_obj)
+    invalidate_admin_statistics()
     return db_obj
 
 @router.get("/{id_mapel}", response_model=schemas.MapelResponse)
@@ -57,6 +69,7 @@ def update_mapel(
     db.add(db_obj)
     db.commit()
     db.refresh(db_obj)
+    invalidate_grade_statistics()
     return db_obj
 
 @router.delete("/{id_mapel}")
@@ -70,6 +83,8 @@ def delete_mapel(
         raise HTTPException(status_code=404, detail="Mata pelajaran not found")
     db.delete(db_obj)
     db.commit()
+    invalidate_admin_statistics()
+    invalidate_grade_statistics()
     return {"message": "Mata pelajaran deleted successfully"}
 
 # -------------------------------------------------------------
@@ -0,0 +1,33 @@
+import os
+import secrets
+from typing import Optional
+from fastapi import APIRouter, Header, HTTPException, status
+from fastapi.responses import PlainTextResponse
+from ..api import deps
+from ..core import metrics
+from ..core.pool_metrics import async_pool_monitor, sync_pool_monitor
+
+router = APIRouter()
+
+# Scrapers don't carry user JWTs, so they send this static bearer token instead.
+# Without it configured the endpoint is Admin-only, like /api/monitoring/pool.
+METRICS_TOKEN = os.getenv("METRICS_TOKEN", "")
+
+PROMETHEUS_CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+@router.get("", response_class=PlainTextResponse)
+async def get_metrics(authorization: Optional[str] = Header(None)):
+    scheme, _, token = (authorization or "").partition(" ")
+    if scheme.lower() != "bearer" or not token:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Not authenticated",
+            headers={"WWW-Authenticate": "Bearer"},
+        )
+    if not (METRICS_TOKEN and secrets.compare_digest(token, METRICS_TOKEN)):
+        # Anything else must be an Admin's access token
+        await deps.get_current_admin(await deps.get_current_user(token))
+    return PlainTextResponse(
+        metrics.render((sync_pool_monitor, async_pool_monitor)),
+        media_type=PROMETHEUS_CONTENT_TYPE
+    )
@@ -0,0 +1,14 @@
+from fastapi import APIRouter, Depends
+from ..core.pool_metrics import async_pool_monitor, sync_pool_monitor
+from ..api import deps
+
+router = APIRouter()
+
+@router.get("/pool")
+async def get_pool_statistics(
+    current_admin = Depends(deps.get_current_admin)
+):
+    return {
+        "sync": sync_pool_monitor.snapshot(),
+        "async": async_pool_monitor.snapshot()
+    }
@@ -1,103 +1,166 @@
 from fastapi import APIRouter, Depends, HTTPException
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
-from typing import List
-from ..database import get_db
+from sqlalchemy import Integer, func, literal, select
+from typing import List, Optional
+from ..database import get_async_db, dialect_insert
 from ..models import models
 from ..schemas import master as schemas
 from ..api import deps
+from ..services.grade_matrix import build_grade_matrix
+from ..services.student_summary import refresh_student_summary
+from ..services.projections import nilai_json, select_nilai_rows
+from ..services.grade_statistics import (
+    cache_key, cache_tags, grade_statistics_cache, invalidate_grade_statistics, load_grade_statistics, statistics_tags_of_siswa
+)
+from ..core.responses import trusted_json
 
 router = APIRouter()
 
+async def _nilai_response(db: AsyncSession, *criteria):
+    return trusted_json(nilai_json((await db.execute(select_nilai_rows(*criteria))).all()))
+
 @router.get("/", response_model=List[schemas.NilaiResponse])
-def read_nilai(
-    db: Session = Depends(get_db),
+async def read_nilai(
+    db: AsyncSession = Depends(get_async_db),
     current_user = Depends(deps.get_current_active_user)
 ):
-    return db.query(models.Nilai).all()
+    return await _nilai_response(db)
 
 @router.get("/guru/me")
-def get_guru_teaching_data(
-    db: Session = Depends(get_db),
+async def get_guru_teaching_data(
+    id_ampu: Optional[int] = None,
+    db: AsyncSession = Depends(get_async_db),
     current_guru = Depends(deps.get_current_guru)
 ):
-    # Get what this guru teaches
-    teaching = db.query(models.MapelDiampu).filter(models.MapelDiampu.id_guru == current_guru.id_guru).all()
-    
     # Structure data to return: Classes -> Students -> Grades
-    result = []
-    for t in teaching:
-        kelas = t.kelas
-        students = db.query(models.Siswa).filter(models.Siswa.id_kelas == kelas.id_kelas).all()
-        
-        student_data = []
-        for s in students:
-            # Get existing grade for this student and this specific subject
-            grade = db.query(models.Nilai).filter(
-                models.Nilai.id_siswa == s.id_siswa,
-                models.Nilai.id_mapel == t.id_mapel
-            ).first()
-            
-            student_data.append({
-                "id_siswa": s.id_siswa,
-                "nama": s.nama,
-                "nisn": s.nisn,
-                "nilai": grade
-            })
-            
-        result.append({
-            "id_ampu": t.id_ampu,
-            "id_kelas": t.id_kelas,
-            "kelas_nama": kelas.kelas,
-            "id_mapel": t.id_mapel,
-            "mapel_nama": t.mapel.nama_mapel,
-            "students": student_data
-        })
-    return result
+    return await db.run_sync(build_grade_matrix, current_guru.id_guru, id_ampu=id_ampu)
+
+def _nilai_akhir(nilai_uts, nilai_uas):
+    return (func.coalesce(nilai_uts, 0) + func.coalesce(nilai_uas, 0)) // 2
+
+def _upsert_nilai(db: Session, id_mapel: int, items: List[schemas.NilaiBulkItem]):
+    # Single INSERT .. ON CONFLICT (id_siswa, id_mapel) DO UPDATE, nilai_akhir computed in SQL
+    insert = dialect_insert(db)
+    stmt = insert(models.Nilai).values([
+        {
+            "id_siswa": item.id_siswa,
+            "id_mapel": id_mapel,
+            "nilai_uts": item.nilai_uts,
+            "nilai_uas": item.nilai_uas,
+            "nilai_akhir": _nilai_akhir(
+                literal(item.nilai_uts, Integer),
+                literal(item.nilai_uas, Integer)
+            )
+        }
+        for item in items
+    ])
+    stmt = stmt.on_conflict_do_update(
+        index_elements=[models.Nilai.id_siswa, models.Nilai.id_mapel],
+        set_={
+            "nilai_uts": stmt.excluded.nilai_uts,
+            "nilai_uas": stmt.excluded.nilai_uas,
+            "nilai_akhir": _nilai_akhir(stmt.excluded.nilai_uts, stmt.excluded.nilai_uas)
+        }
+    ).returning(models.Nilai)
+    return db.scalars(stmt, execution_options={"populate_existing": True}).all()
+
+def _upsert_nilai_response(db: Session, id_mapel: int, items: List[schemas.NilaiBulkItem]):
+    response = [
+        schemas.NilaiResponse.model_validate(obj)
+        for obj in _upsert_nilai(db, id_mapel, items)
+    ]
+    refresh_student_summary(db, [item.id_siswa for item in items])
+    # Grade statistics that go stale once this commits
+    return response, statistics_tags_of_siswa(db, [item.id_siswa for item in items])
+
+@router.get("/statistik")
+async def get_grade_statistics(
+    id_kelas: Optional[int] = None,
+    jurusan: Optional[str] = None,
+    db: AsyncSession = Depends(get_async_db),
+    current_user = Depends(deps.get_current_active_user)
+):
+    # Per-mapel mean/median/std/histogram and per-student average, rank and percentile
+    # of nilai_akhir for one class or one jurusan
+    if current_user.role == "Siswa":
+        # Students see their own class, with only their own line of the ranking
+        if jurusan is not None:
+            raise HTTPException(status_code=403, detail="The user doesn't have enough privileges")
+        own = await db.scalar(select(models.Siswa.id_kelas).where(models.Siswa.id_siswa == current_user.id_siswa))
+        if own is None or id_kelas not in (None, own):
+            raise HTTPException(status_code=403, detail="The user doesn't have enough privileges")
+        id_kelas = own
+    if (id_kelas is None) == (jurusan is None):
+        raise HTTPException(status_code=400, detail="Pilih salah satu: id_kelas atau jurusan")
+
+    if current_user.role == "Guru":
+        allowed = await db.run_sync(deps.guru_kelas_ids, current_user.id_guru)
+        if id_kelas is not None:
+            permitted = id_kelas in allowed
+        else:
+            permitted = jurusan in set(await db.scalars(
+                select(models.Kelas.jurusan).where(models.Kelas.id_kelas.in_(allowed))
+            ))
+        if not permitted:
+            raise HTTPException(status_code=403, detail="The user doesn't have enough privileges")
+
+    async def load():
+        return await db.run_sync(load_grade_statistics, id_kelas=id_kelas, jurusan=jurusan)
+
+    stats = await grade_statistics_cache.aget_or_set(cache_key(id_kelas, jurusan), load, cache_tags(id_kelas, jurusan))
+    if current_user.role == "Siswa":
+        stats = {**stats, "siswa": [item for item in stats["siswa"] if item["id_siswa"] == current_user.id_siswa]}
+    # Plain ints, floats and strings built by compute_grade_statistics
+    return trusted_json(stats)
 
 @router.post("/", response_model=schemas.NilaiResponse)
-def create_or_update_nilai(
+async def create_or_update_nilai(
     nilai_in: schemas.NilaiCreate,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_guru = Depends(deps.get_current_guru)
 ):
-    # Calculate nilai_akhir
-    nilai_akhir = int(((nilai_in.nilai_uts or 0) + (nilai_in.nilai_uas or 0)) / 2)
-    
-    # Check if exists
-    db_obj = db.query(models.Nilai).filter(
-        models.Nilai.id_siswa == nilai_in.id_siswa,
-        models.Nilai.id_mapel == nilai_in.id_mapel
-    ).first()
-    
-    if db_obj:
-        db_obj.nilai_uts = nilai_in.nilai_uts
-        db_obj.nilai_uas = nilai_in.nilai_uas
-        db_obj.nilai_akhir = nilai_akhir
-    else:
-        db_obj = models.Nilai(
-            **nilai_in.model_dump(exclude={"nilai_akhir"}),
-            nilai_akhir=nilai_akhir
+    response, stale = await db.run_sync(_upsert_nilai_response, nilai_in.id_mapel, [
+        schemas.NilaiBulkItem(
+            id_siswa=nilai_in.id_siswa,
+            nilai_uts=nilai_in.nilai_uts,
+            nilai_uas=nilai_in.nilai_uas
         )
-        db.add(db_obj)
-    
-    db.commit()
-    db.refresh(db_obj)
-    return db_obj
+    ])
+    await db.commit()
+    invalidate_grade_statistics(stale)
+    return response[0]
+
+@router.post("/bulk", response_model=List[schemas.NilaiResponse])
+async def bulk_upsert_nilai(
+    nilai_in: schemas.NilaiBulkCreate,
+    db: AsyncSession = Depends(get_async_db),
+    current_guru = Depends(deps.get_current_guru)
+):
+    if not nilai_in.items:
+        return []
+
+    # Last entry wins if a student is listed twice; ON CONFLICT can't touch a row twice
+    items = list({item.id_siswa: item for item in nilai_in.items}.values())
+    response, stale = await db.run_sync(_upsert_nilai_response, nilai_in.id_mapel, items)
+    await db.commit()
+    invalidate_grade_statistics(stale)
+    return response
 
 @router.get("/siswa/me", response_model=List[schemas.NilaiResponse])
-def get_my_nilai(
-    db: Session = Depends(get_db),
+async def get_my_nilai(
+    db: AsyncSession = Depends(get_async_db),
     current_user = Depends(deps.get_current_active_user)
 ):
     if current_user.role != "Siswa":
         raise HTTPException(status_code=400, detail="Only students can view their grades here")
     
-    return db.query(models.Nilai).filter(models.Nilai.id_siswa == current_user.id_siswa).all()
+    return await _nilai_response(db, models.Nilai.id_siswa == current_user.id_siswa)
 
 @router.get("/siswa/{id_siswa}", response_model=List[schemas.NilaiResponse])
-def get_nilai_siswa(
+async def get_nilai_siswa(
     id_siswa: int,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user = Depends(deps.get_current_active_user)
 ):
-    return db.query(models.Nilai).filter(models.Nilai.id_siswa == id_siswa).all()
+    return await _nilai_response(db, models.Nilai.id_siswa == id_siswa)
@@ -0,0 +1,70 @@
+from typing import Optional
+from fastapi import Query, Response
+from sqlalchemy import func, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session, aliased
+
+class PageParams:
+    def __init__(
+        self,
+        cursor: Optional[int] = Query(None, description="Primary key of the last row from the previous page"),
+        skip: int = Query(0, ge=0, description="Legacy offset, prefer cursor"),
+        limit: int = Query(100, ge=1, le=1000),
+        with_total: bool = Query(False, description="Return the filtered row count in X-Total-Count")
+    ):
+        self.cursor = cursor
+        self.skip = skip
+        self.limit = limit
+        self.with_total = with_total
+
+def prefix_filter(column, value: str):
+    # Case-insensitive prefix match with LIKE wildcards in the input escaped
+    return column.istartswith(value, autoescape=True)
+
+def _page_statement(stmt, pk, page: PageParams):
+    # Keyset pagination ordered by primary key
+    if page.with_total:
+        # Window count over the filtered set, computed before the cursor predicate
+        model = stmt.column_descriptions[0]["entity"]
+        subq = stmt.add_columns(func.count().over().label("total")).subquery()
+        entity = aliased(model, subq)
+        key = getattr(entity, pk.key)
+        paged = select(entity, subq.c.total)
+    else:
+        key = pk
+        paged = stmt
+
+    if page.cursor is not None:
+        paged = paged.where(key > page.cursor)
+    return paged.order_by(key).offset(page.skip).limit(page.limit + 1)
+
+def _count_statement(stmt):
+    return select(func.count()).select_from(stmt.order_by(None).subquery())
+
+def _page_items(rows, pk, page: PageParams, response: Response, total=None):
+    # Metadata goes in headers so the body stays a plain list for existing clients
+    has_more = len(rows) > page.limit
+    rows = rows[:page.limit]
+    items = [row[0] for row in rows]
+
+    if page.with_total:
+        if rows:
+            total = rows[0].total
+        response.headers["X-Total-Count"] = str(total)
+    if has_more:
+        response.headers["X-Next-Cursor"] = str(getattr(items[-1], pk.key))
+    return items
+
+def paginate(db: Session, stmt, pk, page: PageParams, response: Response):
+    rows = db.execute(_page_statement(stmt, pk, page)).all()
+    total = None
+    if page.with_total and not rows:
+        total = db.scalar(_count_statement(stmt))
+    return _page_items(rows, pk, page, response, total)
+
+async def apaginate(db: AsyncSession, stmt, pk, page: PageParams, response: Response):
+    rows = (await db.execute(_page_statement(stmt, pk, page))).all()
+    total = None
+    if page.with_total and not rows:
+        total = await db.scalar(_count_statement(stmt))
+    return _page_items(rows, pk, page, response, total)
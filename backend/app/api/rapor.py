@@ -0,0 +1,75 @@
+from datetime import date
+from typing import Optional
+from fastapi import APIRouter, Depends, HTTPException
+from fastapi.responses import StreamingResponse
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from ..database import get_async_db
+from ..models import models
+from ..schemas import master as schemas
+from ..api import deps
+from ..services.rapor import get_job, iter_rapor_zip, job_status, load_class_rapor, semester_period, start_job
+
+router = APIRouter()
+
+@router.post("/kelas/{id_kelas}")
+async def generate_rapor_kelas(
+    id_kelas: int,
+    rapor_in: Optional[schemas.RaporRequest] = None,
+    db: AsyncSession = Depends(get_async_db),
+    current_user = Depends(deps.get_current_active_user)
+):
+    # Report cards are the homeroom teacher's job; admins can print any class
+    if current_user.role != "Admin":
+        wali = await db.scalar(select(models.Guru.id_kelas).where(models.Guru.id_guru == current_user.id_guru))
+        if current_user.role != "Guru" or wali != id_kelas:
+            raise HTTPException(status_code=403, detail="The user doesn't have enough privileges")
+
+    rapor_in = rapor_in or schemas.RaporRequest()
+    today = date.today()
+    try:
+        periode = semester_period(
+            today, rapor_in.semester.value if rapor_in.semester else None, rapor_in.tahun_ajaran
+        )
+    except ValueError as exc:
+        raise HTTPException(status_code=400, detail=str(exc))
+    tanggal_mulai = rapor_in.tanggal_mulai or periode["tanggal_mulai"]
+    tanggal_selesai = rapor_in.tanggal_selesai or periode["tanggal_selesai"]
+    if tanggal_mulai > tanggal_selesai:
+        raise HTTPException(status_code=400, detail="tanggal_mulai harus sebelum tanggal_selesai")
+
+    data = await db.run_sync(
+        load_class_rapor,
+        id_kelas,
+        periode["semester"],
+        periode["tahun_ajaran"],
+        tanggal_mulai,
+        tanggal_selesai,
+        rapor_in.tanggal_rapor or today
+    )
+    if data is None:
+        raise HTTPException(status_code=404, detail="Kelas not found")
+
+    # Progress of the download can be polled at /api/rapor/jobs/{X-Rapor-Job}
+    job = await start_job(db, id_kelas, current_user.id_user, len(data["students"]))
+    filename = f"rapor-{data['header']['kelas']}-{data['header']['jurusan']}-{today.isoformat()}.zip".replace(" ", "_")
+    return StreamingResponse(
+        iter_rapor_zip(job, data["header"], data["students"]),
+        media_type="application/zip",
+        headers={
+            "Content-Disposition": f'attachment; filename="{filename}"',
+            "X-Rapor-Job": job.id_job,
+            "X-Total-Count": str(job.total),
+        }
+    )
+
+@router.get("/jobs/{job_id}")
+async def get_rapor_job(
+    job_id: str,
+    db: AsyncSession = Depends(get_async_db),
+    current_user = Depends(deps.get_current_active_user)
+):
+    job = await get_job(db, job_id)
+    if job is None or (job.id_user != current_user.id_user and current_user.role != "Admin"):
+        raise HTTPException(status_code=404, detail="Job not found")
+    return job_status(job)
@@ -1,53 +1,81 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, File, HTTPException, Response, UploadFile, status
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
-from typing import List
-from ..database import get_db
+from sqlalchemy import select
+from typing import List, Optional
+from ..database import get_async_db, get_db
 from ..models import models
 from ..schemas import master as schemas
 from ..api import deps
+from ..api.pagination import PageParams, apaginate, prefix_filter
+from ..api.imports import import_upload
+from ..services.statistics import invalidate_admin_statistics
+from ..services.grade_statistics import invalidate_grade_statistics
 
 router = APIRouter()
 
 @router.get("/", response_model=List[schemas.SiswaResponse])
-def read_siswa(
-    db: Session = Depends(get_db),
-    skip: int = 0,
-    limit: int = 100,
+async def read_siswa(
+    response: Response,
+    id_kelas: Optional[int] = None,
+    jenis_kelamin: Optional[schemas.JenisKelaminEnum] = None,
+    nama: Optional[str] = None,
+    page: PageParams = Depends(),
+    db: AsyncSession = Depends(get_async_db),
     current_user = Depends(deps.get_current_active_user)
 ):
-    return db.query(models.Siswa).offset(skip).limit(limit).all()
+    stmt = select(models.Siswa)
+    if id_kelas is not None:
+        stmt = stmt.where(models.Siswa.id_kelas == id_kelas)
+    if jenis_kelamin is not None:
+        stmt = stmt.where(models.Siswa.jenis_kelamin == jenis_kelamin.value)
+    if nama:
+        stmt = stmt.where(prefix_filter(models.Siswa.nama, nama))
+    return await apaginate(db, stmt, models.Siswa.id_siswa, page, response)
 
 @router.post("/", response_model=schemas.SiswaResponse)
-def create_siswa(
+async def create_siswa(
     siswa_in: schemas.SiswaCreate,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_admin = Depends(deps.get_current_admin)
 ):
     db_obj = models.Siswa(**siswa_in.model_dump())
     db.add(db_obj)
-    db.commit()
-    db.refresh(db_obj)
+    await db.commit()
+    await db.refresh(db_obj)
+    invalidate_admin_statistics()
+    invalidate_grade_statistics()
     return db_obj
 
+@router.post("/import")
+def import_siswa(
+    file: UploadFile = File(...),
+    dry_run: bool = False,
+    db: Session = Depends(get_db),
+    current_admin = Depends(deps.get_current_admin)
+):
+    # Validation and pandas work are CPU-bound, so this stays a sync (threadpool) endpoint
+    return import_upload(db, "siswa", file, dry_run)
+
 @router.get("/{id_siswa}", response_model=schemas.SiswaResponse)
-def read_siswa_by_id(
+async def read_siswa_by_id(
     id_siswa: int,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user = Depends(deps.get_current_active_user)
 ):
-    db_obj = db.query(models.Siswa).filter(models.Siswa.id_siswa == id_siswa).first()
+    db_obj = await db.get(models.Siswa, id_siswa)
     if not db_obj:
         raise HTTPException(status_code=404, detail="Siswa not found")
     return db_obj
 
 @router.put("/{id_siswa}", response_model=schemas.SiswaResponse)
-def update_siswa(
+async def update_siswa(
     id_siswa: int,
     siswa_in: schemas.SiswaCreate,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_admin = Depends(deps.get_current_admin)
 ):
-    db_obj = db.query(models.Siswa).filter(models.Siswa.id_siswa == id_siswa).first()
+    db_obj = await db.get(models.Siswa, id_siswa)
     if not db_obj:
         raise HTTPException(status_code=404, detail="Siswa not found")
     
@@ -56,19 +84,23 @@ def update_siswa(
         setattr(db_obj, key, value)
     
     db.add(db_obj)
-    db.commit()
-    db.refresh(db_obj)
+    await db.commit()
+    await db.refresh(db_obj)
+    invalidate_admin_statistics()
+    invalidate_grade_statistics()
     return db_obj
 
 @router.delete("/{id_siswa}")
-def delete_siswa(
+async def delete_siswa(
     id_siswa: int,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_admin = Depends(deps.get_current_admin)
 ):
-    db_obj = db.query(models.Siswa).filter(models.Siswa.id_siswa == id_siswa).first()
+    db_obj = await db.get(models.Siswa, id_siswa)
     if not db_obj:
         raise HTTPException(status_code=404, detail="Siswa not found")
-    db.delete(db_obj)
-    db.commit()
+    await db.delete(db_obj)
+    await db.commit()
+    invalidate_admin_statistics()
+    invalidate_grade_statistics()
     return {"message": "Siswa deleted successfully"}
@@ -0,0 +1,44 @@
+from typing import Dict, Optional
+from starlette.datastructures import Headers
+from starlette.responses import JSONResponse
+from starlette.types import ASGIApp, Receive, Scope, Send
+
+BODY_METHODS = ("POST", "PUT", "PATCH")
+
+# Refuses oversized request bodies from the Content-Length header alone, before
+# Starlette spools a multipart upload to disk. `limits` maps a path prefix to the
+# largest body it accepts; a body without Content-Length (chunked) is refused too,
+# since its size is only known once it has been read.
+class BodySizeLimitMiddleware:
+    def __init__(self, app: ASGIApp, limits: Dict[str, int]):
+        self.app = app
+        self.limits = limits
+
+    def _limit(self, path: str) -> Optional[int]:
+        for prefix, limit in self.limits.items():
+            if path == prefix or path.startswith(prefix.rstrip("/") + "/"):
+                return limit
+        return None
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        if scope["type"] != "http" or scope["method"] not in BODY_METHODS:
+            await self.app(scope, receive, send)
+            return
+        limit = self._limit(scope["path"])
+        if limit is None:
+            await self.app(scope, receive, send)
+            return
+
+        length = Headers(scope=scope).get("content-length")
+        if length is None or not length.isdigit():
+            response = JSONResponse({"detail": "Content-Length required"}, status_code=411)
+        elif int(length) > limit:
+            response = JSONResponse(
+                {"detail": f"Request body exceeds {limit // (1024 * 1024)} MB"},
+                status_code=413,
+                headers={"Connection": "close"}
+            )
+        else:
+            await self.app(scope, receive, send)
+            return
+        await response(scope, receive, send)
@@ -0,0 +1,88 @@
+import asyncio
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Hashable, Iterable
+
+# In-process LRU cache with per-entry TTL. Entries carry tags so writers can
+# drop exactly the entries built from the rows they changed (per worker only).
+class TTLCache:
+    def __init__(self, ttl: float, maxsize: int = 256):
+        self.ttl = ttl
+        self.maxsize = maxsize
+        self._data: "OrderedDict[Hashable, tuple]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._key_locks: dict = {}
+        self._async_key_locks: dict = {}
+        self._generation = 0
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None:
+                return default
+            expires_at, value, _ = entry
+            if expires_at < time.monotonic():
+                del self._data[key]
+                return default
+            self._data.move_to_end(key)
+            return value
+
+    def set(self, key: Hashable, value: Any, tags: Iterable[str] = (), generation: int = None):
+        with self._lock:
+            # Drop results computed before an invalidation that ran meanwhile
+            if generation is not None and generation != self._generation:
+                return
+            self._data[key] = (time.monotonic() + self.ttl, value, frozenset(tags))
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def get_or_set(self, key: Hashable, factory: Callable[[], Any], tags: Iterable[str] = ()) -> Any:
+        missing = object()
+        value = self.get(key, missing)
+        if value is not missing:
+            return value
+
+        # Only one thread per key runs the factory; the others wait for its result
+        with self._lock:
+            key_lock = self._key_locks.setdefault(key, threading.Lock())
+        with key_lock:
+            value = self.get(key, missing)
+            if value is missing:
+                with self._lock:
+                    generation = self._generation
+                value = factory()
+                self.set(key, value, tags, generation=generation)
+        with self._lock:
+            self._key_locks.pop(key, None)
+        return value
+
+    async def aget_or_set(self, key: Hashable, factory: Callable[[], Awaitable[Any]], tags: Iterable[str] = ()) -> Any:
+        # Event-loop flavour of get_or_set: waiters yield instead of blocking a thread
+        missing = object()
+        value = self.get(key, missing)
+        if value is not missing:
+            return value
+
+        key_lock = self._async_key_locks.setdefault(key, asyncio.Lock())
+        async with key_lock:
+            value = self.get(key, missing)
+            if value is missing:
+                generation = self._generation
+                value = await factory()
+                self.set(key, value, tags, generation=generation)
+        self._async_key_locks.pop(key, None)
+        return value
+
+    def invalidate(self, *tags: str):
+        with self._lock:
+            self._generation += 1
+            wanted = set(tags)
+            for key in [k for k, (_, _, t) in self._data.items() if t & wanted]:
+                del self._data[key]
+
+    def clear(self):
+        with self._lock:
+            self._generation += 1
+            self._data.clear()
@@ -0,0 +1,78 @@
+import asyncio
+import multiprocessing
+import os
+import threading
+from concurrent.futures import Future, ProcessPoolExecutor
+import bcrypt
+
+HASH_POOL_WORKERS = int(os.getenv("HASH_POOL_WORKERS", str(max(1, (os.cpu_count() or 2) // 2))))
+# Jobs running or waiting; anything beyond is refused instead of queued
+HASH_QUEUE_LIMIT = int(os.getenv("HASH_QUEUE_LIMIT", "32"))
+HASH_RETRY_AFTER = int(os.getenv("HASH_RETRY_AFTER", "2"))
+
+class HashingBusy(Exception):
+    def __init__(self, retry_after: int = HASH_RETRY_AFTER):
+        super().__init__("Password hashing queue is full")
+        self.retry_after = retry_after
+
+# Run in the worker processes; must stay importable top-level functions
+def _checkpw(plain_password: str, hashed_password: str) -> bool:
+    try:
+        return bcrypt.checkpw(plain_password.encode("utf-8"), hashed_password.encode("utf-8"))
+    except Exception:
+        return False
+
+def _hashpw(password: str, rounds: int) -> str:
+    return bcrypt.hashpw(password.encode("utf-8"), bcrypt.gensalt(rounds=rounds)).decode("utf-8")
+
+class HashingPool:
+    def __init__(self, workers: int, queue_limit: int):
+        self.workers = workers
+        self.queue_limit = queue_limit
+        self._executor = None
+        self._in_flight = 0
+        self._lock = threading.Lock()
+
+    def _get_executor(self) -> ProcessPoolExecutor:
+        if self._executor is None:
+            # spawn: forking a process that already runs threads is unsafe
+            self._executor = ProcessPoolExecutor(
+                max_workers=self.workers,
+                mp_context=multiprocessing.get_context("spawn")
+            )
+        return self._executor
+
+    def _release(self, _future):
+        with self._lock:
+            self._in_flight -= 1
+
+    def submit(self, fn, *args) -> Future:
+        with self._lock:
+            if self._in_flight >= self.queue_limit:
+                raise HashingBusy()
+            self._in_flight += 1
+            try:
+                future = self._get_executor().submit(fn, *args)
+            except Exception:
+                self._in_flight -= 1
+                raise
+        future.add_done_callback(self._release)
+        return future
+
+    @property
+    def in_flight(self) -> int:
+        return self._in_flight
+
+    def shutdown(self):
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=False, cancel_futures=True)
+
+hashing_pool = HashingPool(HASH_POOL_WORKERS, HASH_QUEUE_LIMIT)
+
+def run(fn, *args):
+    return hashing_pool.submit(fn, *args).result()
+
+async def arun(fn, *args):
+    return await asyncio.wrap_future(hashing_pool.submit(fn, *args))
@@ -0,0 +1,55 @@
+import os
+import threading
+import time
+from collections import OrderedDict, deque
+
+LOGIN_MAX_FAILURES = int(os.getenv("LOGIN_MAX_FAILURES", "5"))
+LOGIN_FAILURE_WINDOW = int(os.getenv("LOGIN_FAILURE_WINDOW", "300"))
+LOGIN_LOCKOUT_SECONDS = int(os.getenv("LOGIN_LOCKOUT_SECONDS", "300"))
+
+# Per-username failed login tracking, checked before any bcrypt work is done
+class LoginThrottle:
+    def __init__(self, max_failures: int, window: int, lockout: int, max_entries: int = 10000):
+        self.max_failures = max_failures
+        self.window = window
+        self.lockout = lockout
+        self.max_entries = max_entries
+        self._failures: "OrderedDict[str, deque]" = OrderedDict()
+        self._locked_until: dict = {}
+        self._lock = threading.Lock()
+
+    def retry_after(self, username: str) -> int:
+        with self._lock:
+            until = self._locked_until.get(username)
+            if until is None:
+                return 0
+            remaining = until - time.monotonic()
+            if remaining <= 0:
+                del self._locked_until[username]
+                return 0
+            return int(remaining) + 1
+
+    def record_failure(self, username: str):
+        now = time.monotonic()
+        with self._lock:
+            failures = self._failures.pop(username, None) or deque()
+            failures.append(now)
+            while failures and failures[0] < now - self.window:
+                failures.popleft()
+
+            if len(failures) >= self.max_failures:
+                self._locked_until[username] = now + self.lockout
+            else:
+                self._failures[username] = failures
+
+            while len(self._failures) > self.max_entries:
+                self._failures.popitem(last=False)
+            if len(self._locked_until) > self.max_entries:
+                self._locked_until = {u: t for u, t in self._locked_until.items() if t > now}
+
+    def reset(self, username: str):
+        with self._lock:
+            self._failures.pop(username, None)
+            self._locked_until.pop(username, None)
+
+login_throttle = LoginThrottle(LOGIN_MAX_FAILURES, LOGIN_FAILURE_WINDOW, LOGIN_LOCKOUT_SECONDS)
@@ -0,0 +1,191 @@
+import logging
+import os
+import re
+import threading
+import time
+from bisect import bisect_left
+from collections import Counter as Tally
+from contextvars import ContextVar
+from typing import Optional
+from sqlalchemy import event
+
+logger = logging.getLogger(__name__)
+
+# Debug mode: warn when one request runs the same statement shape more than N times
+METRICS_DEBUG = os.getenv("METRICS_DEBUG", "false").lower() in ("1", "true", "yes")
+N_PLUS_ONE_THRESHOLD = int(os.getenv("N_PLUS_ONE_THRESHOLD", "10"))
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+STATEMENT_BUCKETS = (0, 1, 2, 3, 5, 10, 20, 50, 100, 250)
+
+def _escape(value) -> str:
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+def _labels(names, values) -> str:
+    if not names:
+        return ""
+    return "{" + ",".join(f'{name}="{_escape(value)}"' for name, value in zip(names, values)) + "}"
+
+class Counter:
+    def __init__(self, name: str, documentation: str, labelnames=()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._values = Tally()
+        self._lock = threading.Lock()
+
+    def inc(self, amount: float = 1, **labels):
+        key = tuple(labels[name] for name in self.labelnames)
+        with self._lock:
+            self._values[key] += amount
+
+    def render(self) -> list:
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} counter"]
+        with self._lock:
+            for key, value in sorted(self._values.items()):
+                lines.append(f"{self.name}{_labels(self.labelnames, key)} {value}")
+        return lines
+
+class Histogram:
+    def __init__(self, name: str, documentation: str, labelnames=(), buckets=LATENCY_BUCKETS):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self.buckets = tuple(buckets)
+        # key -> [per-bucket counts (+Inf last), sum, count]
+        self._series = {}
+        self._lock = threading.Lock()
+
+    def observe(self, value: float, **labels):
+        key = tuple(labels[name] for name in self.labelnames)
+        index = bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._series.get(key)
+            if series is None:
+                series = self._series[key] = [[0] * (len(self.buckets) + 1), 0.0, 0]
+            series[0][index] += 1
+            series[1] += value
+            series[2] += 1
+
+    def render(self) -> list:
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} histogram"]
+        names = self.labelnames + ("le",)
+        with self._lock:
+            for key, (counts, total, count) in sorted(self._series.items()):
+                cumulative = 0
+                for bound, bucket_count in zip(self.buckets + ("+Inf",), counts):
+                    cumulative += bucket_count
+                    lines.append(f"{self.name}_bucket{_labels(names, key + (bound,))} {cumulative}")
+                lines.append(f"{self.name}_sum{_labels(self.labelnames, key)} {total}")
+                lines.append(f"{self.name}_count{_labels(self.labelnames, key)} {count}")
+        return lines
+
+REQUEST_LATENCY = Histogram(
+    "http_request_duration_seconds", "Request latency by route", ("method", "route", "status")
+)
+REQUEST_STATEMENTS = Histogram(
+    "db_statements_per_request", "SQL statements executed per request", ("method", "route"), STATEMENT_BUCKETS
+)
+REQUEST_DB_TIME = Histogram(
+    "db_time_per_request_seconds", "Time spent executing SQL per request", ("method", "route")
+)
+N_PLUS_ONE = Counter(
+    "db_repeated_statement_requests_total",
+    f"Requests that ran one statement shape more than {N_PLUS_ONE_THRESHOLD} times", ("method", "route")
+)
+
+class RequestStats:
+    __slots__ = ("statements", "db_time", "fingerprints")
+
+    def __init__(self):
+        self.statements = 0
+        self.db_time = 0.0
+        self.fingerprints = Tally()
+
+# Set by the middleware in main.py; run_in_threadpool copies the context, so sync
+# endpoints and AsyncSession greenlets all write into the same object
+request_stats: ContextVar[Optional[RequestStats]] = ContextVar("request_stats", default=None)
+
+_WHITESPACE = re.compile(r"\s+")
+_IN_LIST = re.compile(r"\((?:\s*(?:\?|%s|%\(\w+\)s|\$\d+|__\[POSTCOMPILE_\w+\])\s*,?)+\)")
+_NUMBER = re.compile(r"\b\d+\b")
+_STRING = re.compile(r"'(?:[^']|'')*'")
+
+def fingerprint(statement: str) -> str:
+    # Statement shape: literals and IN-lists of any length collapse to one placeholder
+    shape = _STRING.sub("?", statement)
+    shape = _IN_LIST.sub("(?)", shape)
+    shape = _NUMBER.sub("?", shape)
+    return _WHITESPACE.sub(" ", shape).strip()
+
+def attach(engine):
+    @event.listens_for(engine, "before_cursor_execute")
+    def _before(conn, cursor, statement, parameters, context, executemany):
+        if request_stats.get() is not None:
+            conn.info.setdefault("query_started", []).append(time.perf_counter())
+
+    @event.listens_for(engine, "after_cursor_execute")
+    def _after(conn, cursor, statement, parameters, context, executemany):
+        stats = request_stats.get()
+        if stats is None:
+            return
+        started = conn.info.get("query_started")
+        if started:
+            stats.db_time += time.perf_counter() - started.pop()
+        stats.statements += 1
+        if METRICS_DEBUG:
+            stats.fingerprints[fingerprint(statement)] += 1
+
+def route_template(scope) -> str:
+    # Included routers report their path relative to the prefix; rebuild the full
+    # template from the matched path so labels stay bounded (/api/siswa/{id_siswa})
+    route = scope.get("route")
+    template = getattr(route, "path_format", None)
+    if template is None:
+        # Mounted apps (uploads) only leave their prefix behind in root_path
+        root_path = scope.get("root_path", "")
+        if root_path and root_path != scope.get("app_root_path", ""):
+            return root_path + "/{path}"
+        return "unmatched"
+    prefix = scope["path"].rsplit("/", template.count("/"))[0] if template else scope["path"]
+    return prefix + template
+
+def observe_request(method: str, route: str, status: int, seconds: float, stats: RequestStats):
+    REQUEST_LATENCY.observe(seconds, method=method, route=route, status=status)
+    REQUEST_STATEMENTS.observe(stats.statements, method=method, route=route)
+    REQUEST_DB_TIME.observe(stats.db_time, method=method, route=route)
+
+    if METRICS_DEBUG and stats.fingerprints:
+        shape, count = stats.fingerprints.most_common(1)[0]
+        if count > N_PLUS_ONE_THRESHOLD:
+            N_PLUS_ONE.inc(method=method, route=route)
+            logger.warning(
+                "Possible N+1 on %s %s: same statement ran %d times in one request: %s",
+                method, route, count, shape[:500]
+            )
+
+def _pool_lines(monitors) -> list:
+    series = {
+        "db_pool_checkouts_total": ("counter", "Connections checked out of the pool", "checkouts"),
+        "db_pool_checkout_timeouts_total": ("counter", "Checkouts that hit the pool timeout", "timeouts"),
+        "db_pool_wait_seconds_total": ("counter", "Time spent waiting for a pooled connection", "wait_total"),
+        "db_pool_wait_seconds_max": ("gauge", "Longest wait for a pooled connection", "wait_max"),
+    }
+    lines = []
+    for name, (kind, documentation, attribute) in series.items():
+        lines += [f"# HELP {name} {documentation}", f"# TYPE {name} {kind}"]
+        lines += [f'{name}{{pool="{m.name}"}} {getattr(m, attribute)}' for m in monitors]
+
+    lines += ["# HELP db_pool_checked_out Connections currently checked out", "# TYPE db_pool_checked_out gauge"]
+    for monitor in monitors:
+        pool = monitor.pool
+        if pool is not None and hasattr(pool, "checkedout"):
+            lines.append(f'db_pool_checked_out{{pool="{monitor.name}"}} {pool.checkedout()}')
+    return lines
+
+def render(monitors=()) -> str:
+    lines = []
+    for metric in (REQUEST_LATENCY, REQUEST_STATEMENTS, REQUEST_DB_TIME, N_PLUS_ONE):
+        lines += metric.render()
+    lines += _pool_lines(monitors)
+    return "\n".join(lines) + "\n"
@@ -0,0 +1,89 @@
+import zlib
+from typing import List
+
+# Just enough PDF 1.4 for text, lines and boxes on A4 with the built-in Helvetica faces:
+# no fonts to embed, no dependency, and a page renders in about a millisecond.
+A4 = (595.0, 842.0)
+FONTS = {"regular": "Helvetica", "bold": "Helvetica-Bold"}
+
+# Helvetica advance widths (1/1000 em) for ASCII 32..126; used for centring and
+# right-aligning. Bold runs a little wider, close enough for headings.
+_WIDTHS = [
+    278, 278, 355, 556, 556, 889, 667, 191, 333, 333, 389, 584, 278, 333, 278, 278,
+    556, 556, 556, 556, 556, 556, 556, 556, 556, 556, 278, 278, 584, 584, 584, 556,
+    1015, 667, 667, 722, 722, 667, 611, 778, 722, 278, 500, 667, 556, 833, 722, 778,
+    667, 778, 722, 667, 611, 722, 667, 944, 667, 667, 611, 278, 278, 278, 469, 556,
+    333, 556, 556, 500, 556, 556, 278, 556, 556, 222, 222, 500, 222, 833, 556, 556,
+    556, 556, 333, 500, 278, 556, 500, 722, 500, 500, 500, 334, 260, 334, 584,
+]
+
+def text_width(text: str, size: float, bold: bool = False) -> float:
+    units = sum(_WIDTHS[ord(ch) - 32] if 32 <= ord(ch) < 127 else 556 for ch in text)
+    return units * size / 1000 * (1.05 if bold else 1.0)
+
+def _escape(text: str) -> bytes:
+    # WinAnsiEncoding covers Indonesian names; anything else becomes "?"
+    raw = text.encode("cp1252", errors="replace")
+    return raw.replace(b"\\", b"\\\\").replace(b"(", b"\\(").replace(b")", b"\\)")
+
+class Page:
+    def __init__(self, size=A4):
+        self.width, self.height = size
+        self._ops: List[bytes] = []
+
+    def text(self, x: float, y: float, text: str, size: float = 10, bold: bool = False, align: str = "left"):
+        # y is measured from the top of the page, like every layout on screen
+        if align != "left":
+            width = text_width(text, size, bold)
+            x -= width / 2 if align == "center" else width
+        font = b"/F2" if bold else b"/F1"
+        self._ops.append(
+            b"BT %s %.2f Tf %.2f %.2f Td (%s) Tj ET" % (font, size, x, self.height - y, _escape(text))
+        )
+
+    def line(self, x1: float, y1: float, x2: float, y2: float, width: float = 0.5):
+        self._ops.append(b"%.2f w %.2f %.2f m %.2f %.2f l S" % (width, x1, self.height - y1, x2, self.height - y2))
+
+    def rect(self, x: float, y: float, w: float, h: float, width: float = 0.5, fill: float = None):
+        # fill: grey level 0 (black) .. 1 (white)
+        box = b"%.2f %.2f %.2f %.2f re" % (x, self.height - y - h, w, h)
+        if fill is None:
+            self._ops.append(b"%.2f w %s S" % (width, box))
+        else:
+            self._ops.append(b"q %.2f g %.2f w %s B Q" % (fill, width, box))
+
+    def content(self) -> bytes:
+        return b"\n".join(self._ops)
+
+def render(pages: List[Page], title: str = "") -> bytes:
+    # Objects: 1 catalog, 2 page tree, 3-4 fonts, 5 info, then (page, content) pairs
+    objects = [
+        None,
+        None,
+        b"<< /Type /Font /Subtype /Type1 /BaseFont /%s /Encoding /WinAnsiEncoding >>" % FONTS["regular"].encode(),
+        b"<< /Type /Font /Subtype /Type1 /BaseFont /%s /Encoding /WinAnsiEncoding >>" % FONTS["bold"].encode(),
+        b"<< /Title (%s) >>" % _escape(title),
+    ]
+    kids = []
+    for page in pages:
+        stream = zlib.compress(page.content(), 6)
+        page_id, content_id = len(objects) + 1, len(objects) + 2
+        kids.append(b"%d 0 R" % page_id)
+        objects.append(
+            b"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 %.2f %.2f] /Contents %d 0 R "
+            b"/Resources << /Font << /F1 3 0 R /F2 4 0 R >> >> >>" % (page.width, page.height, content_id)
+        )
+        objects.append(b"<< /Length %d /Filter /FlateDecode >>\nstream\n%s\nendstream" % (len(stream), stream))
+    objects[0] = b"<< /Type /Catalog /Pages 2 0 R >>"
+    objects[1] = b"<< /Type /Pages /Kids [%s] /Count %d >>" % (b" ".join(kids), len(kids))
+
+    out = bytearray(b"%PDF-1.4\n%\xe2\xe3\xcf\xd3\n")
+    offsets = []
+    for number, body in enumerate(objects, start=1):
+        offsets.append(len(out))
+        out += b"%d 0 obj\n%s\nendobj\n" % (number, body)
+    xref = len(out)
+    out += b"xref\n0 %d\n0000000000 65535 f \n" % (len(objects) + 1)
+    out += b"".join(b"%010d 00000 n \n" % offset for offset in offsets)
+    out += b"trailer\n<< /Size %d /Root 1 0 R /Info 5 0 R >>\nstartxref\n%d\n%%%%EOF\n" % (len(objects) + 1, xref)
+    return bytes(out)
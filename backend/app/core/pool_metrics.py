@@ -0,0 +1,137 @@
+import threading
+import time
+from collections import defaultdict, deque
+from contextvars import ContextVar
+from typing import Optional
+from sqlalchemy import event, exc
+from sqlalchemy.pool import AsyncAdaptedQueuePool, QueuePool
+from .metrics import route_template
+
+# ASGI scope of the request currently running, set by the middleware in main.py.
+# The route is read at checkout time, once the router has matched it.
+current_request: ContextVar[Optional[dict]] = ContextVar("current_request", default=None)
+
+def current_route() -> str:
+    # Same labels as the request metrics: "GET /api/siswa/{id_siswa}"
+    scope = current_request.get()
+    if scope is None:
+        return "-"
+    return f"{scope['method']} {route_template(scope)}"
+
+class PoolMonitor:
+    def __init__(self, name: str, window: int = 1000):
+        self.name = name
+        self.engine = None
+        self._lock = threading.Lock()
+        self._waits = deque(maxlen=window)
+        self.checkouts = 0
+        self.timeouts = 0
+        self.wait_total = 0.0
+        self.wait_max = 0.0
+        self._holds = defaultdict(lambda: {"count": 0, "total": 0.0, "max": 0.0})
+
+    def record_wait(self, seconds: float):
+        with self._lock:
+            self.checkouts += 1
+            self.wait_total += seconds
+            self.wait_max = max(self.wait_max, seconds)
+            self._waits.append(seconds)
+
+    def record_timeout(self):
+        with self._lock:
+            self.timeouts += 1
+
+    def record_hold(self, route: str, seconds: float):
+        with self._lock:
+            hold = self._holds[route]
+            hold["count"] += 1
+            hold["total"] += seconds
+            hold["max"] = max(hold["max"], seconds)
+
+    @property
+    def pool(self):
+        # Looked up on every read: engine.dispose() swaps in a new pool
+        return self.engine.pool if self.engine is not None else None
+
+    def attach(self, engine):
+        self.engine = engine
+        engine.pool._monitor = self
+
+        @event.listens_for(engine, "checkout")
+        def _on_checkout(dbapi_connection, connection_record, connection_proxy):
+            connection_record.info["checkout_at"] = time.perf_counter()
+            connection_record.info["checkout_route"] = current_route()
+
+        @event.listens_for(engine, "checkin")
+        def _on_checkin(dbapi_connection, connection_record):
+            started = connection_record.info.pop("checkout_at", None)
+            if started is not None:
+                self.record_hold(
+                    connection_record.info.pop("checkout_route", "-"),
+                    time.perf_counter() - started
+                )
+
+    def snapshot(self) -> dict:
+        pool = self.pool
+        with self._lock:
+            waits = sorted(self._waits)
+            holds = {
+                route: {
+                    "count": h["count"],
+                    "avg_ms": round(h["total"] / h["count"] * 1000, 2),
+                    "max_ms": round(h["max"] * 1000, 2),
+                    "total_ms": round(h["total"] * 1000, 2),
+                }
+                for route, h in sorted(self._holds.items(), key=lambda item: -item[1]["total"])
+            }
+            stats = {
+                "checkouts": self.checkouts,
+                "timeouts": self.timeouts,
+                "wait_avg_ms": round(self.wait_total / self.checkouts * 1000, 3) if self.checkouts else 0,
+                "wait_p95_ms": round(waits[int(len(waits) * 0.95) - 1] * 1000, 3) if waits else 0,
+                "wait_max_ms": round(self.wait_max * 1000, 3),
+            }
+
+        utilization = {}
+        if isinstance(pool, QueuePool):
+            capacity = pool.size() + max(pool._max_overflow, 0)
+            utilization = {
+                "size": pool.size(),
+                "max_overflow": pool._max_overflow,
+                "timeout": pool.timeout(),
+                "checked_out": pool.checkedout(),
+                "checked_in": pool.checkedin(),
+                "overflow": pool.overflow(),
+                "utilization": round(pool.checkedout() / capacity, 3) if capacity > 0 else None,
+            }
+        return {"pool": self.name, **utilization, **stats, "hold_by_route": holds}
+
+class _TimedCheckoutMixin:
+    # Times connect() as a whole; _do_get recurses, so it can't be wrapped
+    def connect(self):
+        monitor = getattr(self, "_monitor", None)
+        if monitor is None:
+            return super().connect()
+        started = time.perf_counter()
+        try:
+            connection = super().connect()
+        except exc.TimeoutError:
+            monitor.record_timeout()
+            raise
+        monitor.record_wait(time.perf_counter() - started)
+        return connection
+
+    def recreate(self):
+        # engine.dispose() replaces the pool with recreate(); the monitor moves along
+        pool = super().recreate()
+        pool._monitor = getattr(self, "_monitor", None)
+        return pool
+
+class InstrumentedQueuePool(_TimedCheckoutMixin, QueuePool):
+    pass
+
+class InstrumentedAsyncQueuePool(_TimedCheckoutMixin, AsyncAdaptedQueuePool):
+    pass
+
+sync_pool_monitor = PoolMonitor("sync")
+async_pool_monitor = PoolMonitor("async")
@@ -0,0 +1,36 @@
+from functools import lru_cache
+from typing import Any, Optional
+import orjson
+from fastapi import Response
+from fastapi.datastructures import Default
+from fastapi.responses import JSONResponse
+from pydantic import TypeAdapter
+
+ORJSON_OPTIONS = orjson.OPT_NON_STR_KEYS | orjson.OPT_SERIALIZE_NUMPY
+
+class ORJSONResponse(JSONResponse):
+    def render(self, content: Any) -> bytes:
+        return orjson.dumps(content, option=ORJSON_OPTIONS)
+
+# Wrapped in Default() so routes with a response_model keep FastAPI's own
+# Pydantic-to-bytes path; orjson only replaces json.dumps for plain dict/list returns.
+default_response_class = Default(ORJSONResponse)
+
+@lru_cache(maxsize=None)
+def type_adapter(tp) -> TypeAdapter:
+    # Building a TypeAdapter compiles a validator/serializer; do it once per type
+    return TypeAdapter(tp)
+
+def _with_headers(body: bytes, response: Optional[Response], status_code: int) -> Response:
+    # Carry over headers set on the injected Response (X-Next-Cursor, X-Total-Count, ...)
+    result = Response(content=body, status_code=status_code, media_type="application/json")
+    if response is not None:
+        for name, value in response.headers.items():
+            if name.lower() not in ("content-length", "content-type"):
+                result.headers.append(name, value)
+    return result
+
+def trusted_json(content: Any, response: Optional[Response] = None, status_code: int = 200) -> Response:
+    # Fast path for content already shaped like the route's response_model, built from
+    # typed database columns: FastAPI would validate it again, this encodes it directly.
+    return _with_headers(orjson.dumps(content, option=ORJSON_OPTIONS), response, status_code)
@@ -0,0 +1,64 @@
+import os
+from alembic import command
+from alembic.config import Config
+from alembic.runtime.migration import MigrationContext
+from alembic.script import ScriptDirectory
+from sqlalchemy import UniqueConstraint, inspect, text
+from ..database import Base, engine
+from ..models import models  # noqa: F401  registers every table on Base.metadata
+
+# Schema changes go through Alembic (backend/migrations); the app never creates tables itself
+ALEMBIC_INI = os.path.join(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))), "alembic.ini")
+
+def alembic_config() -> Config:
+    config = Config(ALEMBIC_INI)
+    config.attributes["configure_logger"] = False
+    return config
+
+def upgrade(revision: str = "head"):
+    # Programmatic `alembic upgrade head`, used by seed.py and the benchmarks
+    config = alembic_config()
+    with engine.connect() as connection:
+        config.attributes["connection"] = connection
+        command.upgrade(config, revision)
+        connection.commit()
+
+def drop_all():
+    # seed.py --reset; forgets the revision too so the next upgrade starts from scratch
+    Base.metadata.drop_all(bind=engine)
+    with engine.begin() as connection:
+        connection.execute(text("DROP TABLE IF EXISTS alembic_version"))
+
+def current_revision(bind=engine):
+    with bind.connect() as connection:
+        return MigrationContext.configure(connection).get_current_revision()
+
+def head_revision() -> str:
+    return ScriptDirectory.from_config(alembic_config()).get_current_head()
+
+def _expected(table):
+    for index in table.indexes:
+        yield "index", index.name, tuple(getattr(c, "name", None) or str(c) for c in index.expressions)
+    for constraint in table.constraints:
+        if isinstance(constraint, UniqueConstraint):
+            yield "unique", constraint.name, tuple(c.name for c in constraint.columns)
+
+def missing_indexes(bind=engine) -> list:
+    # Indexes and unique keys declared on the models that the database lacks,
+    # matched by name, or by column list for unnamed constraints
+    inspector = inspect(bind)
+    tables = set(inspector.get_table_names())
+    missing = []
+    for table in Base.metadata.sorted_tables:
+        if table.name not in tables:
+            missing.append({"table": table.name, "kind": "table", "name": None, "columns": []})
+            continue
+        present = inspector.get_indexes(table.name) + inspector.get_unique_constraints(table.name)
+        names = {item["name"] for item in present}
+        # Expression indexes (DESC) report no column names on some backends
+        shapes = {tuple(item.get("column_names") or ()) for item in present}
+        for kind, name, columns in _expected(table):
+            if (name and name in names) or (not name and columns in shapes):
+                continue
+            missing.append({"table": table.name, "kind": kind, "name": name, "columns": list(columns)})
+    return missing
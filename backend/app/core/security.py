@@ -7,26 +7,35 @@ from dotenv import load_dotenv
 
 load_dotenv()
 
-import bcrypt
+from . import hashing
 
 SECRET_KEY = os.getenv("SECRET_KEY", "your_secret_key_here")
 ALGORITHM = os.getenv("ALGORITHM", "HS256")
 ACCESS_TOKEN_EXPIRE_MINUTES = int(os.getenv("ACCESS_TOKEN_EXPIRE_MINUTES", "30"))
 REFRESH_TOKEN_EXPIRE_MINUTES = int(os.getenv("REFRESH_TOKEN_EXPIRE_MINUTES", "10080"))
+BCRYPT_ROUNDS = int(os.getenv("BCRYPT_ROUNDS", "12"))
+
+# bcrypt runs in the bounded process pool from core.hashing; both flavours
+# raise hashing.HashingBusy when the pool's queue is full
 
 def verify_password(plain_password: str, hashed_password: str) -> bool:
-    try:
-        password_byte_enc = plain_password.encode('utf-8')
-        hashed_password_byte_enc = hashed_password.encode('utf-8')
-        return bcrypt.checkpw(password_byte_enc, hashed_password_byte_enc)
-    except Exception:
-        return False
+    return hashing.run(hashing._checkpw, plain_password, hashed_password)
 
 def get_password_hash(password: str) -> str:
-    pwd_bytes = password.encode('utf-8')
-    salt = bcrypt.gensalt()
-    hashed_password = bcrypt.hashpw(pwd_bytes, salt)
-    return hashed_password.decode('utf-8')
+    return hashing.run(hashing._hashpw, password, BCRYPT_ROUNDS)
+
+async def averify_password(plain_password: str, hashed_password: str) -> bool:
+    return await hashing.arun(hashing._checkpw, plain_password, hashed_password)
+
+async def aget_password_hash(password: str) -> str:
+    return await hashing.arun(hashing._hashpw, password, BCRYPT_ROUNDS)
+
+def needs_rehash(hashed_password: str) -> bool:
+    # $2b$<cost>$<salt+hash>
+    try:
+        return int(hashed_password.split("$")[2]) != BCRYPT_ROUNDS
+    except (IndexError, ValueError):
+        return False
 
 def create_access_token(data: dict, expires_delta: Optional[timedelta] = None):
     to_encode = data.copy()
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, Text, Date, ForeignKey, Enum, TIMESTAMP, func
+from sqlalchemy import Boolean, Column, Integer, String, Text, Date, ForeignKey, Enum, TIMESTAMP, Index, UniqueConstraint, false, func
 from sqlalchemy.orm import relationship
 from app.database import Base
 
@@ -16,7 +16,7 @@ class Kelas(Base):
 class Siswa(Base):
     __tablename__ = "siswa"
     id_siswa = Column(Integer, primary_key=True, index=True)
-    id_kelas = Column(Integer, ForeignKey("kelas.id_kelas"))
+    id_kelas = Column(Integer, ForeignKey("kelas.id_kelas"), index=True)
     nisn = Column(String(20), unique=True, index=True)
     nama = Column(String(100), nullable=False)
     jenis_kelamin = Column(Enum('Laki-laki', 'Perempuan', name='jk_siswa_enum'))
@@ -55,7 +55,7 @@ class MataPelajaran(Base):
 class MapelDiampu(Base):
     __tablename__ = "mapel_diampu"
     id_ampu = Column(Integer, primary_key=True, index=True)
-    id_guru = Column(Integer, ForeignKey("guru.id_guru"))
+    id_guru = Column(Integer, ForeignKey("guru.id_guru"), index=True)
     id_kelas = Column(Integer, ForeignKey("kelas.id_kelas"))
     id_mapel = Column(Integer, ForeignKey("mata_pelajaran.id_mapel"))
 
@@ -65,6 +65,9 @@ class MapelDiampu(Base):
 
 class Nilai(Base):
     __tablename__ = "nilai"
+    __table_args__ = (
+        UniqueConstraint("id_siswa", "id_mapel", name="uq_nilai_siswa_mapel"),
+    )
     id_nilai = Column(Integer, primary_key=True, index=True)
     id_siswa = Column(Integer, ForeignKey("siswa.id_siswa"))
     id_mapel = Column(Integer, ForeignKey("mata_pelajaran.id_mapel"))
@@ -77,6 +80,13 @@ class Nilai(Base):
 
 class Absensi(Base):
     __tablename__ = "absensi"
+    __table_args__ = (
+        UniqueConstraint("id_siswa", "tanggal", name="uq_absensi_siswa_tanggal"),
+        # Class roster / recap / export by date range
+        Index("ix_absensi_kelas_tanggal", "id_kelas", "tanggal"),
+        # School-wide recap of the months not yet rolled up
+        Index("ix_absensi_tanggal", "tanggal"),
+    )
     id_absensi = Column(Integer, primary_key=True, index=True)
     id_siswa = Column(Integer, ForeignKey("siswa.id_siswa"))
     id_kelas = Column(Integer, ForeignKey("kelas.id_kelas"))
@@ -86,6 +96,50 @@ class Absensi(Base):
     siswa = relationship("Siswa", back_populates="absensi")
     kelas = relationship("Kelas", back_populates="absensi")
 
+class RingkasanSiswa(Base):
+    # Precomputed per-student dashboard figures, refreshed on nilai/absensi writes
+    __tablename__ = "ringkasan_siswa"
+    id_siswa = Column(Integer, ForeignKey("siswa.id_siswa", ondelete="CASCADE"), primary_key=True)
+    jumlah_nilai = Column(Integer, nullable=False, default=0, server_default="0")
+    total_nilai = Column(Integer, nullable=False, default=0, server_default="0")
+    hadir = Column(Integer, nullable=False, default=0, server_default="0")
+    izin = Column(Integer, nullable=False, default=0, server_default="0")
+    sakit = Column(Integer, nullable=False, default=0, server_default="0")
+    alpa = Column(Integer, nullable=False, default=0, server_default="0")
+
+class RekapAbsensiBulanan(Base):
+    # Absensi of closed months counted per class and student, see services/attendance_recap.py
+    __tablename__ = "rekap_absensi_bulanan"
+    __table_args__ = (
+        Index("ix_rekap_absensi_bulanan_siswa", "id_siswa", "bulan"),
+    )
+    bulan = Column(Date, primary_key=True)
+    id_kelas = Column(Integer, ForeignKey("kelas.id_kelas", ondelete="CASCADE"), primary_key=True)
+    id_siswa = Column(Integer, ForeignKey("siswa.id_siswa", ondelete="CASCADE"), primary_key=True)
+    hadir = Column(Integer, nullable=False, default=0, server_default="0")
+    izin = Column(Integer, nullable=False, default=0, server_default="0")
+    sakit = Column(Integer, nullable=False, default=0, server_default="0")
+    alpa = Column(Integer, nullable=False, default=0, server_default="0")
+
+class RekapAbsensiPeriode(Base):
+    # Months whose rekap_absensi_bulanan rows are complete
+    __tablename__ = "rekap_absensi_periode"
+    bulan = Column(Date, primary_key=True)
+    dibuat = Column(TIMESTAMP, server_default=func.now())
+
+class RaporJob(Base):
+    # Progress of one rapor ZIP download, shared by every worker, see services/rapor.py
+    __tablename__ = "rapor_job"
+    id_job = Column(String(32), primary_key=True)
+    id_kelas = Column(Integer, ForeignKey("kelas.id_kelas", ondelete="CASCADE"), nullable=False)
+    id_user = Column(Integer, ForeignKey("pengguna.id_user", ondelete="CASCADE"), nullable=False)
+    total = Column(Integer, nullable=False, default=0, server_default="0")
+    selesai = Column(Integer, nullable=False, default=0, server_default="0")
+    gagal = Column(Integer, nullable=False, default=0, server_default="0")
+    status = Column(String(20), nullable=False, default="berjalan", server_default="berjalan")
+    mulai = Column(TIMESTAMP, nullable=False)
+    berakhir = Column(TIMESTAMP, nullable=True)
+
 class Berita(Base):
     __tablename__ = "berita"
     id_berita = Column(Integer, primary_key=True, index=True)
@@ -93,10 +147,15 @@ class Berita(Base):
     judul = Column(String(150))
     isi = Column(Text)
     gambar = Column(String(255), nullable=True)
+    # Set by the image pool once every resized variant of gambar is on disk
+    varian_siap = Column(Boolean, nullable=False, default=False, server_default=false())
     tanggal_post = Column(TIMESTAMP, server_default=func.now())
 
     pengguna = relationship("Pengguna", back_populates="berita")
 
+# Serves the (tanggal_post, id_berita) DESC keyset pagination of the news feed
+Index("ix_berita_tanggal_post", Berita.tanggal_post.desc(), Berita.id_berita.desc())
+
 class Pengguna(Base):
     __tablename__ = "pengguna"
     id_user = Column(Integer, primary_key=True, index=True)
@@ -105,6 +164,8 @@ class Pengguna(Base):
     username = Column(String(50), unique=True, index=True)
     password = Column(String(255), nullable=False)
     role = Column(Enum('Admin', 'Guru', 'Siswa', name='role_enum'), nullable=False)
+    # Bumped to revoke every token issued before (password change, etc.)
+    token_version = Column(Integer, nullable=False, default=0, server_default="0")
 
     guru = relationship("Guru", back_populates="pengguna")
     siswa = relationship("Siswa", back_populates="pengguna")
@@ -15,6 +15,10 @@ class Token(BaseModel):
 class TokenData(BaseModel):
     username: Optional[str] = None
     role: Optional[str] = None
+    id_user: Optional[int] = None
+    id_guru: Optional[int] = None
+    id_siswa: Optional[int] = None
+    token_version: int = 0
 
 class UserBase(BaseModel):
     username: str
@@ -1,5 +1,5 @@
 from pydantic import BaseModel, EmailStr
-from typing import Optional, List
+from typing import Optional, List, Dict
 from datetime import date
 from enum import Enum
 
@@ -11,6 +11,31 @@ class KategoriMapelEnum(str, Enum):
     Umum = "Umum"
     Kejuruan = "Kejuruan"
 
+class StatusAbsensiEnum(str, Enum):
+    Hadir = "Hadir"
+    Izin = "Izin"
+    Sakit = "Sakit"
+    Alpa = "Alpa"
+
+class ExportResourceEnum(str, Enum):
+    siswa = "siswa"
+    guru = "guru"
+    nilai = "nilai"
+    absensi = "absensi"
+
+class ExportFormatEnum(str, Enum):
+    csv = "csv"
+    xlsx = "xlsx"
+
+class RekapGroupEnum(str, Enum):
+    kelas = "kelas"
+    siswa = "siswa"
+    bulan = "bulan"
+
+class SemesterEnum(str, Enum):
+    Ganjil = "Ganjil"
+    Genap = "Genap"
+
 # KELAS
 class KelasBase(BaseModel):
     jurusan: str
@@ -112,12 +137,37 @@ class NilaiBase(BaseModel):
 class NilaiCreate(NilaiBase):
     pass
 
+class NilaiBulkItem(BaseModel):
+    id_siswa: int
+    nilai_uts: Optional[int] = 0
+    nilai_uas: Optional[int] = 0
+
+class NilaiBulkCreate(BaseModel):
+    id_mapel: int
+    items: List[NilaiBulkItem]
+
 class NilaiResponse(NilaiBase):
     id_nilai: int
     mapel: Optional[MapelResponse] = None
     class Config:
         from_attributes = True
 
+# ABSENSI
+class AbsensiKelasCreate(BaseModel):
+    tanggal: date
+    # id_siswa -> status; students not listed are recorded as Hadir
+    status: Dict[int, StatusAbsensiEnum] = {}
+
+# RAPOR
+class RaporRequest(BaseModel):
+    # Anything left out defaults to the semester containing today
+    semester: Optional[SemesterEnum] = None
+    tahun_ajaran: Optional[str] = None
+    # Attendance is counted over this range
+    tanggal_mulai: Optional[date] = None
+    tanggal_selesai: Optional[date] = None
+    tanggal_rapor: Optional[date] = None
+
 # Resolve forward references
 MapelDiampuResponse.model_rebuild()
 GuruResponse.model_rebuild()
@@ -0,0 +1,202 @@
+from datetime import date, timedelta
+from typing import Iterable, List, Optional
+from sqlalchemy import Date, delete, func, literal, select
+from sqlalchemy.orm import Session
+from ..database import dialect_insert
+from ..models import models
+from .student_summary import ATTENDANCE_COLUMNS
+
+# Closed months (before the current one) are read from rekap_absensi_bulanan;
+# the open month and partial months at the edges of a range are counted live
+# from absensi. A month is rolled up the first time a recap needs it, and
+# later writes into a closed month refresh just the touched students.
+
+ROLLUP_COLUMNS = ["bulan", "id_kelas", "id_siswa", *ATTENDANCE_COLUMNS.values()]
+GROUP_KEYS = {
+    "kelas": "id_kelas",
+    "siswa": "id_siswa",
+    "bulan": "bulan",
+}
+
+def month_start(day: date) -> date:
+    return day.replace(day=1)
+
+def next_month(day: date) -> date:
+    return (day.replace(day=28) + timedelta(days=4)).replace(day=1)
+
+def _counts(status_column):
+    return [
+        func.count().filter(status_column == status).label(column)
+        for status, column in ATTENDANCE_COLUMNS.items()
+    ]
+
+def _rollup_select(bulan: date, *criteria):
+    # One month of absensi counted per (id_kelas, id_siswa); rows without a class can't be attributed
+    return select(
+        literal(bulan, Date).label("bulan"),
+        models.Absensi.id_kelas,
+        models.Absensi.id_siswa,
+        *_counts(models.Absensi.status)
+    ).where(
+        models.Absensi.tanggal >= bulan,
+        models.Absensi.tanggal < next_month(bulan),
+        models.Absensi.id_kelas.is_not(None),
+        models.Absensi.id_siswa.is_not(None),
+        *criteria
+    ).group_by(models.Absensi.id_kelas, models.Absensi.id_siswa)
+
+def close_month(db: Session, bulan: date):
+    insert = dialect_insert(db)
+    stmt = insert(models.RekapAbsensiBulanan).from_select(ROLLUP_COLUMNS, _rollup_select(bulan))
+    # A write hook may have refreshed some of the month's students already; its rows are
+    # at least as new as this snapshot, so they are kept rather than overwritten
+    db.execute(stmt.on_conflict_do_nothing(index_elements=ROLLUP_COLUMNS[:3]))
+    db.execute(insert(models.RekapAbsensiPeriode).values(bulan=bulan).on_conflict_do_nothing())
+
+def ensure_closed(db: Session, months: List[date]):
+    if not months:
+        return
+    done = set(db.scalars(
+        select(models.RekapAbsensiPeriode.bulan).where(models.RekapAbsensiPeriode.bulan.in_(months))
+    ))
+    missing = [bulan for bulan in months if bulan not in done]
+    for bulan in missing:
+        close_month(db, bulan)
+    if missing:
+        db.commit()
+
+def refresh_attendance_rollup(db: Session, id_siswa_list: Iterable[int], tanggal: date, today: Optional[date] = None):
+    # Called next to the absensi write, before commit; open months need nothing
+    bulan = month_start(tanggal)
+    id_siswa_list = sorted(set(id_siswa_list))
+    if not id_siswa_list or bulan >= month_start(today or date.today()):
+        return
+
+    # Delete + insert: an upsert that moved a student to another class leaves no stale row behind
+    db.execute(delete(models.RekapAbsensiBulanan).where(
+        models.RekapAbsensiBulanan.bulan == bulan,
+        models.RekapAbsensiBulanan.id_siswa.in_(id_siswa_list)
+    ))
+    db.execute(dialect_insert(db)(models.RekapAbsensiBulanan).from_select(
+        ROLLUP_COLUMNS, _rollup_select(bulan, models.Absensi.id_siswa.in_(id_siswa_list))
+    ))
+
+def split_range(tanggal_mulai: date, tanggal_selesai: date, today: date):
+    # -> (closed months read from the rollup, live (start, end, bulan) segments within one month each)
+    open_from = month_start(today)
+    first_full = tanggal_mulai if tanggal_mulai.day == 1 else next_month(tanggal_mulai)
+    end_full = min(month_start(tanggal_selesai + timedelta(days=1)), open_from)
+
+    months = []
+    bulan = first_full
+    while bulan < end_full:
+        months.append(bulan)
+        bulan = next_month(bulan)
+
+    segments = []
+    day = tanggal_mulai
+    while day <= tanggal_selesai:
+        if months and months[0] <= day < next_month(months[-1]):
+            day = next_month(months[-1])
+            continue
+        end = min(next_month(day) - timedelta(days=1), tanggal_selesai)
+        segments.append((day, end, month_start(day)))
+        day = end + timedelta(days=1)
+    return months, segments
+
+def _rollup_query(group_key: str, months: List[date], criteria):
+    table = models.RekapAbsensiBulanan
+    key = getattr(table, group_key)
+    return select(
+        key.label("key"),
+        *[func.sum(getattr(table, column)).label(column) for column in ATTENDANCE_COLUMNS.values()]
+    ).where(
+        table.bulan >= months[0],
+        table.bulan < next_month(months[-1]),
+        *[getattr(table, column) == value for column, value in criteria.items()]
+    ).group_by(key)
+
+def _live_query(group_key: str, segment, criteria):
+    start, end, bulan = segment
+    key = literal(bulan, Date) if group_key == "bulan" else getattr(models.Absensi, group_key)
+    stmt = select(key.label("key"), *_counts(models.Absensi.status)).where(
+        models.Absensi.tanggal >= start,
+        models.Absensi.tanggal <= end,
+        models.Absensi.id_kelas.is_not(None),
+        models.Absensi.id_siswa.is_not(None),
+        *[getattr(models.Absensi, column) == value for column, value in criteria.items()]
+    )
+    return stmt if group_key == "bulan" else stmt.group_by(key)
+
+def _labels(db: Session, group_by: str, keys):
+    if group_by == "kelas":
+        rows = db.execute(select(
+            models.Kelas.id_kelas, models.Kelas.jurusan, models.Kelas.kelas
+        ).where(models.Kelas.id_kelas.in_(keys)))
+        return {row.id_kelas: {"jurusan": row.jurusan, "kelas": row.kelas} for row in rows}
+    if group_by == "siswa":
+        rows = db.execute(select(
+            models.Siswa.id_siswa, models.Siswa.nisn, models.Siswa.nama, models.Siswa.id_kelas
+        ).where(models.Siswa.id_siswa.in_(keys)))
+        return {row.id_siswa: {"nisn": row.nisn, "nama": row.nama, "id_kelas_sekarang": row.id_kelas} for row in rows}
+    return {}
+
+def _row(counts: dict) -> dict:
+    total = sum(counts.values())
+    return {
+        **counts,
+        "total": total,
+        "persentase_hadir": round(counts["Hadir"] * 100 / total, 1) if total else 0.0,
+    }
+
+def attendance_recap(
+    db: Session,
+    tanggal_mulai: date,
+    tanggal_selesai: date,
+    group_by: str = "kelas",
+    id_kelas: Optional[int] = None,
+    id_siswa: Optional[int] = None,
+    today: Optional[date] = None
+) -> dict:
+    months, segments = split_range(tanggal_mulai, tanggal_selesai, today or date.today())
+    criteria = {
+        column: value for column, value in (("id_kelas", id_kelas), ("id_siswa", id_siswa))
+        if value is not None
+    }
+    group_key = GROUP_KEYS[group_by]
+
+    statements = [_live_query(group_key, segment, criteria) for segment in segments]
+    if months:
+        ensure_closed(db, months)
+        statements.append(_rollup_query(group_key, months, criteria))
+
+    merged = {}
+    for stmt in statements:
+        for row in db.execute(stmt):
+            counts = merged.setdefault(row.key, dict.fromkeys(ATTENDANCE_COLUMNS, 0))
+            for status, column in ATTENDANCE_COLUMNS.items():
+                # SUM() comes back as Decimal on PostgreSQL
+                counts[status] += int(getattr(row, column) or 0)
+
+    totals = dict.fromkeys(ATTENDANCE_COLUMNS, 0)
+    for counts in merged.values():
+        for status in totals:
+            totals[status] += counts[status]
+
+    merged = {key: counts for key, counts in merged.items() if any(counts.values())}
+    labels = _labels(db, group_by, list(merged))
+    rows = [
+        {
+            group_key: key.strftime("%Y-%m") if group_by == "bulan" else key,
+            **labels.get(key, {}),
+            **_row(counts),
+        }
+        for key, counts in sorted(merged.items())
+    ]
+    return {
+        "tanggal_mulai": tanggal_mulai,
+        "tanggal_selesai": tanggal_selesai,
+        "group_by": group_by,
+        "total": _row(totals),
+        "rows": rows,
+    }
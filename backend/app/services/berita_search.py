@@ -0,0 +1,155 @@
+import html
+import re
+from typing import List, Tuple
+from sqlalchemy import Integer, cast, column, func, literal, literal_column, select, table
+from sqlalchemy.dialects.postgresql import REGCONFIG, TSVECTOR
+from sqlalchemy.orm import Session
+from ..models import models
+
+# PostgreSQL: berita.search_vector is a generated tsvector (judul weighted A, isi B)
+# with a GIN index; SQLite: the berita_fts FTS5 table kept in sync by triggers.
+# Both are created by migration 0004, so every INSERT/UPDATE on berita reindexes itself.
+SEARCH_CONFIG = "indonesian"
+SNIPPET_WORDS = 24
+
+# Control characters survive html.escape(), so highlights are marked with them first
+_START, _STOP = "\x02", "\x03"
+_TOKEN = re.compile(r"\w+", re.UNICODE)
+
+search_vector = literal_column("berita.search_vector", TSVECTOR)
+berita_fts = table("berita_fts", column("rowid", Integer))
+_fts = literal_column("berita_fts")
+
+def _penulis_columns():
+    return (
+        models.Pengguna.username,
+        models.Pengguna.role.label("role_penulis"),
+        models.Guru.nama.label("nama_guru"),
+        models.Siswa.nama.label("nama_siswa"),
+    )
+
+def _with_penulis(stmt):
+    return stmt.outerjoin(
+        models.Pengguna, models.Pengguna.id_user == models.Berita.id_user
+    ).outerjoin(
+        models.Guru, models.Guru.id_guru == models.Pengguna.id_guru
+    ).outerjoin(
+        models.Siswa, models.Siswa.id_siswa == models.Pengguna.id_siswa
+    )
+
+def _postgresql_search(q: str, skip: int, limit: int):
+    config = cast(literal(SEARCH_CONFIG), REGCONFIG)
+    query = func.websearch_to_tsquery(config, q)
+    rank = func.ts_rank(search_vector, query)
+
+    # Rank and page on the GIN index first; ts_headline only runs for the page
+    hits = select(
+        models.Berita.id_berita,
+        rank.label("rank"),
+        func.count().over().label("total")
+    ).where(search_vector.op("@@")(query)).order_by(
+        rank.desc(), models.Berita.tanggal_post.desc(), models.Berita.id_berita.desc()
+    ).offset(skip).limit(limit).subquery()
+
+    options = f'StartSel="{_START}", StopSel="{_STOP}"'
+    stmt = select(
+        models.Berita.id_berita,
+        models.Berita.id_user,
+        models.Berita.judul,
+        models.Berita.gambar,
+        models.Berita.varian_siap,
+        models.Berita.tanggal_post,
+        *_penulis_columns(),
+        hits.c.rank,
+        hits.c.total,
+        func.ts_headline(config, func.coalesce(models.Berita.judul, ""), query, f"{options}, HighlightAll=true").label("judul_highlight"),
+        func.ts_headline(
+            config, func.coalesce(models.Berita.isi, ""), query,
+            f"{options}, MaxWords={SNIPPET_WORDS}, MinWords={SNIPPET_WORDS // 2}, MaxFragments=2, FragmentDelimiter=\" … \""
+        ).label("cuplikan"),
+    ).join(hits, hits.c.id_berita == models.Berita.id_berita)
+    return _with_penulis(stmt).order_by(
+        hits.c.rank.desc(), models.Berita.tanggal_post.desc(), models.Berita.id_berita.desc()
+    )
+
+def _postgresql_count(q: str):
+    query = func.websearch_to_tsquery(cast(literal(SEARCH_CONFIG), REGCONFIG), q)
+    return select(func.count()).select_from(models.Berita).where(search_vector.op("@@")(query))
+
+def _fts5_query(q: str) -> str:
+    # Every word must match, each as a prefix; quoting keeps FTS5 operators out of user input
+    return " ".join(f'"{token}"*' for token in _TOKEN.findall(q.lower()))
+
+def _fts_match(q: str):
+    return _fts.op("MATCH")(_fts5_query(q))
+
+def _sqlite_search(q: str, skip: int, limit: int):
+    # bm25 is lower-is-better; a title hit weighs ten times a body hit
+    rank = func.bm25(_fts, 10.0, 1.0)
+    stmt = select(
+        models.Berita.id_berita,
+        models.Berita.id_user,
+        models.Berita.judul,
+        models.Berita.gambar,
+        models.Berita.varian_siap,
+        models.Berita.tanggal_post,
+        *_penulis_columns(),
+        (-rank).label("rank"),
+        func.highlight(_fts, 0, _START, _STOP).label("judul_highlight"),
+        func.snippet(_fts, 1, _START, _STOP, " … ", SNIPPET_WORDS).label("cuplikan"),
+    ).select_from(berita_fts).join(
+        models.Berita, models.Berita.id_berita == berita_fts.c.rowid
+    ).where(_fts_match(q))
+    return _with_penulis(stmt).order_by(
+        rank, models.Berita.tanggal_post.desc(), models.Berita.id_berita.desc()
+    ).offset(skip).limit(limit)
+
+def _sqlite_count(q: str):
+    # FTS5 auxiliary functions refuse to run next to a window function, so no count() OVER ()
+    return select(func.count()).select_from(berita_fts).where(_fts_match(q))
+
+def _marked(text) -> str:
+    return html.escape(text or "").replace(_START, "<mark>").replace(_STOP, "</mark>")
+
+def search_berita(db: Session, q: str, skip: int, limit: int) -> Tuple[List[dict], int]:
+    # -> (page of results, total matches); highlights are HTML-escaped with <mark> around hits
+    if not _TOKEN.search(q):
+        return [], 0
+
+    if db.get_bind().dialect.name == "postgresql":
+        rows = db.execute(_postgresql_search(q, skip, limit)).all()
+        if rows:
+            total = rows[0].total
+        else:
+            # count() OVER () has no row to ride on past the last page
+            total = db.scalar(_postgresql_count(q)) if skip else 0
+    else:
+        rows = db.execute(_sqlite_search(q, skip, limit)).all()
+        if rows and len(rows) < limit:
+            # Last page: the total is already known
+            total = skip + len(rows)
+        else:
+            total = db.scalar(_sqlite_count(q))
+
+    results = []
+    for row in rows:
+        # Same rule as Pengguna.nama
+        nama_penulis = row.username
+        if row.role_penulis == "Guru" and row.nama_guru:
+            nama_penulis = row.nama_guru
+        elif row.role_penulis == "Siswa" and row.nama_siswa:
+            nama_penulis = row.nama_siswa
+        results.append({
+            "id_berita": row.id_berita,
+            "id_user": row.id_user,
+            "judul": row.judul,
+            "judul_highlight": _marked(row.judul_highlight),
+            "cuplikan": _marked(row.cuplikan),
+            "gambar": row.gambar,
+            "varian_siap": row.varian_siap,
+            "tanggal_post": row.tanggal_post,
+            "nama_penulis": nama_penulis,
+            "role_penulis": row.role_penulis,
+            "rank": float(row.rank),
+        })
+    return results, total
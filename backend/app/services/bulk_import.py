@@ -0,0 +1,179 @@
+import io
+import os
+import zipfile
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional
+import pandas as pd
+from openpyxl.utils.exceptions import InvalidFileException
+from sqlalchemy import insert, select
+from sqlalchemy.orm import Session
+from ..models import models
+
+IMPORT_CHUNK_SIZE = int(os.getenv("IMPORT_CHUNK_SIZE", "1000"))
+
+JENIS_KELAMIN = ["Laki-laki", "Perempuan"]
+EMAIL_PATTERN = r"^[^@\s]+@[^@\s]+\.[^@\s]+$"
+
+class SpreadsheetError(ValueError):
+    pass
+
+@dataclass
+class ImportSpec:
+    model: type
+    columns: List[str]
+    required: List[str]
+    unique: List[str]
+    max_length: Dict[str, int] = field(default_factory=dict)
+    dates: List[str] = field(default_factory=list)
+
+SPECS = {
+    "siswa": ImportSpec(
+        model=models.Siswa,
+        columns=["nisn", "nama", "jenis_kelamin", "id_kelas", "alamat", "no_hp", "tanggal_lahir"],
+        required=["nisn", "nama", "jenis_kelamin"],
+        unique=["nisn"],
+        max_length={"nisn": 20, "nama": 100, "no_hp": 15},
+        dates=["tanggal_lahir"],
+    ),
+    "guru": ImportSpec(
+        model=models.Guru,
+        columns=["nip", "nama", "jenis_kelamin", "email", "no_hp", "id_kelas"],
+        required=["nip", "nama", "jenis_kelamin"],
+        unique=["nip", "email"],
+        max_length={"nip": 30, "nama": 100, "email": 100, "no_hp": 15},
+    ),
+}
+
+def read_spreadsheet(content: bytes, filename: Optional[str]) -> pd.DataFrame:
+    name = (filename or "").lower()
+    try:
+        if name.endswith(".csv"):
+            df = pd.read_csv(io.BytesIO(content), dtype=str, keep_default_na=False, encoding="utf-8-sig")
+        elif name.endswith((".xlsx", ".xlsm")):
+            df = pd.read_excel(io.BytesIO(content), dtype=str, keep_default_na=False, engine="openpyxl")
+        else:
+            raise SpreadsheetError("Unsupported file type, upload a .csv or .xlsx file")
+    except (ValueError, KeyError, OSError, zipfile.BadZipFile, InvalidFileException) as exc:
+        # A corrupt or renamed .xlsx fails inside zipfile/openpyxl, not pandas
+        if isinstance(exc, SpreadsheetError):
+            raise
+        raise SpreadsheetError(f"Could not read spreadsheet: {exc}")
+
+    # "Jenis Kelamin" -> jenis_kelamin; blank cells become missing values
+    df.columns = [str(col).strip().lower().replace(" ", "_") for col in df.columns]
+    return df.apply(lambda col: col.str.strip()).replace("", pd.NA)
+
+class _Report:
+    def __init__(self, df: pd.DataFrame):
+        self.df = df
+        self.invalid = pd.Series(False, index=df.index)
+        self.errors = []
+
+    def flag(self, mask: pd.Series, column: str, message: str):
+        mask = mask.fillna(False).astype(bool)
+        if not mask.any():
+            return
+        self.invalid |= mask
+        for index in self.df.index[mask]:
+            # +2: header row, and spreadsheets count from 1
+            self.errors.append({
+                "row": int(index) + 2,
+                "column": column,
+                "value": None if pd.isna(self.df.at[index, column]) else self.df.at[index, column],
+                "message": message
+            })
+
+def _existing_values(db: Session, column, values: list) -> set:
+    existing = set()
+    for start in range(0, len(values), IMPORT_CHUNK_SIZE):
+        chunk = values[start:start + IMPORT_CHUNK_SIZE]
+        existing.update(db.scalars(select(column).where(column.in_(chunk))))
+    return existing
+
+def validate(db: Session, spec: ImportSpec, df: pd.DataFrame):
+    missing = [col for col in spec.required if col not in df.columns]
+    if missing:
+        raise SpreadsheetError(f"Missing required columns: {', '.join(missing)}")
+    # Optional columns left out of the sheet come back as all-missing
+    df = df.reindex(columns=spec.columns).astype("string")
+    report = _Report(df)
+
+    for col in spec.required:
+        report.flag(df[col].isna(), col, "Value is required")
+
+    for col, length in spec.max_length.items():
+        report.flag(df[col].str.len() > length, col, f"Must be at most {length} characters")
+
+    report.flag(
+        df["jenis_kelamin"].notna() & ~df["jenis_kelamin"].isin(JENIS_KELAMIN),
+        "jenis_kelamin", f"Must be one of: {', '.join(JENIS_KELAMIN)}"
+    )
+
+    if "email" in df.columns:
+        report.flag(
+            df["email"].notna() & ~df["email"].str.match(EMAIL_PATTERN, na=False),
+            "email", "Invalid email address"
+        )
+
+    for col in spec.dates:
+        # ISO dates (Excel date cells arrive as "YYYY-MM-DD 00:00:00") or Indonesian dd/mm/yyyy;
+        # anything else is an error rather than a guess between day and month
+        iso = df[col].str.match(r"^\d{4}-\d{2}-\d{2}(?: 00:00:00)?$", na=False)
+        parsed = pd.to_datetime(df[col].str.slice(0, 10).where(iso), errors="coerce", format="%Y-%m-%d").combine_first(
+            pd.to_datetime(df[col].str.replace("-", "/").where(~iso), errors="coerce", format="%d/%m/%Y")
+        )
+        report.flag(df[col].notna() & parsed.isna(), col, "Invalid date, use YYYY-MM-DD or DD/MM/YYYY")
+        df[col] = parsed.dt.date.astype(object).where(parsed.notna(), None)
+
+    id_kelas = pd.to_numeric(df["id_kelas"], errors="coerce")
+    report.flag(df["id_kelas"].notna() & (id_kelas.isna() | (id_kelas % 1 != 0)), "id_kelas", "Must be an integer")
+    known_kelas = set(db.scalars(select(models.Kelas.id_kelas)))
+    report.flag(id_kelas.notna() & ~id_kelas.isin(known_kelas), "id_kelas", "Unknown kelas")
+    df["id_kelas"] = id_kelas.astype("Int64").astype(object).where(id_kelas.notna(), None)
+
+    for col in spec.unique:
+        present = df[col].notna()
+        report.flag(present & df[col].duplicated(keep=False), col, "Duplicate value in file")
+        existing = _existing_values(db, getattr(spec.model, col), df.loc[present, col].unique().tolist())
+        report.flag(present & df[col].isin(existing), col, "Already exists")
+
+    report.errors.sort(key=lambda error: error["row"])
+    return df, report
+
+def _copy_rows(db: Session, spec: ImportSpec, rows: pd.DataFrame):
+    # COPY FROM STDIN: one round trip for the whole batch. Unquoted empty fields load as NULL.
+    buffer = io.StringIO()
+    rows.to_csv(buffer, index=False, header=False)
+    buffer.seek(0)
+    table = spec.model.__table__.name
+    with db.connection().connection.cursor() as cursor:
+        cursor.copy_expert(f"COPY {table} ({', '.join(spec.columns)}) FROM STDIN WITH (FORMAT csv)", buffer)
+
+def _insert_rows(db: Session, spec: ImportSpec, rows: pd.DataFrame):
+    records = rows.astype(object).where(rows.notna(), None).to_dict("records")
+    for start in range(0, len(records), IMPORT_CHUNK_SIZE):
+        db.execute(insert(spec.model), records[start:start + IMPORT_CHUNK_SIZE])
+
+def import_spreadsheet(db: Session, resource: str, df: pd.DataFrame, dry_run: bool = False) -> dict:
+    spec = SPECS[resource]
+    df, report = validate(db, spec, df)
+    valid = df.loc[~report.invalid, spec.columns]
+
+    inserted = 0
+    if not dry_run and not valid.empty:
+        bind = db.get_bind()
+        if bind.dialect.name == "postgresql" and bind.dialect.driver == "psycopg2":
+            _copy_rows(db, spec, valid)
+        else:
+            _insert_rows(db, spec, valid)
+        db.commit()
+        inserted = len(valid)
+
+    return {
+        "dry_run": dry_run,
+        "total_rows": len(df),
+        "valid_rows": len(valid),
+        "invalid_rows": int(report.invalid.sum()),
+        "inserted": inserted,
+        "errors": report.errors
+    }
@@ -0,0 +1,147 @@
+import csv
+import io
+import os
+import tempfile
+from datetime import date
+from typing import Iterator, Optional
+from openpyxl import Workbook
+from sqlalchemy import select
+from ..database import SessionLocal
+from ..models import models
+
+EXPORT_BATCH_SIZE = int(os.getenv("EXPORT_BATCH_SIZE", "1000"))
+CHUNK_SIZE = 64 * 1024
+
+def _siswa_query(id_kelas: Optional[int] = None, **_):
+    stmt = select(
+        models.Siswa.nisn,
+        models.Siswa.nama,
+        models.Siswa.jenis_kelamin,
+        models.Kelas.kelas,
+        models.Kelas.jurusan,
+        models.Siswa.tanggal_lahir,
+        models.Siswa.alamat,
+        models.Siswa.no_hp
+    ).outerjoin(models.Kelas, models.Kelas.id_kelas == models.Siswa.id_kelas)
+    if id_kelas is not None:
+        stmt = stmt.where(models.Siswa.id_kelas == id_kelas)
+    return stmt.order_by(models.Siswa.id_siswa)
+
+def _guru_query(id_kelas: Optional[int] = None, **_):
+    stmt = select(
+        models.Guru.nip,
+        models.Guru.nama,
+        models.Guru.jenis_kelamin,
+        models.Guru.email,
+        models.Guru.no_hp,
+        models.Kelas.kelas,
+        models.Kelas.jurusan
+    ).outerjoin(models.Kelas, models.Kelas.id_kelas == models.Guru.id_kelas)
+    if id_kelas is not None:
+        stmt = stmt.where(models.Guru.id_kelas == id_kelas)
+    return stmt.order_by(models.Guru.id_guru)
+
+def _nilai_query(id_kelas: Optional[int] = None, id_mapel: Optional[int] = None, **_):
+    stmt = select(
+        models.Siswa.nisn,
+        models.Siswa.nama,
+        models.Kelas.kelas,
+        models.Kelas.jurusan,
+        models.MataPelajaran.nama_mapel,
+        models.Nilai.nilai_uts,
+        models.Nilai.nilai_uas,
+        models.Nilai.nilai_akhir
+    ).join(
+        models.Siswa, models.Siswa.id_siswa == models.Nilai.id_siswa
+    ).join(
+        models.MataPelajaran, models.MataPelajaran.id_mapel == models.Nilai.id_mapel
+    ).outerjoin(models.Kelas, models.Kelas.id_kelas == models.Siswa.id_kelas)
+    if id_kelas is not None:
+        stmt = stmt.where(models.Siswa.id_kelas == id_kelas)
+    if id_mapel is not None:
+        stmt = stmt.where(models.Nilai.id_mapel == id_mapel)
+    return stmt.order_by(models.Nilai.id_nilai)
+
+def _absensi_query(
+    id_kelas: Optional[int] = None,
+    tanggal_mulai: Optional[date] = None,
+    tanggal_selesai: Optional[date] = None,
+    **_
+):
+    stmt = select(
+        models.Absensi.tanggal,
+        models.Siswa.nisn,
+        models.Siswa.nama,
+        models.Kelas.kelas,
+        models.Kelas.jurusan,
+        models.Absensi.status
+    ).join(
+        models.Siswa, models.Siswa.id_siswa == models.Absensi.id_siswa
+    ).outerjoin(models.Kelas, models.Kelas.id_kelas == models.Absensi.id_kelas)
+    if id_kelas is not None:
+        stmt = stmt.where(models.Absensi.id_kelas == id_kelas)
+    if tanggal_mulai is not None:
+        stmt = stmt.where(models.Absensi.tanggal >= tanggal_mulai)
+    if tanggal_selesai is not None:
+        stmt = stmt.where(models.Absensi.tanggal <= tanggal_selesai)
+    return stmt.order_by(models.Absensi.tanggal, models.Absensi.id_absensi)
+
+EXPORTS = {
+    "siswa": (
+        ["NISN", "Nama", "Jenis Kelamin", "Kelas", "Jurusan", "Tanggal Lahir", "Alamat", "No HP"],
+        _siswa_query
+    ),
+    "guru": (
+        ["NIP", "Nama", "Jenis Kelamin", "Email", "No HP", "Kelas", "Jurusan"],
+        _guru_query
+    ),
+    "nilai": (
+        ["NISN", "Nama", "Kelas", "Jurusan", "Mata Pelajaran", "UTS", "UAS", "Nilai Akhir"],
+        _nilai_query
+    ),
+    "absensi": (
+        ["Tanggal", "NISN", "Nama", "Kelas", "Jurusan", "Status"],
+        _absensi_query
+    ),
+}
+
+def _stream_rows(stmt) -> Iterator[tuple]:
+    # Own session: the generator outlives the request dependency.
+    # yield_per turns on server-side cursors, so only one batch is held at a time.
+    db = SessionLocal()
+    try:
+        result = db.execute(stmt.execution_options(yield_per=EXPORT_BATCH_SIZE))
+        for row in result:
+            yield tuple(row)
+    finally:
+        db.close()
+
+def iter_csv(resource: str, **filters) -> Iterator[bytes]:
+    headers, build_query = EXPORTS[resource]
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    # BOM so Excel opens the UTF-8 file with the right encoding
+    buffer.write("\ufeff")
+    writer.writerow(headers)
+    for row in _stream_rows(build_query(**filters)):
+        writer.writerow(row)
+        if buffer.tell() >= CHUNK_SIZE:
+            yield buffer.getvalue().encode("utf-8")
+            buffer.seek(0)
+            buffer.truncate()
+    yield buffer.getvalue().encode("utf-8")
+
+def iter_xlsx(resource: str, **filters) -> Iterator[bytes]:
+    headers, build_query = EXPORTS[resource]
+    # Write-only workbooks spill rows to disk; the finished file is streamed back in chunks
+    workbook = Workbook(write_only=True)
+    sheet = workbook.create_sheet(title=resource.capitalize())
+    sheet.append(headers)
+    for row in _stream_rows(build_query(**filters)):
+        sheet.append(row)
+
+    with tempfile.TemporaryFile() as output:
+        workbook.save(output)
+        output.seek(0)
+        while chunk := output.read(CHUNK_SIZE):
+            yield chunk
@@ -0,0 +1,71 @@
+from collections import defaultdict
+from typing import Optional
+from sqlalchemy.orm import Session
+from ..models import models
+
+def build_grade_matrix(db: Session, id_guru: Optional[int], id_ampu: Optional[int] = None):
+    # Teaching assignments with their class and subject names (1 query)
+    teaching_query = db.query(
+        models.MapelDiampu.id_ampu,
+        models.MapelDiampu.id_kelas,
+        models.MapelDiampu.id_mapel,
+        models.Kelas.kelas,
+        models.MataPelajaran.nama_mapel
+    ).join(
+        models.Kelas, models.Kelas.id_kelas == models.MapelDiampu.id_kelas
+    ).join(
+        models.MataPelajaran, models.MataPelajaran.id_mapel == models.MapelDiampu.id_mapel
+    ).filter(models.MapelDiampu.id_guru == id_guru)
+
+    if id_ampu is not None:
+        teaching_query = teaching_query.filter(models.MapelDiampu.id_ampu == id_ampu)
+
+    teaching = teaching_query.order_by(models.MapelDiampu.id_ampu).all()
+    if not teaching:
+        return []
+
+    id_kelas_set = {t.id_kelas for t in teaching}
+    id_mapel_set = {t.id_mapel for t in teaching}
+
+    # Every student of every class taught (1 query)
+    students_by_kelas = defaultdict(list)
+    students = db.query(
+        models.Siswa.id_siswa,
+        models.Siswa.id_kelas,
+        models.Siswa.nama,
+        models.Siswa.nisn
+    ).filter(models.Siswa.id_kelas.in_(id_kelas_set)).order_by(models.Siswa.id_siswa).all()
+    for s in students:
+        students_by_kelas[s.id_kelas].append(s)
+
+    # Every existing grade for those students in the subjects taught (1 query)
+    grades = {}
+    nilai_rows = db.query(models.Nilai).join(
+        models.Siswa, models.Siswa.id_siswa == models.Nilai.id_siswa
+    ).filter(
+        models.Siswa.id_kelas.in_(id_kelas_set),
+        models.Nilai.id_mapel.in_(id_mapel_set)
+    ).order_by(models.Nilai.id_nilai).all()
+    for n in nilai_rows:
+        # Keep the first row per pair, matching the old .first() lookup
+        grades.setdefault((n.id_siswa, n.id_mapel), n)
+
+    result = []
+    for t in teaching:
+        result.append({
+            "id_ampu": t.id_ampu,
+            "id_kelas": t.id_kelas,
+            "kelas_nama": t.kelas,
+            "id_mapel": t.id_mapel,
+            "mapel_nama": t.nama_mapel,
+            "students": [
+                {
+                    "id_siswa": s.id_siswa,
+                    "nama": s.nama,
+                    "nisn": s.nisn,
+                    "nilai": grades.get((s.id_siswa, t.id_mapel))
+                }
+                for s in students_by_kelas[t.id_kelas]
+            ]
+        })
+    return result
@@ -0,0 +1,167 @@
+import os
+from typing import Iterable, List, Optional
+import numpy as np
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+from ..core.cache import TTLCache
+from ..models import models
+
+GRADE_STATISTICS_CACHE_TTL = int(os.getenv("GRADE_STATISTICS_CACHE_TTL", "300"))
+# Histogram buckets of nilai_akhir: 0-9, 10-19, ..., 80-89, 90-100
+BUCKET_WIDTH = 10
+BUCKETS = [f"{low}-{low + BUCKET_WIDTH - 1}" for low in range(0, 90, BUCKET_WIDTH)] + ["90-100"]
+
+# One entry per class or jurusan; grade writes drop the class and jurusan of the
+# students they touched, roster changes (siswa, kelas, mapel) clear everything
+grade_statistics_cache = TTLCache(ttl=GRADE_STATISTICS_CACHE_TTL, maxsize=256)
+
+def cache_key(id_kelas: Optional[int], jurusan: Optional[str]):
+    return ("kelas", id_kelas) if id_kelas is not None else ("jurusan", jurusan)
+
+def cache_tags(id_kelas: Optional[int], jurusan: Optional[str]) -> List[str]:
+    return [f"kelas:{id_kelas}"] if id_kelas is not None else [f"jurusan:{jurusan}"]
+
+def invalidate_grade_statistics(tags: Optional[Iterable[str]] = None):
+    if tags is None:
+        grade_statistics_cache.clear()
+    else:
+        grade_statistics_cache.invalidate(*tags)
+
+def statistics_tags_of_siswa(db: Session, id_siswa_list: Iterable[int]) -> List[str]:
+    rows = db.execute(
+        select(models.Kelas.id_kelas, models.Kelas.jurusan).join(
+            models.Siswa, models.Siswa.id_kelas == models.Kelas.id_kelas
+        ).where(models.Siswa.id_siswa.in_(set(id_siswa_list))).distinct()
+    ).all()
+    return [tag for row in rows for tag in (*cache_tags(row.id_kelas, None), *cache_tags(None, row.jurusan))]
+
+def _matrix_statement(id_kelas: Optional[int], jurusan: Optional[str]):
+    # Students without any grade still come back (mapel NULL) so they count and rank last
+    stmt = select(
+        models.Siswa.id_siswa,
+        models.Siswa.nisn,
+        models.Siswa.nama,
+        models.Siswa.id_kelas,
+        models.Nilai.id_mapel,
+        models.MataPelajaran.nama_mapel,
+        models.Nilai.nilai_akhir
+    ).outerjoin(
+        models.Nilai, models.Nilai.id_siswa == models.Siswa.id_siswa
+    ).outerjoin(
+        models.MataPelajaran, models.MataPelajaran.id_mapel == models.Nilai.id_mapel
+    )
+    if id_kelas is not None:
+        return stmt.where(models.Siswa.id_kelas == id_kelas)
+    return stmt.join(models.Kelas, models.Kelas.id_kelas == models.Siswa.id_kelas).where(models.Kelas.jurusan == jurusan)
+
+def _ranks(scores: np.ndarray, groups: np.ndarray) -> np.ndarray:
+    # Competition ranking ("1224") of scores within each group, highest first; NaN ranks as 0
+    order = np.lexsort((-np.nan_to_num(scores, nan=-1.0), groups))
+    sorted_groups, sorted_scores = groups[order], scores[order]
+    position = np.arange(len(order))
+    group_start = np.searchsorted(sorted_groups, sorted_groups, side="left")
+    new_tie = np.ones(len(order), dtype=bool)
+    new_tie[1:] = (sorted_groups[1:] != sorted_groups[:-1]) | (sorted_scores[1:] != sorted_scores[:-1])
+    tie_start = np.maximum.accumulate(np.where(new_tie, position, 0))
+    ranks = np.empty(len(order), dtype=np.int64)
+    ranks[order] = tie_start - group_start + 1
+    return np.where(np.isnan(scores), 0, ranks)
+
+def _percentile_ranks(scores: np.ndarray) -> np.ndarray:
+    # Share of ranked students scoring below, ties counted half: (below + equal / 2) / n
+    ranked = np.sort(scores[~np.isnan(scores)])
+    if not len(ranked):
+        return np.full(len(scores), np.nan)
+    below = np.searchsorted(ranked, scores, side="left")
+    equal = np.searchsorted(ranked, scores, side="right") - below
+    return np.where(np.isnan(scores), np.nan, (below + equal / 2) * 100 / len(ranked))
+
+def _rounded(values: np.ndarray, digits: int = 2) -> list:
+    return [None if np.isnan(value) else value for value in np.round(values, digits).tolist()]
+
+def compute_grade_statistics(rows) -> dict:
+    # rows: (id_siswa, nisn, nama, id_kelas, id_mapel, nama_mapel, nilai_akhir), one per grade
+    if not rows:
+        return {"buckets": BUCKETS, "jumlah_siswa": 0, "mapel": [], "siswa": []}
+    id_siswa, nisn, nama, id_kelas, id_mapel, nama_mapel, nilai = zip(*rows)
+
+    siswa_ids, siswa_first, siswa_index = np.unique(np.array(id_siswa), return_index=True, return_inverse=True)
+    # float arrays turn NULL into NaN
+    nilai_column = np.array(nilai, dtype=np.float64)
+    mapel_column = np.array(id_mapel, dtype=np.float64)
+    graded = ~np.isnan(nilai_column) & ~np.isnan(mapel_column)
+    mapel_ids, mapel_first, mapel_index = np.unique(mapel_column[graded].astype(np.int64), return_index=True, return_inverse=True)
+    values = nilai_column[graded]
+
+    # Students x mapel, NaN where a grade is missing
+    matrix = np.full((len(siswa_ids), len(mapel_ids)), np.nan)
+    matrix[siswa_index[graded], mapel_index] = values
+    present = ~np.isnan(matrix)
+
+    per_mapel = present.sum(axis=0)
+    mapel_total = np.where(present, matrix, 0).sum(axis=0)
+    mapel_mean = mapel_total / np.maximum(per_mapel, 1)
+    mapel_std = np.sqrt(np.where(present, (matrix - mapel_mean) ** 2, 0).sum(axis=0) / np.maximum(per_mapel, 1))
+    mapel_median = np.nanmedian(matrix, axis=0) if len(mapel_ids) else np.empty(0)
+    buckets = np.minimum(values // BUCKET_WIDTH, len(BUCKETS) - 1).clip(0).astype(np.int64)
+    histogram = np.bincount(mapel_index * len(BUCKETS) + buckets, minlength=len(mapel_ids) * len(BUCKETS))
+    histogram = histogram.reshape(len(mapel_ids), len(BUCKETS))
+
+    per_siswa = present.sum(axis=1)
+    average = np.where(per_siswa > 0, np.where(present, matrix, 0).sum(axis=1) / np.maximum(per_siswa, 1), np.nan)
+    kelas_column = np.nan_to_num(np.array(id_kelas, dtype=np.float64), nan=-1).astype(np.int64)[siswa_first]
+    rank = _ranks(average, np.zeros(len(siswa_ids), dtype=np.int64))
+    class_rank = _ranks(average, kelas_column)
+    percentile = _percentile_ranks(average)
+
+    mapel_names = np.array(nama_mapel, dtype=object)[graded][mapel_first]
+    mapel = [
+        {
+            "id_mapel": int(mapel_id),
+            "nama_mapel": nama,
+            "jumlah": int(count),
+            "rata_rata": mean,
+            "median": median,
+            "simpangan_baku": std,
+            "histogram": counts,
+        }
+        for mapel_id, nama, count, mean, median, std, counts in zip(
+            mapel_ids.tolist(), mapel_names.tolist(), per_mapel.tolist(),
+            _rounded(mapel_mean), _rounded(mapel_median), _rounded(mapel_std), histogram.tolist()
+        )
+    ]
+    siswa = [
+        {
+            "id_siswa": siswa_id,
+            "nisn": nisn[first],
+            "nama": nama[first],
+            "id_kelas": id_kelas[first],
+            "jumlah_mapel": count,
+            "rata_rata": mean,
+            "peringkat": position or None,
+            "peringkat_kelas": class_position or None,
+            "persentil": pct,
+        }
+        for siswa_id, first, count, mean, position, class_position, pct in zip(
+            siswa_ids.tolist(), siswa_first.tolist(), per_siswa.tolist(), _rounded(average),
+            rank.tolist(), class_rank.tolist(), _rounded(percentile, 1)
+        )
+    ]
+    siswa.sort(key=lambda item: (item["peringkat"] is None, item["peringkat"] or 0, item["nama"]))
+    return {"buckets": BUCKETS, "jumlah_siswa": len(siswa), "mapel": mapel, "siswa": siswa}
+
+def load_grade_statistics(db: Session, id_kelas: Optional[int] = None, jurusan: Optional[str] = None) -> dict:
+    # The whole nilai_akhir matrix of the scope in one query, everything else in NumPy
+    rows = db.execute(_matrix_statement(id_kelas, jurusan)).all()
+    stats = compute_grade_statistics(rows)
+    stats["id_kelas"], stats["jurusan"] = id_kelas, jurusan
+    return stats
+
+def grade_statistics(db: Session, id_kelas: Optional[int] = None, jurusan: Optional[str] = None) -> dict:
+    # Sync flavour for callers already inside a session (rapor); endpoints use aget_or_set
+    key = cache_key(id_kelas, jurusan)
+    stats = grade_statistics_cache.get(key)
+    if stats is None:
+        stats = load_grade_statistics(db, id_kelas=id_kelas, jurusan=jurusan)
+        grade_statistics_cache.set(key, stats, cache_tags(id_kelas, jurusan))
+    return stats
@@ -0,0 +1,165 @@
+import hashlib
+import multiprocessing
+import os
+import re
+import threading
+import uuid
+from concurrent.futures import Future, ProcessPoolExecutor
+from typing import BinaryIO, Dict, Optional
+from PIL import Image, ImageOps
+
+UPLOAD_DIR = "uploads"
+IMAGE_MAX_BYTES = int(os.getenv("IMAGE_MAX_BYTES", str(8 * 1024 * 1024)))
+# Whole upload request: the image plus the other form fields and multipart framing
+UPLOAD_REQUEST_MAX_BYTES = IMAGE_MAX_BYTES + int(os.getenv("UPLOAD_FORM_MAX_BYTES", str(1024 * 1024)))
+IMAGE_POOL_WORKERS = int(os.getenv("IMAGE_POOL_WORKERS", "1"))
+CHUNK_SIZE = 1024 * 1024
+
+# Longest side in pixels for each rendered variant
+VARIANTS = {
+    "thumbnail": 320,
+    "card": 800,
+    "full": 1600,
+}
+FORMATS = {
+    "webp": ("WEBP", {"quality": 80, "method": 4}),
+    "jpeg": ("JPEG", {"quality": 82, "optimize": True, "progressive": True}),
+}
+EXTENSIONS = {"webp": ".webp", "jpeg": ".jpg"}
+
+# <sha256 prefix>[_<variant>].<ext>: the name changes whenever the bytes do
+CONTENT_ADDRESSED = re.compile(
+    r"^[0-9a-f]{32}(?:_(?:" + "|".join(VARIANTS) + r"))?\.(?:jpg|png|webp|gif)$"
+)
+
+class UnsupportedImage(ValueError):
+    pass
+
+class ImageTooLarge(ValueError):
+    pass
+
+def _sniff_extension(head: bytes) -> Optional[str]:
+    # Trust the bytes, not the client's filename or content type
+    if head.startswith(b"\xff\xd8\xff"):
+        return ".jpg"
+    if head.startswith(b"\x89PNG\r\n\x1a\n"):
+        return ".png"
+    if head[:4] == b"RIFF" and head[8:12] == b"WEBP":
+        return ".webp"
+    if head.startswith((b"GIF87a", b"GIF89a")):
+        return ".gif"
+    return None
+
+def save_upload(source: BinaryIO, folder: str = "berita") -> str:
+    head = source.read(12)
+    extension = _sniff_extension(head)
+    if extension is None:
+        raise UnsupportedImage("Only JPEG, PNG, WebP or GIF images are allowed")
+
+    directory = os.path.join(UPLOAD_DIR, folder)
+    os.makedirs(directory, exist_ok=True)
+    tmp_path = os.path.join(directory, f".{uuid.uuid4().hex}.tmp")
+
+    digest = hashlib.sha256()
+    written = 0
+    try:
+        with open(tmp_path, "wb") as buffer:
+            chunk = head
+            while chunk:
+                written += len(chunk)
+                if written > IMAGE_MAX_BYTES:
+                    raise ImageTooLarge(f"Image exceeds {IMAGE_MAX_BYTES // (1024 * 1024)} MB")
+                digest.update(chunk)
+                buffer.write(chunk)
+                chunk = source.read(CHUNK_SIZE)
+
+        relative_path = f"{folder}/{digest.hexdigest()[:32]}{extension}"
+        save_path = os.path.join(UPLOAD_DIR, relative_path)
+        try:
+            # Same bytes already stored: reuse the file and its variants. Touching it keeps the
+            # sweeper and berita deletes off it until the row of this upload is committed
+            os.utime(save_path)
+        except FileNotFoundError:
+            os.replace(tmp_path, save_path)
+        else:
+            os.remove(tmp_path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+    return relative_path
+
+def variant_path(gambar: str, variant: str, fmt: str) -> str:
+    stem = os.path.splitext(gambar)[0]
+    return f"{stem}_{variant}{EXTENSIONS[fmt]}"
+
+def variant_paths(gambar: str) -> Dict[str, Dict[str, str]]:
+    return {
+        variant: {fmt: variant_path(gambar, variant, fmt) for fmt in FORMATS}
+        for variant in VARIANTS
+    }
+
+def variants_on_disk(gambar: Optional[str]) -> bool:
+    # "full" WebP is written last, so its presence means every variant is ready
+    return bool(gambar) and os.path.exists(os.path.join(UPLOAD_DIR, variant_path(gambar, "full", "webp")))
+
+def image_files(gambar: str) -> list:
+    return [gambar] + [variant_path(gambar, v, f) for v in VARIANTS for f in FORMATS]
+
+def remove_image(gambar: Optional[str]):
+    if not gambar:
+        return
+    paths = image_files(gambar)
+    for path in paths:
+        try:
+            os.remove(os.path.join(UPLOAD_DIR, path))
+        except FileNotFoundError:
+            pass
+
+# Runs in the worker processes; must stay an importable top-level function
+def _render_variants(upload_dir: str, gambar: str):
+    with Image.open(os.path.join(upload_dir, gambar)) as original:
+        original.seek(0)
+        # Bake the EXIF orientation into the pixels; variants are saved without metadata
+        image = ImageOps.exif_transpose(original)
+        image = image.convert("RGBA" if image.mode in ("RGBA", "LA", "P") else "RGB")
+        for variant, size in sorted(VARIANTS.items(), key=lambda item: item[0] == "full"):
+            resized = image.copy()
+            resized.thumbnail((size, size), Image.LANCZOS)
+            for fmt, (pil_format, options) in FORMATS.items():
+                target = resized.convert("RGB") if pil_format == "JPEG" else resized
+                path = os.path.join(upload_dir, variant_path(gambar, variant, fmt))
+                # Write then rename so readers never see a half-written variant
+                tmp_path = f"{path}.tmp"
+                target.save(tmp_path, pil_format, **options)
+                os.replace(tmp_path, path)
+
+class ImagePool:
+    def __init__(self, workers: int):
+        self.workers = workers
+        self._executor = None
+        self._lock = threading.Lock()
+
+    def _get_executor(self) -> ProcessPoolExecutor:
+        with self._lock:
+            if self._executor is None:
+                # spawn: forking a process that already runs threads is unsafe
+                self._executor = ProcessPoolExecutor(
+                    max_workers=self.workers,
+                    mp_context=multiprocessing.get_context("spawn")
+                )
+            return self._executor
+
+    def submit(self, gambar: str, on_done=None) -> Future:
+        future = self._get_executor().submit(_render_variants, UPLOAD_DIR, gambar)
+        if on_done is not None:
+            future.add_done_callback(on_done)
+        return future
+
+    def shutdown(self):
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=False, cancel_futures=True)
+
+image_pool = ImagePool(IMAGE_POOL_WORKERS)
@@ -0,0 +1,110 @@
+from typing import Dict, List
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+from ..models import models
+
+# Column projections shaped exactly like the response schemas in app/schemas/master.py.
+# Rows come from typed columns, so they are encoded without loading ORM objects or
+# re-validating through Pydantic (see core.responses.trusted_json).
+
+def _mapel_json(id_mapel, nama_mapel, kategori):
+    if id_mapel is None:
+        return None
+    return {"nama_mapel": nama_mapel, "kategori": kategori, "id_mapel": id_mapel}
+
+def _kelas_json(id_kelas, jurusan, kelas):
+    if id_kelas is None:
+        return None
+    return {"jurusan": jurusan, "kelas": kelas, "id_kelas": id_kelas}
+
+# NilaiResponse
+def select_nilai_rows(*criteria):
+    return select(
+        models.Nilai.id_siswa,
+        models.Nilai.id_mapel,
+        models.Nilai.nilai_uts,
+        models.Nilai.nilai_uas,
+        models.Nilai.nilai_akhir,
+        models.Nilai.id_nilai,
+        models.MataPelajaran.id_mapel.label("mapel_id"),
+        models.MataPelajaran.nama_mapel,
+        models.MataPelajaran.kategori
+    ).outerjoin(
+        models.MataPelajaran, models.MataPelajaran.id_mapel == models.Nilai.id_mapel
+    ).where(*criteria).order_by(models.Nilai.id_nilai)
+
+def nilai_json(rows) -> List[dict]:
+    return [
+        {
+            "id_siswa": row.id_siswa,
+            "id_mapel": row.id_mapel,
+            "nilai_uts": row.nilai_uts,
+            "nilai_uas": row.nilai_uas,
+            "nilai_akhir": row.nilai_akhir,
+            "id_nilai": row.id_nilai,
+            "mapel": _mapel_json(row.mapel_id, row.nama_mapel, row.kategori)
+        }
+        for row in rows
+    ]
+
+# GuruResponse, with mapel_diampu -> mapel / kelas / guru nested
+def _guru_base_json(guru: models.Guru) -> dict:
+    return {
+        "nip": guru.nip,
+        "nama": guru.nama,
+        "jenis_kelamin": guru.jenis_kelamin,
+        "email": guru.email,
+        "no_hp": guru.no_hp,
+        "id_kelas": guru.id_kelas
+    }
+
+def _mapel_diampu_by_guru(db: Session, id_guru_list: list) -> Dict[int, list]:
+    rows = db.execute(
+        select(
+            models.MapelDiampu.id_ampu,
+            models.MapelDiampu.id_mapel,
+            models.MapelDiampu.id_kelas,
+            models.MapelDiampu.id_guru,
+            models.MataPelajaran.id_mapel.label("mapel_id"),
+            models.MataPelajaran.nama_mapel,
+            models.MataPelajaran.kategori,
+            models.Kelas.id_kelas.label("kelas_id"),
+            models.Kelas.jurusan,
+            models.Kelas.kelas
+        ).outerjoin(
+            models.MataPelajaran, models.MataPelajaran.id_mapel == models.MapelDiampu.id_mapel
+        ).outerjoin(
+            models.Kelas, models.Kelas.id_kelas == models.MapelDiampu.id_kelas
+        ).where(
+            models.MapelDiampu.id_guru.in_(id_guru_list)
+        ).order_by(models.MapelDiampu.id_ampu)
+    ).all()
+
+    grouped: Dict[int, list] = {}
+    for row in rows:
+        grouped.setdefault(row.id_guru, []).append(row)
+    return grouped
+
+def guru_json(db: Session, gurus: List[models.Guru]) -> List[dict]:
+    # Two queries for the whole page instead of lazy loads per guru and per assignment
+    assignments = _mapel_diampu_by_guru(db, [guru.id_guru for guru in gurus]) if gurus else {}
+    results = []
+    for guru in gurus:
+        base = _guru_base_json(guru)
+        results.append({
+            **base,
+            "id_guru": guru.id_guru,
+            "mapel_diampu": [
+                {
+                    "id_ampu": row.id_ampu,
+                    "id_mapel": row.id_mapel,
+                    "id_kelas": row.id_kelas,
+                    "id_guru": row.id_guru,
+                    "mapel": _mapel_json(row.mapel_id, row.nama_mapel, row.kategori),
+                    "kelas": _kelas_json(row.kelas_id, row.jurusan, row.kelas),
+                    "guru": base
+                }
+                for row in assignments.get(guru.id_guru, [])
+            ]
+        })
+    return results
@@ -0,0 +1,263 @@
+import asyncio
+import multiprocessing
+import os
+import re
+import threading
+import uuid
+import zipfile
+from concurrent.futures import Future, ProcessPoolExecutor
+from datetime import date, datetime, timedelta
+from typing import Dict, List, Optional
+import anyio
+from sqlalchemy import delete, func, select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+from ..database import AsyncSessionLocal
+from ..models import models
+from .attendance_recap import attendance_recap
+from .grade_statistics import grade_statistics
+from .student_summary import ATTENDANCE_COLUMNS
+from .rapor_pdf import filename, render_chunk, tanggal_indonesia
+
+SCHOOL_NAME = os.getenv("SCHOOL_NAME", "SMK Negeri 4 Padalarang")
+SCHOOL_CITY = os.getenv("SCHOOL_CITY", "Padalarang")
+RAPOR_POOL_WORKERS = int(os.getenv("RAPOR_POOL_WORKERS", str(os.cpu_count() or 2)))
+# Students per worker task; small enough that progress moves, big enough to amortise pickling
+RAPOR_CHUNK_SIZE = int(os.getenv("RAPOR_CHUNK_SIZE", "25"))
+# Finished jobs stay visible to the progress endpoint this long (seconds)
+RAPOR_JOB_TTL = int(os.getenv("RAPOR_JOB_TTL", "900"))
+KATEGORI_ORDER = {"Umum": 0, "Kejuruan": 1, None: 2}
+
+def semester_period(today: date, semester: Optional[str] = None, tahun_ajaran: Optional[str] = None) -> dict:
+    # Ganjil runs July-December, Genap January-June of the following year
+    if tahun_ajaran is None:
+        awal = today.year if today.month >= 7 else today.year - 1
+    else:
+        match = re.fullmatch(r"(\d{4})/(\d{4})", tahun_ajaran)
+        if match is None or int(match.group(2)) != int(match.group(1)) + 1:
+            raise ValueError("tahun_ajaran harus berformat YYYY/YYYY, mis. 2025/2026")
+        awal = int(match.group(1))
+    if semester is None:
+        semester = "Ganjil" if today.month >= 7 else "Genap"
+    tahun = awal if semester == "Ganjil" else awal + 1
+    return {
+        "semester": semester,
+        "tahun_ajaran": f"{awal}/{awal + 1}",
+        "tanggal_mulai": date(tahun, 7, 1) if semester == "Ganjil" else date(tahun, 1, 1),
+        "tanggal_selesai": date(tahun, 12, 31) if semester == "Ganjil" else date(tahun, 6, 30),
+    }
+
+def load_class_rapor(
+    db: Session,
+    id_kelas: int,
+    semester: str,
+    tahun_ajaran: str,
+    tanggal_mulai: date,
+    tanggal_selesai: date,
+    tanggal_rapor: date
+) -> Optional[dict]:
+    # -> {"header": ..., "students": [...]} of plain picklable values, or None for an unknown class.
+    # A fixed number of class-wide queries, whatever the class size.
+    kelas = db.execute(
+        select(models.Kelas.kelas, models.Kelas.jurusan, models.Guru.nama, models.Guru.nip).outerjoin(
+            models.Guru, models.Guru.id_kelas == models.Kelas.id_kelas
+        ).where(models.Kelas.id_kelas == id_kelas).order_by(models.Guru.id_guru).limit(1)
+    ).first()
+    if kelas is None:
+        return None
+
+    siswa_rows = db.execute(
+        select(models.Siswa.id_siswa, models.Siswa.nisn, models.Siswa.nama).where(
+            models.Siswa.id_kelas == id_kelas
+        ).order_by(models.Siswa.nama, models.Siswa.id_siswa)
+    ).all()
+
+    # Every subject taught in the class gets a row, graded or not
+    mapel = {
+        row.id_mapel: (row.nama_mapel, row.kategori)
+        for row in db.execute(
+            select(models.MataPelajaran.id_mapel, models.MataPelajaran.nama_mapel, models.MataPelajaran.kategori).join(
+                models.MapelDiampu, models.MapelDiampu.id_mapel == models.MataPelajaran.id_mapel
+            ).where(models.MapelDiampu.id_kelas == id_kelas).distinct()
+        )
+    }
+    nilai: Dict[int, Dict[int, tuple]] = {}
+    for row in db.execute(
+        select(
+            models.Nilai.id_siswa,
+            models.Nilai.id_mapel,
+            models.MataPelajaran.nama_mapel,
+            models.MataPelajaran.kategori,
+            models.Nilai.nilai_uts,
+            models.Nilai.nilai_uas,
+            models.Nilai.nilai_akhir
+        ).join(
+            models.Siswa, models.Siswa.id_siswa == models.Nilai.id_siswa
+        ).join(
+            models.MataPelajaran, models.MataPelajaran.id_mapel == models.Nilai.id_mapel
+        ).where(models.Siswa.id_kelas == id_kelas)
+    ):
+        mapel.setdefault(row.id_mapel, (row.nama_mapel, row.kategori))
+        nilai.setdefault(row.id_siswa, {})[row.id_mapel] = (row.nilai_uts, row.nilai_uas, row.nilai_akhir)
+    urutan = sorted(mapel, key=lambda id_mapel: (KATEGORI_ORDER.get(mapel[id_mapel][1], 2), mapel[id_mapel][0]))
+
+    absensi = {
+        row["id_siswa"]: {status: row[status] for status in ATTENDANCE_COLUMNS}
+        for row in attendance_recap(db, tanggal_mulai, tanggal_selesai, "siswa", id_kelas=id_kelas)["rows"]
+    }
+    kosong = dict.fromkeys(ATTENDANCE_COLUMNS, 0)
+    peringkat = {
+        item["id_siswa"]: item["peringkat_kelas"]
+        for item in grade_statistics(db, id_kelas=id_kelas)["siswa"]
+    }
+
+    students = []
+    for row in siswa_rows:
+        grades = nilai.get(row.id_siswa, {})
+        students.append({
+            "id_siswa": row.id_siswa,
+            "nisn": row.nisn,
+            "nama": row.nama,
+            "nilai": [
+                (*mapel[id_mapel], *grades.get(id_mapel, (None, None, None)))
+                for id_mapel in urutan
+            ],
+            "absensi": absensi.get(row.id_siswa, kosong),
+            "peringkat": peringkat.get(row.id_siswa),
+        })
+    return {
+        "header": {
+            "sekolah": SCHOOL_NAME,
+            "kota": SCHOOL_CITY,
+            "kelas": kelas.kelas,
+            "jurusan": kelas.jurusan,
+            "wali_nama": kelas.nama,
+            "wali_nip": kelas.nip,
+            "semester": semester,
+            "tahun_ajaran": tahun_ajaran,
+            "tanggal_rapor": tanggal_indonesia(tanggal_rapor),
+            "jumlah_siswa": len(siswa_rows),
+        },
+        "students": students,
+    }
+
+class RaporPool:
+    def __init__(self, workers: int):
+        self.workers = workers
+        self._executor = None
+        self._lock = threading.Lock()
+
+    def _get_executor(self) -> ProcessPoolExecutor:
+        with self._lock:
+            if self._executor is None:
+                # spawn: forking a process that already runs threads is unsafe
+                self._executor = ProcessPoolExecutor(
+                    max_workers=self.workers,
+                    mp_context=multiprocessing.get_context("spawn")
+                )
+            return self._executor
+
+    def submit(self, header: dict, students: List[dict]) -> Future:
+        return self._get_executor().submit(render_chunk, header, students)
+
+    def shutdown(self):
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=False, cancel_futures=True)
+
+rapor_pool = RaporPool(RAPOR_POOL_WORKERS)
+
+def job_status(job: models.RaporJob) -> dict:
+    berakhir = job.berakhir or datetime.now()
+    return {
+        "job_id": job.id_job,
+        "id_kelas": job.id_kelas,
+        "status": job.status,
+        "total": job.total,
+        "selesai": job.selesai,
+        "gagal": job.gagal,
+        "persen": round((job.selesai + job.gagal) * 100 / job.total, 1) if job.total else 100.0,
+        "durasi": round((berakhir - job.mulai).total_seconds(), 2),
+    }
+
+# Progress lives in rapor_job rather than in the streaming worker's memory,
+# so with several workers behind a load balancer any of them answers the poll
+async def start_job(db: AsyncSession, id_kelas: int, id_user: int, total: int) -> models.RaporJob:
+    now = datetime.now()
+    # A class renders in seconds, so a job still running after the TTL lost its worker
+    await db.execute(delete(models.RaporJob).where(
+        func.coalesce(models.RaporJob.berakhir, models.RaporJob.mulai) < now - timedelta(seconds=RAPOR_JOB_TTL)
+    ))
+    job = models.RaporJob(
+        id_job=uuid.uuid4().hex, id_kelas=id_kelas, id_user=id_user,
+        total=total, selesai=0, gagal=0, status="berjalan", mulai=now
+    )
+    db.add(job)
+    await db.commit()
+    return job
+
+async def get_job(db: AsyncSession, id_job: str) -> Optional[models.RaporJob]:
+    return await db.get(models.RaporJob, id_job)
+
+async def _save_job(job: models.RaporJob):
+    # Own short session: the request session is not meant to outlive the handler
+    async with AsyncSessionLocal() as db:
+        await db.execute(update(models.RaporJob).where(models.RaporJob.id_job == job.id_job).values(
+            selesai=job.selesai, gagal=job.gagal, status=job.status, berakhir=job.berakhir
+        ))
+        await db.commit()
+
+class _ZipSink:
+    # Write-only target for ZipFile; without tell() it writes data descriptors and never seeks
+    def __init__(self):
+        self._parts = []
+
+    def write(self, data) -> int:
+        self._parts.append(bytes(data))
+        return len(data)
+
+    def flush(self):
+        pass
+
+    def drain(self) -> bytes:
+        data, self._parts = b"".join(self._parts), []
+        return data
+
+async def iter_rapor_zip(job: models.RaporJob, header: dict, students: List[dict]):
+    sink = _ZipSink()
+    archive = zipfile.ZipFile(sink, "w", zipfile.ZIP_STORED)
+    stamp = job.mulai.timetuple()[:6]
+    chunks = [students[i:i + RAPOR_CHUNK_SIZE] for i in range(0, len(students), RAPOR_CHUNK_SIZE)]
+    futures = [rapor_pool.submit(header, chunk) for chunk in chunks]
+    failed = []
+    try:
+        # Chunks are written in class order as they complete, so the ZIP streams while workers render
+        for chunk, future in zip(chunks, futures):
+            try:
+                files = await asyncio.wrap_future(future)
+            except Exception as exc:
+                failed.extend(f"{filename(siswa)}: {exc!r}" for siswa in chunk)
+                job.gagal += len(chunk)
+            else:
+                for name, data in files:
+                    # PDF streams are already deflated; storing them skips a second pass
+                    archive.writestr(zipfile.ZipInfo(name, stamp), data)
+                job.selesai += len(files)
+            await _save_job(job)
+            yield sink.drain()
+        if failed:
+            archive.writestr(zipfile.ZipInfo("GAGAL.txt", stamp), "\n".join(failed) + "\n")
+        archive.close()
+        yield sink.drain()
+        job.status = "selesai" if not failed else "sebagian"
+    finally:
+        if job.status == "berjalan":
+            # Client went away: drop the chunks nobody will read
+            for future in futures:
+                future.cancel()
+            job.status = "dibatalkan"
+        job.berakhir = datetime.now()
+        # Shielded: on a disconnect the surrounding task is already cancelled
+        with anyio.CancelScope(shield=True):
+            await _save_job(job)
@@ -0,0 +1,162 @@
+import re
+from typing import List, Optional, Tuple
+from ..core import pdf
+
+# Layout of one report card. Runs inside the rapor worker processes, so it must not
+# import the database layer: it only sees the plain dicts built by services.rapor.
+
+BULAN = [
+    "Januari", "Februari", "Maret", "April", "Mei", "Juni",
+    "Juli", "Agustus", "September", "Oktober", "November", "Desember",
+]
+KATEGORI = [("Umum", "A. Kelompok Umum"), ("Kejuruan", "B. Kelompok Kejuruan"), (None, "C. Lainnya")]
+
+MARGIN = 50
+ROW = 18
+# (title, x, width, align) of the grade table; the page is 595pt wide
+COLUMNS = [
+    ("No", 50, 28, "center"),
+    ("Mata Pelajaran", 78, 207, "left"),
+    ("UTS", 285, 55, "center"),
+    ("UAS", 340, 55, "center"),
+    ("Nilai Akhir", 395, 75, "center"),
+    ("Predikat", 470, 75, "center"),
+]
+TABLE_RIGHT = 545
+# Room kept under the table for the attendance block and signatures
+FOOTER_HEIGHT = 230
+
+def predikat(nilai: Optional[int]) -> str:
+    if nilai is None:
+        return "-"
+    if nilai >= 86:
+        return "A"
+    if nilai >= 71:
+        return "B"
+    if nilai >= 56:
+        return "C"
+    return "D"
+
+def tanggal_indonesia(tanggal) -> str:
+    return f"{tanggal.day} {BULAN[tanggal.month - 1]} {tanggal.year}"
+
+def _or_dash(value):
+    return "-" if value is None else value
+
+def _fit(text: str, width: float, size: float) -> str:
+    if pdf.text_width(text, size) <= width:
+        return text
+    while text and pdf.text_width(text + "...", size) > width:
+        text = text[:-1]
+    return text.rstrip() + "..."
+
+def _cell(page, column, y, text, bold=False):
+    _, x, width, align = column
+    text = _fit(str(text), width - 8, 9)
+    if align == "center":
+        page.text(x + width / 2, y + 12.5, text, 9, bold, "center")
+    else:
+        page.text(x + 4, y + 12.5, text, 9, bold)
+
+def _table_header(page, y: float) -> float:
+    page.rect(MARGIN, y, TABLE_RIGHT - MARGIN, ROW, fill=0.9)
+    for column in COLUMNS:
+        _cell(page, column, y, column[0], bold=True)
+        page.line(column[1], y, column[1], y + ROW)
+    page.line(TABLE_RIGHT, y, TABLE_RIGHT, y + ROW)
+    return y + ROW
+
+def _row(page, y: float, values) -> float:
+    for column, value in zip(COLUMNS, values):
+        _cell(page, column, y, value)
+        page.line(column[1], y, column[1], y + ROW)
+    page.line(TABLE_RIGHT, y, TABLE_RIGHT, y + ROW)
+    page.line(MARGIN, y + ROW, TABLE_RIGHT, y + ROW)
+    return y + ROW
+
+def _section(page, y: float, label: str) -> float:
+    page.rect(MARGIN, y, TABLE_RIGHT - MARGIN, ROW, fill=0.96)
+    page.text(MARGIN + 4, y + 12.5, label, 9, bold=True)
+    return y + ROW
+
+def _identity(page, header: dict, siswa: dict) -> float:
+    page.text(page.width / 2, 60, "LAPORAN HASIL BELAJAR PESERTA DIDIK", 14, bold=True, align="center")
+    page.text(page.width / 2, 78, header["sekolah"], 11, align="center")
+    page.line(MARGIN, 88, TABLE_RIGHT, 88, width=1.2)
+
+    left = [("Nama", siswa["nama"]), ("NISN", siswa["nisn"] or "-"), ("Kelas", header["kelas"])]
+    right = [("Program Keahlian", header["jurusan"]), ("Tahun Ajaran", header["tahun_ajaran"]), ("Semester", header["semester"])]
+    y = 108
+    for (label_l, value_l), (label_r, value_r) in zip(left, right):
+        page.text(MARGIN, y, label_l, 10)
+        page.text(MARGIN + 55, y, ":  " + _fit(str(value_l), 190, 10), 10)
+        page.text(320, y, label_r, 10)
+        page.text(410, y, ":  " + _fit(str(value_r), 130, 10), 10)
+        y += 15
+    return y + 10
+
+def _footer(page, y: float, header: dict, siswa: dict):
+    nilai = [row[4] for row in siswa["nilai"] if row[4] is not None]
+    rata = f"{sum(nilai) / len(nilai):.2f}" if nilai else "-"
+    page.text(MARGIN, y + 16, f"Rata-rata nilai akhir: {rata}", 10, bold=True)
+    if siswa["peringkat"]:
+        page.text(TABLE_RIGHT, y + 16, f"Peringkat kelas: {siswa['peringkat']} dari {header['jumlah_siswa']}", 10, bold=True, align="right")
+
+    absensi = siswa["absensi"]
+    y += 34
+    page.text(MARGIN, y, "Ketidakhadiran", 10, bold=True)
+    y += 6
+    for label, status in (("Sakit", "Sakit"), ("Izin", "Izin"), ("Tanpa Keterangan", "Alpa")):
+        page.rect(MARGIN, y, 230, ROW)
+        page.line(MARGIN + 150, y, MARGIN + 150, y + ROW)
+        page.text(MARGIN + 4, y + 12.5, label, 9)
+        page.text(MARGIN + 190, y + 12.5, f"{absensi[status]} hari", 9, align="center")
+        y += ROW
+    total = sum(absensi.values())
+    persen = f"{absensi['Hadir'] * 100 / total:.1f}%" if total else "-"
+    page.text(MARGIN, y + 14, f"Kehadiran: {absensi['Hadir']} dari {total} hari ({persen})", 9)
+
+    y += 40
+    page.text(MARGIN, y + 14, "Orang Tua/Wali", 10)
+    page.text(MARGIN, y + 80, "(................................)", 10)
+    page.text(360, y, f"{header['kota']}, {header['tanggal_rapor']}", 10)
+    page.text(360, y + 14, "Wali Kelas", 10)
+    page.text(360, y + 80, _fit(header["wali_nama"] or "................................", 185, 10), 10, bold=True)
+    if header["wali_nip"]:
+        page.text(360, y + 94, f"NIP. {header['wali_nip']}", 9)
+
+def render_rapor(header: dict, siswa: dict) -> bytes:
+    # siswa["nilai"]: (nama_mapel, kategori, uts, uas, akhir) rows in print order
+    page = pdf.Page()
+    pages = [page]
+    y = _table_header(page, _identity(page, header, siswa))
+    nomor = 0
+    for kategori, label in KATEGORI:
+        rows = [row for row in siswa["nilai"] if row[1] == kategori]
+        if not rows:
+            continue
+        y = _section(page, y, label)
+        for nama_mapel, _, uts, uas, akhir in rows:
+            if y + ROW > page.height - MARGIN:
+                page = pdf.Page()
+                pages.append(page)
+                y = _table_header(page, MARGIN)
+            nomor += 1
+            y = _row(page, y, (nomor, nama_mapel, _or_dash(uts), _or_dash(uas), _or_dash(akhir), predikat(akhir)))
+    if not siswa["nilai"]:
+        y = _row(page, y, ("", "Belum ada nilai", "", "", "", ""))
+
+    if y + FOOTER_HEIGHT > page.height - MARGIN:
+        page = pdf.Page()
+        pages.append(page)
+        y = MARGIN
+    _footer(page, y, header, siswa)
+    return pdf.render(pages, f"Rapor {siswa['nama']} - {header['kelas']}")
+
+def filename(siswa: dict) -> str:
+    slug = re.sub(r"[^A-Za-z0-9]+", "_", siswa["nama"]).strip("_") or "siswa"
+    return f"{siswa['nisn'] or siswa['id_siswa']}_{slug}.pdf"
+
+# Worker entry point: one chunk of students per task keeps pickling overhead low
+def render_chunk(header: dict, students: List[dict]) -> List[Tuple[str, bytes]]:
+    return [(filename(siswa), render_rapor(header, siswa)) for siswa in students]
@@ -0,0 +1,70 @@
+import os
+from sqlalchemy import func, or_, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from ..core.cache import TTLCache
+from ..models import models
+
+STATISTICS_CACHE_TTL = int(os.getenv("STATISTICS_CACHE_TTL", "30"))
+
+# Admin dashboard snapshot, dropped by writes to siswa, guru, kelas, mapel and berita
+statistics_cache = TTLCache(ttl=STATISTICS_CACHE_TTL, maxsize=16)
+
+# gender_distribution key of students whose jenis_kelamin is not set
+UNKNOWN_GENDER = "Tidak diketahui"
+
+def invalidate_admin_statistics():
+    statistics_cache.invalidate("statistics:admin")
+
+def _count(model, *criteria):
+    return select(func.count()).select_from(model).where(*criteria).scalar_subquery()
+
+def _statistics_statement():
+    # Every counter as a scalar subquery of one SELECT: a single round trip
+    return select(
+        _count(models.Siswa).label("total_siswa"),
+        _count(models.Guru).label("total_guru"),
+        _count(models.Kelas).label("total_kelas"),
+        _count(models.MataPelajaran).label("total_mapel"),
+        _count(models.Siswa, models.Siswa.jenis_kelamin == "Laki-laki").label("laki_laki"),
+        _count(models.Siswa, models.Siswa.jenis_kelamin == "Perempuan").label("perempuan"),
+        # NULL or any other value, so the distribution still adds up to total_siswa
+        _count(models.Siswa, or_(
+            models.Siswa.jenis_kelamin.is_(None),
+            models.Siswa.jenis_kelamin.not_in(["Laki-laki", "Perempuan"])
+        )).label("tidak_diketahui"),
+    )
+
+def _recent_news_statement(limit: int = 5):
+    return select(
+        models.Berita.id_berita,
+        models.Berita.judul,
+        models.Berita.gambar,
+        models.Berita.tanggal_post
+    ).order_by(models.Berita.tanggal_post.desc()).limit(limit)
+
+async def _load_admin_statistics(db: AsyncSession) -> dict:
+    counts = (await db.execute(_statistics_statement())).one()
+    recent_news = (await db.execute(_recent_news_statement())).all()
+
+    gender_distribution = {
+        jenis_kelamin: total
+        for jenis_kelamin, total in (
+            ("Laki-laki", counts.laki_laki),
+            ("Perempuan", counts.perempuan),
+            (UNKNOWN_GENDER, counts.tidak_diketahui),
+        )
+        if total
+    }
+    return {
+        "total_siswa": counts.total_siswa,
+        "total_guru": counts.total_guru,
+        "total_kelas": counts.total_kelas,
+        "total_mapel": counts.total_mapel,
+        "recent_news": [dict(row._mapping) for row in recent_news],
+        "gender_distribution": gender_distribution
+    }
+
+async def get_admin_statistics(db: AsyncSession) -> dict:
+    return await statistics_cache.aget_or_set(
+        "admin", lambda: _load_admin_statistics(db), tags=["statistics:admin"]
+    )
@@ -0,0 +1,87 @@
+from typing import Iterable
+from sqlalchemy import func, select
+from sqlalchemy.orm import Session
+from ..database import dialect_insert
+from ..models import models
+
+ATTENDANCE_COLUMNS = {
+    "Hadir": "hadir",
+    "Izin": "izin",
+    "Sakit": "sakit",
+    "Alpa": "alpa",
+}
+
+SUMMARY_COLUMNS = ["id_siswa", "jumlah_nilai", "total_nilai", *ATTENDANCE_COLUMNS.values()]
+
+def _summary_select(id_siswa_list: list):
+    # NULL nilai_akhir is skipped by COUNT/SUM, so the average never sees it
+    nilai = select(
+        models.Nilai.id_siswa,
+        func.count(models.Nilai.nilai_akhir).label("jumlah_nilai"),
+        func.sum(models.Nilai.nilai_akhir).label("total_nilai")
+    ).where(
+        models.Nilai.id_siswa.in_(id_siswa_list)
+    ).group_by(models.Nilai.id_siswa).subquery()
+
+    absensi = select(
+        models.Absensi.id_siswa,
+        *[
+            func.count().filter(models.Absensi.status == status).label(column)
+            for status, column in ATTENDANCE_COLUMNS.items()
+        ]
+    ).where(
+        models.Absensi.id_siswa.in_(id_siswa_list)
+    ).group_by(models.Absensi.id_siswa).subquery()
+
+    return select(
+        models.Siswa.id_siswa,
+        func.coalesce(nilai.c.jumlah_nilai, 0),
+        func.coalesce(nilai.c.total_nilai, 0),
+        *[func.coalesce(absensi.c[column], 0) for column in ATTENDANCE_COLUMNS.values()]
+    ).outerjoin(
+        nilai, nilai.c.id_siswa == models.Siswa.id_siswa
+    ).outerjoin(
+        absensi, absensi.c.id_siswa == models.Siswa.id_siswa
+    ).where(models.Siswa.id_siswa.in_(id_siswa_list))
+
+def refresh_student_summary(db: Session, id_siswa_list: Iterable[int]):
+    # Recompute only the touched students; each one reads just its own nilai/absensi rows
+    id_siswa_list = sorted(set(id_siswa_list))
+    if not id_siswa_list:
+        return
+
+    insert = dialect_insert(db)
+    stmt = insert(models.RingkasanSiswa).from_select(SUMMARY_COLUMNS, _summary_select(id_siswa_list))
+    stmt = stmt.on_conflict_do_update(
+        index_elements=[models.RingkasanSiswa.id_siswa],
+        set_={column: stmt.excluded[column] for column in SUMMARY_COLUMNS[1:]}
+    )
+    db.execute(stmt)
+
+def load_student_summary(db: Session, id_siswa: int):
+    subjects = select(func.count(models.MapelDiampu.id_ampu)).join(
+        models.Siswa, models.Siswa.id_kelas == models.MapelDiampu.id_kelas
+    ).where(models.Siswa.id_siswa == id_siswa).scalar_subquery()
+
+    stmt = select(models.RingkasanSiswa, subjects.label("total_subjects")).where(
+        models.RingkasanSiswa.id_siswa == id_siswa
+    )
+    row = db.execute(stmt).first()
+    if row is None:
+        # Students without a summary yet (e.g. rows that predate the table) are backfilled once
+        refresh_student_summary(db, [id_siswa])
+        db.commit()
+        row = db.execute(stmt).first()
+    if row is None:
+        return None
+
+    summary, total_subjects = row
+    return {
+        "average_grade": round(summary.total_nilai / summary.jumlah_nilai, 2) if summary.jumlah_nilai else 0,
+        "attendance": {
+            status: getattr(summary, column)
+            for status, column in ATTENDANCE_COLUMNS.items()
+            if getattr(summary, column)
+        },
+        "total_subjects": total_subjects,
+    }
@@ -0,0 +1,51 @@
+import asyncio
+import os
+import time
+from sqlalchemy import select
+from ..database import SessionLocal
+from ..models import models
+from .images import UPLOAD_DIR, image_files
+
+UPLOAD_SWEEP_INTERVAL = int(os.getenv("UPLOAD_SWEEP_INTERVAL", "3600"))
+UPLOAD_SWEEP_BATCH = int(os.getenv("UPLOAD_SWEEP_BATCH", "500"))
+# Files younger than this may belong to an upload whose row is not committed yet
+UPLOAD_SWEEP_GRACE = int(os.getenv("UPLOAD_SWEEP_GRACE", "3600"))
+
+def sweep_orphans(folder: str = "berita", batch: int = UPLOAD_SWEEP_BATCH, grace: int = UPLOAD_SWEEP_GRACE) -> int:
+    directory = os.path.join(UPLOAD_DIR, folder)
+    if not os.path.isdir(directory):
+        return 0
+
+    db = SessionLocal()
+    try:
+        referenced = set()
+        for gambar in db.scalars(select(models.Berita.gambar).where(models.Berita.gambar.is_not(None))):
+            referenced.update(os.path.basename(path) for path in image_files(gambar))
+    finally:
+        db.close()
+
+    cutoff = time.time() - grace
+    removed = 0
+    with os.scandir(directory) as entries:
+        for entry in entries:
+            if removed >= batch:
+                break
+            if not entry.is_file() or entry.name in referenced:
+                continue
+            try:
+                if entry.stat().st_mtime > cutoff:
+                    continue
+                os.remove(entry.path)
+                removed += 1
+            except FileNotFoundError:
+                pass
+    return removed
+
+async def sweep_periodically(interval: int = UPLOAD_SWEEP_INTERVAL):
+    while True:
+        await asyncio.sleep(interval)
+        try:
+            await asyncio.to_thread(sweep_orphans)
+        except Exception:
+            # A failed sweep (e.g. database down) is retried on the next tick
+            pass
@@ -0,0 +1,90 @@
+import argparse
+import asyncio
+import json
+import os
+import statistics
+import sys
+import time
+
+# Get the absolute path of the 'backend' directory
+backend_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+# Add it to sys.path so 'app' can be imported
+sys.path.insert(0, backend_dir)
+
+import httpx
+from fastapi import Depends, FastAPI
+from sqlalchemy import select, text
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+from app.database import get_db, get_async_db, engine
+from app.models import models
+
+# Same query served through the sync (threadpool) and async (event loop) paths.
+# On PostgreSQL, --latency adds pg_sleep() to every request to stand in for
+# network round trips and slow queries; that wait is what holds a thread.
+
+def build_app(latency: float) -> FastAPI:
+    app = FastAPI()
+    sleep = text("SELECT pg_sleep(:s)") if latency and engine.dialect.name == "postgresql" else None
+    stmt = select(models.Siswa).order_by(models.Siswa.id_siswa).limit(50)
+
+    @app.get("/sync")
+    def sync_path(db: Session = Depends(get_db)):
+        if sleep is not None:
+            db.execute(sleep, {"s": latency})
+        return len(db.scalars(stmt).all())
+
+    @app.get("/async")
+    async def async_path(db: AsyncSession = Depends(get_async_db)):
+        if sleep is not None:
+            await db.execute(sleep, {"s": latency})
+        return len((await db.scalars(stmt)).all())
+
+    return app
+
+async def run(app: FastAPI, path: str, requests: int, concurrency: int):
+    latencies = []
+    semaphore = asyncio.Semaphore(concurrency)
+    transport = httpx.ASGITransport(app=app)
+
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        async def one():
+            async with semaphore:
+                started = time.perf_counter()
+                response = await client.get(path)
+                response.raise_for_status()
+                latencies.append(time.perf_counter() - started)
+
+        started = time.perf_counter()
+        await asyncio.gather(*(one() for _ in range(requests)))
+        elapsed = time.perf_counter() - started
+
+    latencies.sort()
+    quantiles = statistics.quantiles(latencies, n=100)
+    return {
+        "path": path,
+        "requests": requests,
+        "concurrency": concurrency,
+        "seconds": round(elapsed, 3),
+        "rps": round(requests / elapsed, 1),
+        "p50_ms": round(quantiles[49] * 1000, 2),
+        "p95_ms": round(quantiles[94] * 1000, 2),
+        "p99_ms": round(quantiles[98] * 1000, 2),
+    }
+
+async def main():
+    parser = argparse.ArgumentParser(description="Compare the sync and async database paths")
+    parser.add_argument("--requests", type=int, default=2000)
+    parser.add_argument("--concurrency", type=int, default=200)
+    parser.add_argument("--latency", type=float, default=0.02, help="pg_sleep seconds per request (PostgreSQL only)")
+    args = parser.parse_args()
+
+    app = build_app(args.latency)
+    results = [
+        await run(app, "/sync", args.requests, args.concurrency),
+        await run(app, "/async", args.requests, args.concurrency),
+    ]
+    print(json.dumps({"database": engine.dialect.name, "results": results}, indent=2))
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,248 @@
+import argparse
+import asyncio
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import time
+from datetime import datetime, timezone
+
+# Get the absolute path of the 'backend' directory
+backend_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+# Add it to sys.path so 'app' can be imported
+sys.path.insert(0, backend_dir)
+os.chdir(backend_dir)
+
+import httpx
+from sqlalchemy import event, func, select
+from app.core.security import create_access_token
+from app.database import SessionLocal, async_engine, engine
+from app.models import models
+import seed
+
+# Load-tests every router of the real app (main.py) in-process over ASGI and
+# writes one JSON document per run. Compare two runs with --compare to catch
+# regressions between commits:
+#
+#   DATABASE_URL=sqlite:///bench.db python benchmarks/endpoints.py --seed --output before.json
+#   ... change code ...
+#   DATABASE_URL=sqlite:///bench.db python benchmarks/endpoints.py --output after.json --compare before.json
+
+# (name, method, path, role, body); {id_*} placeholders are filled from the dataset
+SCENARIOS = [
+    ("auth.login", "POST", "/api/auth/login", None, "login"),
+    ("auth.profile", "GET", "/api/auth/profile", "Admin", None),
+    ("kelas.list", "GET", "/api/kelas/", "Admin", None),
+    ("mapel.list", "GET", "/api/mapel/", "Admin", None),
+    ("siswa.list", "GET", "/api/siswa/?limit=100", "Admin", None),
+    ("siswa.by_kelas", "GET", "/api/siswa/?id_kelas={id_kelas}", "Admin", None),
+    ("siswa.get", "GET", "/api/siswa/{id_siswa}", "Admin", None),
+    ("guru.list", "GET", "/api/guru/?limit=100", "Admin", None),
+    ("dashboard.statistics", "GET", "/api/dashboard/statistics", "Admin", None),
+    ("dashboard.guru", "GET", "/api/dashboard/statistics/guru", "Guru", None),
+    ("dashboard.siswa", "GET", "/api/dashboard/statistics/siswa", "Siswa", None),
+    ("dashboard.jadwal", "GET", "/api/dashboard/jadwal", "Guru", None),
+    ("dashboard.rekap_absensi", "GET", "/api/dashboard/rekap-absensi", "Guru", None),
+    ("nilai.guru_me", "GET", "/api/nilai/guru/me", "Guru", None),
+    ("nilai.siswa_me", "GET", "/api/nilai/siswa/me", "Siswa", None),
+    ("nilai.upsert", "POST", "/api/nilai/", "Guru", "nilai"),
+    ("nilai.statistik", "GET", "/api/nilai/statistik?id_kelas={id_kelas}", "Admin", None),
+    ("absensi.rekap", "GET", "/api/absensi/rekap?group_by=siswa&tanggal_mulai={absensi_mulai}", "Guru", None),
+    ("absensi.siswa", "GET", "/api/absensi/siswa/{id_siswa}", "Guru", None),
+    ("absensi.kelas", "POST", "/api/absensi/kelas/{id_kelas}", "Guru", "absensi"),
+    ("berita.list", "GET", "/api/berita/?limit=20&summary=true", "Admin", None),
+    ("berita.public", "GET", "/api/berita/public", None, None),
+    ("berita.public_all", "GET", "/api/berita/public/all?limit=50&summary=true", None, None),
+    ("berita.public_get", "GET", "/api/berita/public/{id_berita}", None, None),
+    ("berita.search", "GET", "/api/berita/search?q=kompetensi%20siswa", None, None),
+    ("export.absensi_csv", "GET", "/api/export/absensi?format=csv&id_kelas={id_kelas}", "Guru", None),
+    ("monitoring.pool", "GET", "/api/monitoring/pool", "Admin", None),
+]
+
+class StatementCounter:
+    def __init__(self):
+        self.count = 0
+        for target in (engine, async_engine.sync_engine):
+            event.listen(target, "before_cursor_execute", self._count)
+
+    def _count(self, *args, **kwargs):
+        self.count += 1
+
+def _context():
+    db = SessionLocal()
+    try:
+        users = {user.role: user for user in db.scalars(select(models.Pengguna))}
+        missing = {"Admin", "Guru", "Siswa"} - users.keys()
+        if missing:
+            raise SystemExit(f"No {', '.join(sorted(missing))} user found; run with --seed against an empty database")
+        tokens = {
+            role: create_access_token({
+                "sub": user.username, "id_user": user.id_user, "role": user.role,
+                "id_guru": user.id_guru, "id_siswa": user.id_siswa, "ver": user.token_version or 0,
+            })
+            for role, user in users.items()
+        }
+        siswa = db.get(models.Siswa, users["Siswa"].id_siswa)
+        ampu = db.scalars(select(models.MapelDiampu).where(models.MapelDiampu.id_kelas == siswa.id_kelas)).first()
+        return {
+            "tokens": tokens,
+            "username": users["Admin"].username,
+            "id_siswa": siswa.id_siswa,
+            "id_kelas": siswa.id_kelas,
+            "id_mapel": ampu.id_mapel if ampu else None,
+            "id_berita": db.scalar(select(func.max(models.Berita.id_berita))),
+            "absensi_mulai": db.scalar(select(func.min(models.Absensi.tanggal))) or datetime.now().date(),
+            "sizes": {
+                table: db.scalar(select(func.count()).select_from(model))
+                for table, model in (("kelas", models.Kelas), ("siswa", models.Siswa), ("guru", models.Guru),
+                                     ("nilai", models.Nilai), ("absensi", models.Absensi), ("berita", models.Berita))
+            },
+        }
+    finally:
+        db.close()
+
+def _request_kwargs(body, ctx):
+    if body == "login":
+        return {"data": {"username": ctx["username"], "password": seed.DEFAULT_PASSWORD}}
+    if body == "nilai":
+        return {"json": {"id_siswa": ctx["id_siswa"], "id_mapel": ctx["id_mapel"], "nilai_uts": 80, "nilai_uas": 90}}
+    if body == "absensi":
+        return {"json": {"tanggal": datetime.now().date().isoformat(), "status": {}}}
+    return {}
+
+def _quantile(sorted_values, q):
+    if len(sorted_values) == 1:
+        return sorted_values[0]
+    return statistics.quantiles(sorted_values, n=100, method="inclusive")[q - 1]
+
+async def run_scenario(client, counter, scenario, ctx, requests, concurrency):
+    name, method, path, role, body = scenario
+    url = path.format(**ctx)
+    headers = {"Authorization": f"Bearer {ctx['tokens'][role]}"} if role else {}
+    kwargs = _request_kwargs(body, ctx)
+    semaphore = asyncio.Semaphore(concurrency)
+    latencies, errors = [], 0
+
+    (await client.request(method, url, headers=headers, **kwargs)).raise_for_status()  # warm up
+
+    async def one():
+        nonlocal errors
+        async with semaphore:
+            started = time.perf_counter()
+            response = await client.request(method, url, headers=headers, **kwargs)
+            latencies.append(time.perf_counter() - started)
+            if response.status_code >= 400:
+                errors += 1
+
+    statements_before = counter.count
+    started = time.perf_counter()
+    await asyncio.gather(*(one() for _ in range(requests)))
+    elapsed = time.perf_counter() - started
+    statements = counter.count - statements_before
+
+    latencies.sort()
+    return {
+        "name": name,
+        "method": method,
+        "path": path,
+        "requests": requests,
+        "concurrency": concurrency,
+        "errors": errors,
+        "rps": round(requests / elapsed, 1),
+        "p50_ms": round(_quantile(latencies, 50) * 1000, 2),
+        "p95_ms": round(_quantile(latencies, 95) * 1000, 2),
+        "p99_ms": round(_quantile(latencies, 99) * 1000, 2),
+        "statements_per_request": round(statements / requests, 2),
+    }
+
+def _git_commit():
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+def compare(results, baseline_path, threshold):
+    with open(baseline_path) as f:
+        baseline = {row["name"]: row for row in json.load(f)["results"]}
+    regressions = []
+    print(f"{'scenario':28} {'p95 before':>11} {'p95 after':>10} {'change':>8} {'sql':>9}", file=sys.stderr)
+    for row in results:
+        before = baseline.get(row["name"])
+        if before is None:
+            continue
+        change = (row["p95_ms"] - before["p95_ms"]) / before["p95_ms"] * 100 if before["p95_ms"] else 0.0
+        sql = f"{before['statements_per_request']:g}->{row['statements_per_request']:g}"
+        print(f"{row['name']:28} {before['p95_ms']:>11} {row['p95_ms']:>10} {change:>7.1f}% {sql:>9}", file=sys.stderr)
+        if change > threshold or row["statements_per_request"] > before["statements_per_request"]:
+            regressions.append(row["name"])
+    return regressions
+
+async def main():
+    parser = argparse.ArgumentParser(description="Benchmark every router against a synthetic school")
+    parser.add_argument("--seed", action="store_true", help="Load the synthetic dataset into an empty database first")
+    parser.add_argument("--schools", type=int, default=1)
+    parser.add_argument("--classes", type=int, default=100, help="Classes per school")
+    parser.add_argument("--students", type=int, default=40, help="Students per class")
+    parser.add_argument("--mapel", type=int, default=15)
+    parser.add_argument("--days", type=int, default=180, help="School days of absensi")
+    parser.add_argument("--berita", type=int, default=300)
+    parser.add_argument("--requests", type=int, default=200, help="Requests per scenario")
+    parser.add_argument("--concurrency", type=int, default=20)
+    parser.add_argument("--only", action="append", help="Run scenarios whose name starts with this prefix")
+    parser.add_argument("--output", help="Write the JSON results to this file as well as stdout")
+    parser.add_argument("--compare", help="Baseline JSON from a previous run")
+    parser.add_argument("--threshold", type=float, default=10.0, help="Allowed p95 slowdown in percent")
+    args = parser.parse_args()
+
+    dataset_info = None
+    if args.seed:
+        try:
+            dataset_info = seed.generate(
+                args.schools, args.classes, args.students, args.mapel, args.days, args.berita,
+                log=lambda line: print(line, file=sys.stderr)
+            )
+        except RuntimeError as exc:
+            raise SystemExit(str(exc))
+
+    import main as application
+    ctx = _context()
+    counter = StatementCounter()
+    scenarios = [s for s in SCENARIOS if not args.only or s[0].startswith(tuple(args.only))]
+
+    results = []
+    transport = httpx.ASGITransport(app=application.app)
+    async with application.app.router.lifespan_context(application.app):
+        async with httpx.AsyncClient(transport=transport, base_url="http://bench", timeout=None) as client:
+            for scenario in scenarios:
+                # bcrypt is deliberately slow; keep login runs short
+                requests = min(args.requests, 20) if scenario[0] == "auth.login" else args.requests
+                result = await run_scenario(client, counter, scenario, ctx, requests, args.concurrency)
+                print(f"{result['name']:28} p95 {result['p95_ms']:>9} ms  {result['rps']:>8} rps  "
+                      f"{result['statements_per_request']:>6} sql/req", file=sys.stderr)
+                results.append(result)
+
+    report = {
+        "commit": _git_commit(),
+        "timestamp": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "database": engine.dialect.name,
+        "python": platform.python_version(),
+        "dataset": ctx["sizes"],
+        "seeded": dataset_info,
+        "results": results,
+    }
+    output = json.dumps(report, indent=2)
+    print(output)
+    if args.output:
+        with open(args.output, "w") as f:
+            f.write(output + "\n")
+
+    if args.compare:
+        regressions = compare(results, args.compare, args.threshold)
+        if regressions:
+            print(f"Regressions: {', '.join(regressions)}", file=sys.stderr)
+            sys.exit(1)
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,93 @@
+import argparse
+import json
+import os
+import statistics
+import sys
+import time
+
+# Get the absolute path of the 'backend' directory
+backend_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+# Add it to sys.path so 'app' can be imported
+sys.path.insert(0, backend_dir)
+os.chdir(backend_dir)
+# Measure rendering, not the public berita cache
+os.environ.setdefault("BERITA_CACHE_TTL", "0")
+
+from fastapi.testclient import TestClient
+from app.core.security import create_access_token
+from app.database import SessionLocal, engine
+from app.models import models
+import seed
+
+# Time the large list endpoints end to end (query, validation, JSON encoding).
+# Point DATABASE_URL at a scratch database and pass --seed on the first run.
+
+ENDPOINTS = [
+    "/api/nilai/",
+    "/api/guru/?limit=1000",
+    "/api/siswa/?limit=1000",
+    "/api/berita/public/all",
+]
+
+def admin_token() -> str:
+    db = SessionLocal()
+    try:
+        user = db.query(models.Pengguna).filter(models.Pengguna.role == "Admin").first()
+        if user is None:
+            raise SystemExit("No Admin user found; run with --seed against an empty database")
+        return create_access_token({
+            "sub": user.username, "id_user": user.id_user, "role": user.role,
+            "id_guru": user.id_guru, "id_siswa": user.id_siswa, "ver": user.token_version or 0,
+        })
+    finally:
+        db.close()
+
+def measure(client: TestClient, path: str, headers: dict, requests: int) -> dict:
+    client.get(path, headers=headers).raise_for_status()  # warm up
+    latencies = []
+    size = 0
+    for _ in range(requests):
+        started = time.perf_counter()
+        response = client.get(path, headers=headers)
+        latencies.append(time.perf_counter() - started)
+        response.raise_for_status()
+        size = len(response.content)
+    latencies.sort()
+    quantiles = statistics.quantiles(latencies, n=100) if len(latencies) > 1 else latencies * 99
+    return {
+        "path": path,
+        "requests": requests,
+        "bytes": size,
+        "mean_ms": round(statistics.fmean(latencies) * 1000, 2),
+        "p50_ms": round(quantiles[49] * 1000, 2),
+        "p95_ms": round(quantiles[94] * 1000, 2),
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description="Time large list endpoint responses")
+    parser.add_argument("--seed", action="store_true", help="Create tables and load a synthetic dataset first")
+    parser.add_argument("--classes", type=int, default=40)
+    parser.add_argument("--students", type=int, default=25, help="Students per class")
+    parser.add_argument("--mapel", type=int, default=20, help="Mapel count, one nilai per siswa per mapel")
+    parser.add_argument("--berita", type=int, default=300)
+    parser.add_argument("--requests", type=int, default=20)
+    parser.add_argument("--endpoint", action="append", help="Override the endpoint list")
+    args = parser.parse_args()
+
+    if args.seed:
+        try:
+            seed.generate(
+                classes=args.classes, students=args.students, mapel=args.mapel, days=0, berita=args.berita,
+                log=lambda line: print(line, file=sys.stderr)
+            )
+        except RuntimeError as exc:
+            raise SystemExit(str(exc))
+
+    import main as application
+    headers = {"Authorization": f"Bearer {admin_token()}"}
+    with TestClient(application.app) as client:
+        results = [measure(client, path, headers, args.requests) for path in args.endpoint or ENDPOINTS]
+    print(json.dumps({"database": engine.dialect.name, "results": results}, indent=2))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,116 @@
+import argparse
+import os
+import sys
+from datetime import date
+
+# Get the absolute path of the 'backend' directory
+backend_dir = os.path.dirname(os.path.abspath(__file__))
+# Add it to sys.path so 'app' can be imported
+sys.path.insert(0, backend_dir)
+
+from sqlalchemy import select, text
+from app.database import engine
+from app.core import schema
+from app.models import models
+
+# Hot read paths and the index each one is expected to use
+HOT_QUERIES = [
+    (
+        "nilai of one student",
+        select(models.Nilai).where(models.Nilai.id_siswa == 1),
+        "nilai", "uq_nilai_siswa_mapel"
+    ),
+    (
+        "absensi of one student",
+        select(models.Absensi).where(models.Absensi.id_siswa == 1),
+        "absensi", "uq_absensi_siswa_tanggal"
+    ),
+    (
+        "absensi of one class over a date range",
+        select(models.Absensi).where(
+            models.Absensi.id_kelas == 1,
+            models.Absensi.tanggal.between(date(2026, 1, 1), date(2026, 1, 31))
+        ),
+        "absensi", "ix_absensi_kelas_tanggal"
+    ),
+    (
+        "absensi of the whole school over a date range",
+        select(models.Absensi.status).where(
+            models.Absensi.tanggal.between(date(2026, 1, 1), date(2026, 1, 31))
+        ),
+        "absensi", "ix_absensi_tanggal"
+    ),
+    (
+        "attendance rollup of one student",
+        select(models.RekapAbsensiBulanan).where(models.RekapAbsensiBulanan.id_siswa == 1),
+        "rekap_absensi_bulanan", "ix_rekap_absensi_bulanan_siswa"
+    ),
+    (
+        "class roster",
+        select(models.Siswa).where(models.Siswa.id_kelas == 1),
+        "siswa", "ix_siswa_id_kelas"
+    ),
+    (
+        "teaching assignments of one guru",
+        select(models.MapelDiampu).where(models.MapelDiampu.id_guru == 1),
+        "mapel_diampu", "ix_mapel_diampu_id_guru"
+    ),
+    (
+        "news feed, first page",
+        select(models.Berita.id_berita, models.Berita.judul).order_by(
+            models.Berita.tanggal_post.desc(), models.Berita.id_berita.desc()
+        ).limit(10),
+        "berita", "ix_berita_tanggal_post"
+    ),
+]
+
+def explain(connection, statement) -> str:
+    compiled = statement.compile()
+    if connection.dialect.name == "postgresql":
+        # Tiny or fresh tables make a seq scan cheapest; ask whether the index is usable at all
+        connection.execute(text("SET LOCAL enable_seqscan = off"))
+        rows = connection.execute(text(f"EXPLAIN {compiled}"), compiled.params)
+    else:
+        rows = connection.execute(text(f"EXPLAIN QUERY PLAN {compiled}"), compiled.params)
+    return "\n".join(str(row[-1]) for row in rows)
+
+def uses_index(connection, plan: str, table: str, index: str) -> bool:
+    if index in plan:
+        return True
+    # SQLite names the indexes behind UNIQUE constraints sqlite_autoindex_<table>_N
+    return connection.dialect.name == "sqlite" and f"sqlite_autoindex_{table}_" in plan
+
+def main():
+    parser = argparse.ArgumentParser(description="Report indexes missing from the database")
+    parser.add_argument("--explain", action="store_true", help="Also check the query plans of the hot queries")
+    args = parser.parse_args()
+
+    ok = True
+    current, head = schema.current_revision(), schema.head_revision()
+    print(f"Database: {engine.url.render_as_string(hide_password=True)}")
+    print(f"Migration: {current or 'none'} (head {head})")
+    if current != head:
+        print("  run `alembic upgrade head`")
+        ok = False
+
+    missing = schema.missing_indexes()
+    for item in missing:
+        print(f"MISSING {item['kind']} {item['name'] or ''} on {item['table']}({', '.join(item['columns'])})")
+    if not missing:
+        print("All model indexes present")
+    ok = ok and not missing
+
+    if args.explain:
+        with engine.connect() as connection:
+            for label, statement, table, index in HOT_QUERIES:
+                with connection.begin():
+                    plan = explain(connection, statement)
+                used = uses_index(connection, plan, table, index)
+                ok = ok and used
+                print(f"\n[{'OK' if used else 'NO INDEX'}] {label} -> {index}")
+                print("  " + plan.replace("\n", "\n  "))
+
+    sys.exit(0 if ok else 1)
+
+if __name__ == "__main__":
+    main()
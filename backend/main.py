@@ -1,13 +1,36 @@
-from fastapi import FastAPI
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.staticfiles import StaticFiles
+import asyncio
 import os
-from app.api import auth, kelas, siswa, guru, mapel, dashboard, nilai, absensi, berita
-from app.database import engine, Base
+import time
+from contextlib import asynccontextmanager
+from app.api import auth, kelas, siswa, guru, mapel, dashboard, nilai, absensi, berita, monitoring, export, metrics, rapor
+from app.core.hashing import HashingBusy, hashing_pool
+from app.core.pool_metrics import current_request
+from app.core.metrics import RequestStats, observe_request, request_stats, route_template
+from app.services.images import CONTENT_ADDRESSED, UPLOAD_REQUEST_MAX_BYTES, image_pool
+from app.services.rapor import rapor_pool
+from app.services.upload_sweeper import UPLOAD_SWEEP_INTERVAL, sweep_periodically
+from app.core.body_limit import BodySizeLimitMiddleware
+from app.core.static import CachedStaticFiles
+from app.core.responses import default_response_class
 
-Base.metadata.create_all(bind=engine)
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    sweeper = asyncio.create_task(sweep_periodically()) if UPLOAD_SWEEP_INTERVAL > 0 else None
+    yield
+    if sweeper is not None:
+        sweeper.cancel()
+    hashing_pool.shutdown()
+    image_pool.shutdown()
+    rapor_pool.shutdown()
 
-app = FastAPI(title="School Management System API")
+app = FastAPI(
+    title="School Management System API",
+    lifespan=lifespan,
+    default_response_class=default_response_class
+)
 
 uploads_dir = "uploads"
 if not os.path.exists(uploads_dir):
@@ -15,19 +38,54 @@ if not os.path.exists(uploads_dir):
 if not os.path.exists(os.path.join(uploads_dir, "berita")):
     os.makedirs(os.path.join(uploads_dir, "berita"))
 
-app.mount("/api/uploads", StaticFiles(directory=uploads_dir), name="uploads")
+# Content-addressed names never change content, so they can be cached forever
+app.mount(
+    "/api/uploads",
+    CachedStaticFiles(directory=uploads_dir, immutable=CONTENT_ADDRESSED.match),
+    name="uploads"
+)
 
 origins = [
     "http://localhost:3000",
     "https://smkn-4-padalarang.vercel.app",
 ]
 
+@app.exception_handler(HashingBusy)
+async def hashing_busy_handler(request: Request, exc: HashingBusy):
+    return JSONResponse(
+        status_code=503,
+        content={"detail": "Server is busy, please retry shortly"},
+        headers={"Retry-After": str(exc.retry_after)},
+    )
+
+# Oversized image uploads are refused before their body is read
+app.add_middleware(BodySizeLimitMiddleware, limits={"/api/berita": UPLOAD_REQUEST_MAX_BYTES})
+
+@app.middleware("http")
+async def track_route(request: Request, call_next):
+    # Lets the pool monitor attribute connection hold time to a route and
+    # collects latency / SQL statement counts for /api/metrics
+    token = current_request.set(request.scope)
+    stats = RequestStats()
+    stats_token = request_stats.set(stats)
+    started = time.perf_counter()
+    status_code = 500
+    try:
+        response = await call_next(request)
+        status_code = response.status_code
+        return response
+    finally:
+        observe_request(request.method, route_template(request.scope), status_code, time.perf_counter() - started, stats)
+        request_stats.reset(stats_token)
+        current_request.reset(token)
+
 app.add_middleware(
     CORSMiddleware,
     allow_origins=origins,
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["X-Total-Count", "X-Next-Cursor", "Content-Disposition"],
 )
 
 app.include_router(auth.router, prefix="/api/auth", tags=["Auth"])
@@ -39,6 +97,10 @@ app.include_router(dashboard.router, prefix="/api/dashboard", tags=["Dashboard"]
 app.include_router(nilai.router, prefix="/api/nilai", tags=["Nilai"])
 app.include_router(absensi.router, prefix="/api/absensi", tags=["Absensi"])
 app.include_router(berita.router, prefix="/api/berita", tags=["Berita"])
+app.include_router(export.router, prefix="/api/export", tags=["Export"])
+app.include_router(rapor.router, prefix="/api/rapor", tags=["Rapor"])
+app.include_router(monitoring.router, prefix="/api/monitoring", tags=["Monitoring"])
+app.include_router(metrics.router, prefix="/api/metrics", tags=["Monitoring"])
 
 @app.get("/")
 def read_root():
@@ -0,0 +1,62 @@
+from logging.config import fileConfig
+
+from sqlalchemy import create_engine, pool
+
+from alembic import context
+
+from app.database import SQLALCHEMY_DATABASE_URL, Base
+from app.models import models  # noqa: F401  registers every table on Base.metadata
+
+config = context.config
+
+if config.config_file_name is not None and config.attributes.get("configure_logger", True):
+    fileConfig(config.config_file_name)
+
+target_metadata = Base.metadata
+
+# Search objects from 0004 live outside the models (dialect-specific)
+SEARCH_OBJECTS = ("search_vector", "ix_berita_search_vector")
+
+def include_object(object, name, type_, reflected, compare_to):
+    if reflected and (name in SEARCH_OBJECTS or (type_ == "table" and name.startswith("berita_fts"))):
+        return False
+    return True
+
+def _configure(**options):
+    context.configure(
+        target_metadata=target_metadata,
+        include_object=include_object,
+        # SQLite can't ALTER constraints in place; batch mode rebuilds the table
+        render_as_batch=True,
+        compare_type=True,
+        **options
+    )
+
+def run_migrations_offline() -> None:
+    _configure(
+        url=SQLALCHEMY_DATABASE_URL,
+        literal_binds=True,
+        dialect_opts={"paramstyle": "named"},
+    )
+    with context.begin_transaction():
+        context.run_migrations()
+
+def run_migrations_online() -> None:
+    # app.core.schema.upgrade() hands over an open connection; the CLI makes its own
+    connection = config.attributes.get("connection")
+    if connection is not None:
+        _configure(connection=connection)
+        with context.begin_transaction():
+            context.run_migrations()
+        return
+
+    connectable = create_engine(SQLALCHEMY_DATABASE_URL, poolclass=pool.NullPool)
+    with connectable.connect() as connection:
+        _configure(connection=connection)
+        with context.begin_transaction():
+            context.run_migrations()
+
+if context.is_offline_mode():
+    run_migrations_offline()
+else:
+    run_migrations_online()
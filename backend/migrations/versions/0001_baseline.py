@@ -0,0 +1,132 @@
+"""baseline schema
+
+The tables as Base.metadata.create_all() used to build them at startup.
+Databases created that way are adopted with ``alembic stamp 0001``.
+
+Revision ID: 0001
+Revises:
+Create Date: 2026-10-18 09:00:00
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "0001"
+down_revision: Union[str, Sequence[str], None] = None
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+jenis_kelamin = ("Laki-laki", "Perempuan")
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table(
+        "kelas",
+        sa.Column("id_kelas", sa.Integer(), primary_key=True),
+        sa.Column("jurusan", sa.String(100), nullable=False),
+        sa.Column("kelas", sa.String(50), nullable=False),
+    )
+    op.create_index("ix_kelas_id_kelas", "kelas", ["id_kelas"])
+
+    op.create_table(
+        "mata_pelajaran",
+        sa.Column("id_mapel", sa.Integer(), primary_key=True),
+        sa.Column("nama_mapel", sa.String(100), nullable=False),
+        sa.Column("kategori", sa.Enum("Umum", "Kejuruan", name="kategori_mapel_enum")),
+    )
+    op.create_index("ix_mata_pelajaran_id_mapel", "mata_pelajaran", ["id_mapel"])
+
+    op.create_table(
+        "siswa",
+        sa.Column("id_siswa", sa.Integer(), primary_key=True),
+        sa.Column("id_kelas", sa.Integer(), sa.ForeignKey("kelas.id_kelas")),
+        sa.Column("nisn", sa.String(20)),
+        sa.Column("nama", sa.String(100), nullable=False),
+        sa.Column("jenis_kelamin", sa.Enum(*jenis_kelamin, name="jk_siswa_enum")),
+        sa.Column("alamat", sa.Text()),
+        sa.Column("no_hp", sa.String(15)),
+        sa.Column("tanggal_lahir", sa.Date()),
+    )
+    op.create_index("ix_siswa_id_siswa", "siswa", ["id_siswa"])
+    op.create_index("ix_siswa_nisn", "siswa", ["nisn"], unique=True)
+
+    op.create_table(
+        "guru",
+        sa.Column("id_guru", sa.Integer(), primary_key=True),
+        sa.Column("nip", sa.String(30)),
+        sa.Column("nama", sa.String(100), nullable=False),
+        sa.Column("jenis_kelamin", sa.Enum(*jenis_kelamin, name="jk_guru_enum"), nullable=False),
+        sa.Column("email", sa.String(100)),
+        sa.Column("no_hp", sa.String(15)),
+        sa.Column("id_kelas", sa.Integer(), sa.ForeignKey("kelas.id_kelas")),
+    )
+    op.create_index("ix_guru_id_guru", "guru", ["id_guru"])
+    op.create_index("ix_guru_nip", "guru", ["nip"], unique=True)
+    op.create_index("ix_guru_email", "guru", ["email"], unique=True)
+
+    op.create_table(
+        "mapel_diampu",
+        sa.Column("id_ampu", sa.Integer(), primary_key=True),
+        sa.Column("id_guru", sa.Integer(), sa.ForeignKey("guru.id_guru")),
+        sa.Column("id_kelas", sa.Integer(), sa.ForeignKey("kelas.id_kelas")),
+        sa.Column("id_mapel", sa.Integer(), sa.ForeignKey("mata_pelajaran.id_mapel")),
+    )
+    op.create_index("ix_mapel_diampu_id_ampu", "mapel_diampu", ["id_ampu"])
+
+    op.create_table(
+        "nilai",
+        sa.Column("id_nilai", sa.Integer(), primary_key=True),
+        sa.Column("id_siswa", sa.Integer(), sa.ForeignKey("siswa.id_siswa")),
+        sa.Column("id_mapel", sa.Integer(), sa.ForeignKey("mata_pelajaran.id_mapel")),
+        sa.Column("nilai_uts", sa.Integer()),
+        sa.Column("nilai_uas", sa.Integer()),
+        sa.Column("nilai_akhir", sa.Integer()),
+    )
+    op.create_index("ix_nilai_id_nilai", "nilai", ["id_nilai"])
+
+    op.create_table(
+        "absensi",
+        sa.Column("id_absensi", sa.Integer(), primary_key=True),
+        sa.Column("id_siswa", sa.Integer(), sa.ForeignKey("siswa.id_siswa")),
+        sa.Column("id_kelas", sa.Integer(), sa.ForeignKey("kelas.id_kelas")),
+        sa.Column("tanggal", sa.Date()),
+        sa.Column("status", sa.Enum("Hadir", "Izin", "Sakit", "Alpa", name="status_absensi_enum")),
+    )
+    op.create_index("ix_absensi_id_absensi", "absensi", ["id_absensi"])
+
+    op.create_table(
+        "pengguna",
+        sa.Column("id_user", sa.Integer(), primary_key=True),
+        sa.Column("id_guru", sa.Integer(), sa.ForeignKey("guru.id_guru"), unique=True, nullable=True),
+        sa.Column("id_siswa", sa.Integer(), sa.ForeignKey("siswa.id_siswa"), unique=True, nullable=True),
+        sa.Column("username", sa.String(50)),
+        sa.Column("password", sa.String(255), nullable=False),
+        sa.Column("role", sa.Enum("Admin", "Guru", "Siswa", name="role_enum"), nullable=False),
+    )
+    op.create_index("ix_pengguna_id_user", "pengguna", ["id_user"])
+    op.create_index("ix_pengguna_username", "pengguna", ["username"], unique=True)
+
+    op.create_table(
+        "berita",
+        sa.Column("id_berita", sa.Integer(), primary_key=True),
+        sa.Column("id_user", sa.Integer(), sa.ForeignKey("pengguna.id_user")),
+        sa.Column("judul", sa.String(150)),
+        sa.Column("isi", sa.Text()),
+        sa.Column("gambar", sa.String(255), nullable=True),
+        sa.Column("tanggal_post", sa.TIMESTAMP(), server_default=sa.func.now()),
+    )
+    op.create_index("ix_berita_id_berita", "berita", ["id_berita"])
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    for table in ("berita", "pengguna", "absensi", "nilai", "mapel_diampu", "guru", "siswa", "mata_pelajaran", "kelas"):
+        op.drop_table(table)
+    bind = op.get_bind()
+    for enum in ("role_enum", "status_absensi_enum", "jk_guru_enum", "jk_siswa_enum", "kategori_mapel_enum"):
+        sa.Enum(name=enum).drop(bind, checkfirst=True)
@@ -0,0 +1,65 @@
+"""token_version, upsert keys and ringkasan_siswa
+
+Schema the app grew since the baseline: the per-user token_version used to
+revoke JWTs, the unique keys the nilai/absensi ON CONFLICT upserts target,
+and the per-student dashboard summary table.
+
+Revision ID: 0002
+Revises: 0001
+Create Date: 2026-10-18 09:05:00
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "0002"
+down_revision: Union[str, Sequence[str], None] = "0001"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    with op.batch_alter_table("pengguna") as batch:
+        batch.add_column(sa.Column("token_version", sa.Integer(), nullable=False, server_default="0"))
+
+    # Rows written before the upsert keys existed may repeat; the newest one wins
+    op.execute(
+        "DELETE FROM nilai WHERE id_nilai NOT IN "
+        "(SELECT MAX(id_nilai) FROM nilai GROUP BY id_siswa, id_mapel)"
+    )
+    op.execute(
+        "DELETE FROM absensi WHERE id_absensi NOT IN "
+        "(SELECT MAX(id_absensi) FROM absensi GROUP BY id_siswa, tanggal)"
+    )
+    with op.batch_alter_table("nilai") as batch:
+        batch.create_unique_constraint("uq_nilai_siswa_mapel", ["id_siswa", "id_mapel"])
+    with op.batch_alter_table("absensi") as batch:
+        batch.create_unique_constraint("uq_absensi_siswa_tanggal", ["id_siswa", "tanggal"])
+
+    op.create_table(
+        "ringkasan_siswa",
+        sa.Column(
+            "id_siswa", sa.Integer(),
+            sa.ForeignKey("siswa.id_siswa", ondelete="CASCADE"), primary_key=True
+        ),
+        *(
+            sa.Column(name, sa.Integer(), nullable=False, server_default="0")
+            for name in ("jumlah_nilai", "total_nilai", "hadir", "izin", "sakit", "alpa")
+        ),
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_table("ringkasan_siswa")
+    with op.batch_alter_table("absensi") as batch:
+        batch.drop_constraint("uq_absensi_siswa_tanggal", type_="unique")
+    with op.batch_alter_table("nilai") as batch:
+        batch.drop_constraint("uq_nilai_siswa_mapel", type_="unique")
+    with op.batch_alter_table("pengguna") as batch:
+        batch.drop_column("token_version")
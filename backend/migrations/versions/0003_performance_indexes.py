@@ -0,0 +1,50 @@
+"""indexes for the hot read paths
+
+nilai(id_siswa, id_mapel) and absensi(id_siswa, tanggal) are already covered by
+the unique keys from 0002. On PostgreSQL the indexes are built CONCURRENTLY so
+absensi stays writable while they build. Plans are checked by
+``python check_indexes.py --explain``.
+
+Revision ID: 0003
+Revises: 0002
+Create Date: 2026-10-18 09:10:00
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "0003"
+down_revision: Union[str, Sequence[str], None] = "0002"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+INDEXES = (
+    # Class roster: dashboards, absensi per kelas, grade matrix, exports
+    ("ix_siswa_id_kelas", "siswa", ["id_kelas"]),
+    # Teaching assignments of the logged-in guru
+    ("ix_mapel_diampu_id_guru", "mapel_diampu", ["id_guru"]),
+    # Absensi of one class over a date range (INSERT .. SELECT, recap, export)
+    ("ix_absensi_kelas_tanggal", "absensi", ["id_kelas", "tanggal"]),
+    # Newest-first keyset pagination of the news feed
+    ("ix_berita_tanggal_post", "berita", [sa.text("tanggal_post DESC"), sa.text("id_berita DESC")]),
+)
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    concurrently = op.get_bind().dialect.name == "postgresql"
+    with op.get_context().autocommit_block():
+        for name, table, columns in INDEXES:
+            op.create_index(name, table, columns, postgresql_concurrently=concurrently, if_not_exists=True)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    concurrently = op.get_bind().dialect.name == "postgresql"
+    with op.get_context().autocommit_block():
+        for name, table, _ in reversed(INDEXES):
+            op.drop_index(name, table_name=table, postgresql_concurrently=concurrently, if_exists=True)
@@ -0,0 +1,71 @@
+"""full-text search over berita
+
+PostgreSQL gets a generated tsvector column (judul weighted A, isi B, Indonesian
+stemming) with a GIN index. SQLite gets an external-content FTS5 table kept in
+sync by triggers. Either way the database reindexes a berita on every write.
+
+Note: a later batch_alter_table("berita") on SQLite rebuilds the table and
+drops the triggers; recreate them in that migration.
+
+Revision ID: 0004
+Revises: 0003
+Create Date: 2026-10-18 10:00:00
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision: str = "0004"
+down_revision: Union[str, Sequence[str], None] = "0003"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+SEARCH_VECTOR = (
+    "setweight(to_tsvector('indonesian'::regconfig, coalesce(judul, '')), 'A') || "
+    "setweight(to_tsvector('indonesian'::regconfig, coalesce(isi, '')), 'B')"
+)
+
+SQLITE_UPGRADE = (
+    "CREATE VIRTUAL TABLE berita_fts USING fts5("
+    "judul, isi, content='berita', content_rowid='id_berita', "
+    "tokenize='unicode61 remove_diacritics 2')",
+    "CREATE TRIGGER berita_fts_ai AFTER INSERT ON berita BEGIN "
+    "INSERT INTO berita_fts(rowid, judul, isi) VALUES (new.id_berita, new.judul, new.isi); END",
+    "CREATE TRIGGER berita_fts_ad AFTER DELETE ON berita BEGIN "
+    "INSERT INTO berita_fts(berita_fts, rowid, judul, isi) VALUES ('delete', old.id_berita, old.judul, old.isi); END",
+    "CREATE TRIGGER berita_fts_au AFTER UPDATE OF judul, isi ON berita BEGIN "
+    "INSERT INTO berita_fts(berita_fts, rowid, judul, isi) VALUES ('delete', old.id_berita, old.judul, old.isi); "
+    "INSERT INTO berita_fts(rowid, judul, isi) VALUES (new.id_berita, new.judul, new.isi); END",
+    "INSERT INTO berita_fts(berita_fts) VALUES ('rebuild')",
+)
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    dialect = op.get_bind().dialect.name
+    if dialect == "postgresql":
+        op.add_column(
+            "berita",
+            sa.Column("search_vector", postgresql.TSVECTOR(), sa.Computed(SEARCH_VECTOR, persisted=True))
+        )
+        op.create_index("ix_berita_search_vector", "berita", ["search_vector"], postgresql_using="gin")
+    elif dialect == "sqlite":
+        for statement in SQLITE_UPGRADE:
+            op.execute(statement)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    dialect = op.get_bind().dialect.name
+    if dialect == "postgresql":
+        op.drop_index("ix_berita_search_vector", table_name="berita")
+        op.drop_column("berita", "search_vector")
+    elif dialect == "sqlite":
+        for trigger in ("berita_fts_au", "berita_fts_ad", "berita_fts_ai"):
+            op.execute(f"DROP TRIGGER IF EXISTS {trigger}")
+        op.execute("DROP TABLE IF EXISTS berita_fts")
@@ -0,0 +1,63 @@
+"""monthly attendance rollup
+
+rekap_absensi_bulanan holds Hadir/Izin/Sakit/Alpa per (bulan, id_kelas, id_siswa)
+for closed months; rekap_absensi_periode records which months are complete.
+Months are rolled up lazily on first use, so there is no backfill here.
+ix_absensi_tanggal serves the school-wide scan of the still-open month.
+
+Revision ID: 0005
+Revises: 0004
+Create Date: 2026-10-18 11:00:00
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "0005"
+down_revision: Union[str, Sequence[str], None] = "0004"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table(
+        "rekap_absensi_bulanan",
+        sa.Column("bulan", sa.Date(), primary_key=True),
+        sa.Column("id_kelas", sa.Integer(), sa.ForeignKey("kelas.id_kelas", ondelete="CASCADE"), primary_key=True),
+        sa.Column("id_siswa", sa.Integer(), sa.ForeignKey("siswa.id_siswa", ondelete="CASCADE"), primary_key=True),
+        *(
+            sa.Column(name, sa.Integer(), nullable=False, server_default="0")
+            for name in ("hadir", "izin", "sakit", "alpa")
+        ),
+    )
+    op.create_index("ix_rekap_absensi_bulanan_siswa", "rekap_absensi_bulanan", ["id_siswa", "bulan"])
+    op.create_table(
+        "rekap_absensi_periode",
+        sa.Column("bulan", sa.Date(), primary_key=True),
+        sa.Column("dibuat", sa.TIMESTAMP(), server_default=sa.func.now()),
+    )
+
+    concurrently = op.get_bind().dialect.name == "postgresql"
+    with op.get_context().autocommit_block():
+        op.create_index(
+            "ix_absensi_tanggal", "absensi", ["tanggal"],
+            postgresql_concurrently=concurrently, if_not_exists=True
+        )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    concurrently = op.get_bind().dialect.name == "postgresql"
+    with op.get_context().autocommit_block():
+        op.drop_index(
+            "ix_absensi_tanggal", table_name="absensi",
+            postgresql_concurrently=concurrently, if_exists=True
+        )
+    op.drop_table("rekap_absensi_periode")
+    op.drop_index("ix_rekap_absensi_bulanan_siswa", table_name="rekap_absensi_bulanan")
+    op.drop_table("rekap_absensi_bulanan")
@@ -0,0 +1,43 @@
+"""rapor job progress
+
+rapor_job keeps the progress of rapor ZIP downloads in the database, so the
+progress endpoint answers from any worker, not only the one streaming the ZIP.
+
+Revision ID: 0006
+Revises: 0005
+Create Date: 2026-10-18 16:00:00
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "0006"
+down_revision: Union[str, Sequence[str], None] = "0005"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table(
+        "rapor_job",
+        sa.Column("id_job", sa.String(length=32), primary_key=True),
+        sa.Column("id_kelas", sa.Integer(), sa.ForeignKey("kelas.id_kelas", ondelete="CASCADE"), nullable=False),
+        sa.Column("id_user", sa.Integer(), sa.ForeignKey("pengguna.id_user", ondelete="CASCADE"), nullable=False),
+        *(
+            sa.Column(name, sa.Integer(), nullable=False, server_default="0")
+            for name in ("total", "selesai", "gagal")
+        ),
+        sa.Column("status", sa.String(length=20), nullable=False, server_default="berjalan"),
+        sa.Column("mulai", sa.TIMESTAMP(), nullable=False),
+        sa.Column("berakhir", sa.TIMESTAMP(), nullable=True),
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_table("rapor_job")
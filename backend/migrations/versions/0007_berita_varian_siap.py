@@ -0,0 +1,46 @@
+"""berita.varian_siap
+
+Records that the resized variants of berita.gambar exist, so responses no longer
+stat the upload directory per row. Rows whose variants are already on disk are
+marked here; the image pool sets the flag for new uploads.
+
+Revision ID: 0007
+Revises: 0006
+Create Date: 2026-10-18 18:00:00
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+from app.services.images import variants_on_disk
+
+
+# revision identifiers, used by Alembic.
+revision: str = "0007"
+down_revision: Union[str, Sequence[str], None] = "0006"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Plain ADD COLUMN: a batch rebuild would drop the SQLite search triggers of 0004
+    op.add_column("berita", sa.Column("varian_siap", sa.Boolean(), nullable=False, server_default=sa.false()))
+
+    berita = sa.table("berita", sa.column("gambar", sa.String), sa.column("varian_siap", sa.Boolean))
+    bind = op.get_bind()
+    gambar = bind.execute(sa.select(berita.c.gambar).where(berita.c.gambar.is_not(None)).distinct()).scalars()
+    ready = [path for path in gambar if variants_on_disk(path)]
+    if ready:
+        bind.execute(sa.update(berita).where(berita.c.gambar.in_(ready)).values(varian_siap=True))
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    if op.get_bind().dialect.name == "sqlite":
+        # Native DROP COLUMN (SQLite 3.35+) keeps the search triggers, unlike a batch rebuild
+        op.execute("ALTER TABLE berita DROP COLUMN varian_siap")
+    else:
+        op.drop_column("berita", "varian_siap")
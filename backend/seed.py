@@ -1,18 +1,28 @@
+import argparse
+import bisect
+import csv
+import io
+import itertools
+import random
 import sys
 import os
+import time
+from datetime import date, datetime, timedelta
 
 # Get the absolute path of the 'backend' directory
 backend_dir = os.path.dirname(os.path.abspath(__file__))
 # Add it to sys.path so 'app' can be imported
 sys.path.insert(0, backend_dir)
 
-from app.database import SessionLocal, engine, Base
+from sqlalchemy import select
+from app.database import SessionLocal, engine
+from app.core import schema
 from app.models import models
 from app.core.security import get_password_hash
 
 def seed_data():
-    # Ensure tables are created first
-    Base.metadata.create_all(bind=engine)
+    # Bring the schema to the latest migration first
+    schema.upgrade()
     
     db = SessionLocal()
     try:
@@ -139,5 +149,301 @@ def seed_data():
     finally:
         db.close()
 
+# ---------------------------------------------------------------------------
+# Synthetic data generator: `python seed.py generate --help`
+#
+# Deterministic for a given --seed and size. Rows are streamed into the
+# database in batches: COPY FROM STDIN on PostgreSQL (psycopg2), raw DBAPI
+# executemany elsewhere. There is no school table, so --schools repeats the
+# class/teacher/student structure once per school.
+# ---------------------------------------------------------------------------
+
+DEFAULT_PASSWORD = "password123"
+BATCH_SIZE = 100000
+
+NAMA_LAKI = [
+    "Adi", "Aditya", "Agus", "Ahmad", "Akbar", "Andi", "Arif", "Bayu", "Budi", "Cecep", "Dadan", "Dani",
+    "Deden", "Dimas", "Dodi", "Eko", "Fajar", "Farhan", "Fauzan", "Gilang", "Hendra", "Ilham", "Iqbal",
+    "Irfan", "Jajang", "Kurniawan", "Muhammad", "Nanda", "Raka", "Rizky", "Ridwan", "Rudi", "Taufik",
+    "Teguh", "Ujang", "Wahyu", "Yoga", "Yusuf", "Zaki",
+]
+NAMA_PEREMPUAN = [
+    "Aisyah", "Anisa", "Ayu", "Cici", "Citra", "Dewi", "Dian", "Eka", "Euis", "Fitri", "Gita", "Indah",
+    "Intan", "Kartika", "Lestari", "Lia", "Maya", "Nabila", "Neng", "Nur", "Putri", "Rahma", "Rani",
+    "Ratna", "Rina", "Salsabila", "Sari", "Siti", "Sri", "Tia", "Wulan", "Yanti", "Yuli", "Zahra",
+]
+NAMA_BELAKANG = [
+    "Saputra", "Pratama", "Hidayat", "Nugraha", "Permana", "Gunawan", "Setiawan", "Kusuma", "Ramadhan",
+    "Firmansyah", "Hermawan", "Suryana", "Sopian", "Maulana", "Rahayu", "Lestari", "Handayani",
+    "Wulandari", "Nurhaliza", "Fauziah", "Sukmawati", "Kurniasih", "Purnama", "Wijaya", "Santoso",
+]
+JALAN = ["Jl. Raya Padalarang", "Jl. Kebon Kopi", "Jl. Cimareme", "Jl. Tagog", "Jl. Purabaya", "Jl. Cipatat", "Jl. Ciburuy", "Jl. Gadobangkong"]
+
+JURUSAN = ["PPLG", "TJKT", "DKV", "AKL", "MPLB", "TKRO"]
+TINGKAT = ["X", "XI", "XII"]
+MAPEL = [
+    ("Pendidikan Agama dan Budi Pekerti", "Umum"), ("Pendidikan Pancasila", "Umum"), ("Bahasa Indonesia", "Umum"),
+    ("Matematika", "Umum"), ("Bahasa Inggris", "Umum"), ("Sejarah", "Umum"), ("PJOK", "Umum"),
+    ("Seni Budaya", "Umum"), ("Informatika", "Umum"), ("Projek IPAS", "Umum"), ("Bahasa Sunda", "Umum"),
+    ("Dasar-dasar Program Keahlian", "Kejuruan"), ("Konsentrasi Keahlian", "Kejuruan"),
+    ("Projek Kreatif dan Kewirausahaan", "Kejuruan"), ("Praktik Kerja Lapangan", "Kejuruan"), ("Mata Pelajaran Pilihan", "Kejuruan"),
+]
+KEGIATAN = [
+    "Upacara Hari Pendidikan Nasional", "Lomba Kompetensi Siswa", "Kunjungan Industri", "Pentas Seni Akhir Tahun",
+    "Pelatihan Guru Kurikulum Merdeka", "Bakti Sosial OSIS", "Uji Kompetensi Keahlian", "Peringatan HUT RI",
+    "Job Fair Bursa Kerja Khusus", "Sosialisasi Anti Perundungan", "Class Meeting", "Pameran Karya P5",
+]
+KALIMAT = [
+    "Kegiatan ini diikuti oleh seluruh siswa dan guru dengan penuh antusias.",
+    "Kepala sekolah menyampaikan apresiasi kepada panitia yang telah bekerja keras.",
+    "Acara berlangsung tertib dan lancar sesuai jadwal yang telah ditentukan.",
+    "Diharapkan kegiatan serupa dapat terus dilaksanakan setiap tahun.",
+    "Para siswa menunjukkan kreativitas dan kemampuan terbaik mereka.",
+    "Sekolah bekerja sama dengan mitra industri di wilayah Bandung Barat.",
+    "Orang tua siswa turut hadir untuk memberikan dukungan.",
+]
+# Share of days with each status for an average student; individual students drift around it
+STATUS_ABSENSI = (("Hadir", 0.93), ("Izin", 0.025), ("Sakit", 0.03), ("Alpa", 0.015))
+
+class BulkLoader:
+    def __init__(self, db):
+        self.connection = db.connection()
+        self.dialect = self.connection.dialect
+        self.copy = self.dialect.name == "postgresql" and self.dialect.driver == "psycopg2"
+        self.placeholder = "?" if self.dialect.paramstyle == "qmark" else "%s"
+
+    def load(self, model, columns, rows) -> int:
+        table = model.__table__.name
+        total = 0
+        batch = []
+        for row in rows:
+            batch.append(row)
+            if len(batch) >= BATCH_SIZE:
+                total += self._flush(table, columns, batch)
+                batch = []
+        if batch:
+            total += self._flush(table, columns, batch)
+        return total
+
+    def _flush(self, table, columns, batch) -> int:
+        cursor = self.connection.connection.cursor()
+        try:
+            if self.copy:
+                buffer = io.StringIO()
+                csv.writer(buffer).writerows(batch)
+                buffer.seek(0)
+                cursor.copy_expert(f"COPY {table} ({', '.join(columns)}) FROM STDIN WITH (FORMAT csv)", buffer)
+            else:
+                values = ", ".join([self.placeholder] * len(columns))
+                cursor.executemany(f"INSERT INTO {table} ({', '.join(columns)}) VALUES ({values})", batch)
+        finally:
+            cursor.close()
+        return len(batch)
+
+    def ids(self, column) -> list:
+        return list(self.connection.execute(select(column).order_by(column)).scalars())
+
+def _nama(rng, jenis_kelamin):
+    depan = rng.choice(NAMA_LAKI if jenis_kelamin == "Laki-laki" else NAMA_PEREMPUAN)
+    if rng.random() < 0.3:
+        depan = f"{depan} {rng.choice(NAMA_LAKI if jenis_kelamin == 'Laki-laki' else NAMA_PEREMPUAN)}"
+    return f"{depan} {rng.choice(NAMA_BELAKANG)}"
+
+def _no_hp(rng):
+    return "08" + rng.choice(["12", "13", "21", "22", "52", "57", "77", "78", "81", "95", "96"]) + "".join(rng.choices("0123456789", k=rng.randint(7, 9)))
+
+def _nip(rng, index, jenis_kelamin):
+    # PNS NIP: birth date (8) + appointment year/month (6) + gender (1) + sequence (3)
+    lahir = date(1965, 1, 1) + timedelta(days=rng.randint(0, 365 * 32))
+    angkat = max(lahir.year + 23, 1990) + rng.randint(0, 8)
+    gender = "1" if jenis_kelamin == "Laki-laki" else "2"
+    return f"{lahir:%Y%m%d}{min(angkat, 2024)}{rng.randint(1, 12):02d}{gender}{index % 1000:03d}"
+
+def _school_days(start: date, days: int):
+    current = start
+    while days > 0:
+        if current.weekday() < 5:
+            yield current
+            days -= 1
+        current += timedelta(days=1)
+
+def _clip(value, low=0, high=100):
+    return max(low, min(high, int(round(value))))
+
+# Fixed so the same seed always yields the same dataset (a Monday at the start of a school year)
+DEFAULT_START = date(2025, 7, 14)
+
+def generate(schools=1, classes=36, students=36, mapel=16, days=180, berita=200, seed=42, start=DEFAULT_START, log=print) -> dict:
+    rng = random.Random(seed)
+    schema.upgrade()
+    db = SessionLocal()
+    counts = {}
+    started = time.perf_counter()
+
+    def step(name, n):
+        counts[name] = n
+        log(f"  {name:<13} {n:>10,} rows  ({time.perf_counter() - started:.1f}s)")
+
+    try:
+        if db.scalar(select(models.Siswa.id_siswa).limit(1)) is not None:
+            raise RuntimeError("Database already has siswa rows; use --reset or an empty database")
+        loader = BulkLoader(db)
+
+        # Kelas: tingkat x jurusan x rombel, per school
+        kelas_rows = []
+        for school in range(schools):
+            for i in range(classes):
+                tingkat = TINGKAT[i % len(TINGKAT)]
+                jurusan = JURUSAN[(i // len(TINGKAT)) % len(JURUSAN)]
+                rombel = i // (len(TINGKAT) * len(JURUSAN)) + 1
+                suffix = f" S{school + 1}" if schools > 1 else ""
+                kelas_rows.append((jurusan, f"{tingkat}-{jurusan}-{rombel}{suffix}"))
+        step("kelas", loader.load(models.Kelas, ["jurusan", "kelas"], kelas_rows))
+        kelas_ids = loader.ids(models.Kelas.id_kelas)
+
+        mapel_rows = [MAPEL[i] if i < len(MAPEL) else (f"Mata Pelajaran Pilihan {i - len(MAPEL) + 1}", "Kejuruan") for i in range(mapel)]
+        step("mata_pelajaran", loader.load(models.MataPelajaran, ["nama_mapel", "kategori"], mapel_rows))
+        mapel_ids = loader.ids(models.MataPelajaran.id_mapel)
+
+        # A guru teaches one mapel to up to 6 classes of their school. Each class gets exactly one
+        # wali kelas: the first of its own teachers not already wali elsewhere, or an extra
+        # homeroom-only guru when a small school has fewer teachers than classes.
+        per_guru = 6
+        guru_rows, assignments, wali = [], [], {}
+
+        def add_guru():
+            guru_index = len(guru_rows)
+            jenis_kelamin = rng.choice(["Laki-laki", "Perempuan"])
+            nama = _nama(rng, jenis_kelamin)
+            guru_rows.append((
+                _nip(rng, guru_index, jenis_kelamin), nama, jenis_kelamin,
+                f"{nama.split()[0].lower()}.{guru_index}@smkn4padalarang.sch.id", _no_hp(rng)
+            ))
+            return guru_index
+
+        for school in range(schools):
+            school_kelas = kelas_ids[school * classes:(school + 1) * classes]
+            teachers = {id_kelas: [] for id_kelas in school_kelas}
+            for id_mapel in mapel_ids:
+                for chunk in range(0, len(school_kelas), per_guru):
+                    guru_index = add_guru()
+                    for id_kelas in school_kelas[chunk:chunk + per_guru]:
+                        assignments.append((guru_index, id_kelas, id_mapel))
+                        teachers[id_kelas].append(guru_index)
+            for id_kelas in school_kelas:
+                guru_index = next((g for g in teachers[id_kelas] if g not in wali), None)
+                if guru_index is None:
+                    guru_index = add_guru()
+                wali[guru_index] = id_kelas
+        guru_rows = [row + (wali.get(guru_index),) for guru_index, row in enumerate(guru_rows)]
+        step("guru", loader.load(models.Guru, ["nip", "nama", "jenis_kelamin", "email", "no_hp", "id_kelas"], guru_rows))
+        guru_ids = loader.ids(models.Guru.id_guru)
+        step("mapel_diampu", loader.load(
+            models.MapelDiampu, ["id_guru", "id_kelas", "id_mapel"],
+            ((guru_ids[g], id_kelas, id_mapel) for g, id_kelas, id_mapel in assignments)
+        ))
+
+        # NISN: last three digits of the birth year + 7-digit sequence
+        siswa_rows = []
+        for index in range(len(kelas_ids) * students):
+            id_kelas = kelas_ids[index // students]
+            tingkat = TINGKAT.index(kelas_rows[index // students][1].split("-")[0])
+            tahun_lahir = start.year - 15 - tingkat
+            jenis_kelamin = rng.choice(["Laki-laki", "Perempuan"])
+            siswa_rows.append((
+                f"{tahun_lahir % 1000:03d}{index + 1:07d}", _nama(rng, jenis_kelamin), jenis_kelamin, id_kelas,
+                f"{rng.choice(JALAN)} No. {rng.randint(1, 250)}", _no_hp(rng),
+                date(tahun_lahir, 1, 1) + timedelta(days=rng.randint(0, 364))
+            ))
+        step("siswa", loader.load(models.Siswa, ["nisn", "nama", "jenis_kelamin", "id_kelas", "alamat", "no_hp", "tanggal_lahir"], siswa_rows))
+        siswa = list(zip(loader.ids(models.Siswa.id_siswa), (row[3] for row in siswa_rows)))
+        del siswa_rows
+
+        # Grades: per-student ability, per-mapel difficulty, UTS/UAS noise around both
+        ability = {id_siswa: rng.gauss(78, 7) for id_siswa, _ in siswa}
+        difficulty = {id_mapel: rng.gauss(0, 4) for id_mapel in mapel_ids}
+
+        def nilai_rows():
+            for id_siswa, _ in siswa:
+                for id_mapel in mapel_ids:
+                    mean = ability[id_siswa] + difficulty[id_mapel]
+                    uts, uas = _clip(rng.gauss(mean, 6), 30), _clip(rng.gauss(mean, 7), 30)
+                    yield (id_siswa, id_mapel, uts, uas, (uts + uas) // 2)
+        step("nilai", loader.load(models.Nilai, ["id_siswa", "id_mapel", "nilai_uts", "nilai_uas", "nilai_akhir"], nilai_rows()))
+
+        # Attendance: each student's absence rate drifts around the school-wide mix
+        statuses = [status for status, _ in STATUS_ABSENSI]
+        base = [share for _, share in STATUS_ABSENSI]
+        weights = {}
+        for id_siswa, _ in siswa:
+            absence = max(0.0, rng.gauss(1 - base[0], 0.03))
+            weights[id_siswa] = list(itertools.accumulate(
+                [1 - absence] + [share / (1 - base[0]) * absence for share in base[1:]]
+            ))
+
+        def absensi_rows():
+            random_ = rng.random
+            for tanggal in _school_days(start, days):
+                for id_siswa, id_kelas in siswa:
+                    cum_weights = weights[id_siswa]
+                    status = statuses[bisect.bisect(cum_weights, random_() * cum_weights[-1])]
+                    yield (id_siswa, id_kelas, tanggal, status)
+        step("absensi", loader.load(models.Absensi, ["id_siswa", "id_kelas", "tanggal", "status"], absensi_rows()))
+
+        password = get_password_hash(DEFAULT_PASSWORD)
+        step("pengguna", loader.load(
+            models.Pengguna, ["username", "password", "role", "id_guru", "id_siswa"],
+            [("admin", password, "Admin", None, None), ("guru1", password, "Guru", guru_ids[0], None), ("siswa1", password, "Siswa", None, siswa[0][0])]
+        ))
+        admin_id = loader.ids(models.Pengguna.id_user)[0]
+
+        # Spread over the calendar span of the attendance period
+        posted = datetime.combine(start, datetime.min.time()) + timedelta(hours=7)
+        span = max(1, days * 7 // 5)
+        step("berita", loader.load(
+            models.Berita, ["id_user", "judul", "isi", "tanggal_post"],
+            (
+                (admin_id, f"{rng.choice(KEGIATAN)} di SMKN 4 Padalarang",
+                 "\n\n".join(" ".join(rng.choices(KALIMAT, k=rng.randint(3, 6))) for _ in range(rng.randint(2, 5))),
+                 posted + timedelta(days=span * i // berita, minutes=rng.randint(0, 600)))
+                for i in range(berita)
+            )
+        ))
+        db.commit()
+    finally:
+        db.close()
+
+    counts["seconds"] = round(time.perf_counter() - started, 1)
+    counts["seed"] = seed
+    return counts
+
+def main():
+    parser = argparse.ArgumentParser(description="Seed the database")
+    subparsers = parser.add_subparsers(dest="command")
+    gen = subparsers.add_parser("generate", help="Generate a synthetic school dataset of a given size")
+    gen.add_argument("--schools", type=int, default=1)
+    gen.add_argument("--classes", type=int, default=36, help="Classes per school")
+    gen.add_argument("--students", type=int, default=36, help="Students per class")
+    gen.add_argument("--mapel", type=int, default=16)
+    gen.add_argument("--days", type=int, default=180, help="School days of absensi")
+    gen.add_argument("--berita", type=int, default=200)
+    gen.add_argument("--seed", type=int, default=42)
+    gen.add_argument("--start", type=date.fromisoformat, default=DEFAULT_START, help=f"First attendance day, YYYY-MM-DD (default: {DEFAULT_START})")
+    gen.add_argument("--reset", action="store_true", help="Drop and recreate all tables first")
+    args = parser.parse_args()
+
+    if args.command != "generate":
+        seed_data()
+        return
+
+    if args.reset:
+        schema.drop_all()
+    print(f"Generating into {engine.url.render_as_string(hide_password=True)}")
+    try:
+        counts = generate(args.schools, args.classes, args.students, args.mapel, args.days, args.berita, args.seed, args.start)
+    except RuntimeError as exc:
+        raise SystemExit(str(exc))
+    print(f"Done in {counts['seconds']}s. Login with admin / guru1 / siswa1, password {DEFAULT_PASSWORD}")
+
 if __name__ == "__main__":
-    seed_data()
+    main()
@@ -0,0 +1,6 @@
+import os
+import sys
+
+# The services import app.database, which builds its engines at import time
+os.environ.setdefault("DATABASE_URL", "sqlite://")
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
@@ -0,0 +1,65 @@
+from datetime import date
+from app.services.attendance_recap import month_start, next_month, split_range
+
+TODAY = date(2026, 10, 18)
+
+def test_month_helpers():
+    assert month_start(date(2026, 2, 17)) == date(2026, 2, 1)
+    assert next_month(date(2026, 1, 31)) == date(2026, 2, 1)
+    assert next_month(date(2025, 12, 1)) == date(2026, 1, 1)
+
+def test_full_months_come_from_rollup():
+    months, segments = split_range(date(2026, 1, 1), date(2026, 3, 31), TODAY)
+    assert months == [date(2026, 1, 1), date(2026, 2, 1), date(2026, 3, 1)]
+    assert segments == []
+
+def test_partial_edge_months_are_live():
+    months, segments = split_range(date(2026, 1, 15), date(2026, 4, 10), TODAY)
+    assert months == [date(2026, 2, 1), date(2026, 3, 1)]
+    assert segments == [
+        (date(2026, 1, 15), date(2026, 1, 31), date(2026, 1, 1)),
+        (date(2026, 4, 1), date(2026, 4, 10), date(2026, 4, 1)),
+    ]
+
+def test_range_ending_on_last_day_closes_that_month():
+    months, segments = split_range(date(2026, 2, 1), date(2026, 2, 28), TODAY)
+    assert months == [date(2026, 2, 1)]
+    assert segments == []
+
+def test_range_within_one_month():
+    months, segments = split_range(date(2026, 5, 3), date(2026, 5, 20), TODAY)
+    assert months == []
+    assert segments == [(date(2026, 5, 3), date(2026, 5, 20), date(2026, 5, 1))]
+
+def test_year_boundary():
+    months, segments = split_range(date(2025, 12, 20), date(2026, 1, 31), TODAY)
+    assert months == [date(2026, 1, 1)]
+    assert segments == [(date(2025, 12, 20), date(2025, 12, 31), date(2025, 12, 1))]
+
+def test_open_month_is_never_rolled_up():
+    months, segments = split_range(date(2026, 9, 1), date(2026, 10, 31), TODAY)
+    assert months == [date(2026, 9, 1)]
+    assert segments == [(date(2026, 10, 1), date(2026, 10, 31), date(2026, 10, 1))]
+
+def test_range_inside_open_month():
+    months, segments = split_range(date(2026, 10, 1), date(2026, 10, 18), TODAY)
+    assert months == []
+    assert segments == [(date(2026, 10, 1), date(2026, 10, 18), date(2026, 10, 1))]
+
+def test_range_past_open_month():
+    months, segments = split_range(date(2026, 8, 10), date(2026, 12, 5), TODAY)
+    assert months == [date(2026, 9, 1)]
+    assert segments == [
+        (date(2026, 8, 10), date(2026, 8, 31), date(2026, 8, 1)),
+        (date(2026, 10, 1), date(2026, 10, 31), date(2026, 10, 1)),
+        (date(2026, 11, 1), date(2026, 11, 30), date(2026, 11, 1)),
+        (date(2026, 12, 1), date(2026, 12, 5), date(2026, 12, 1)),
+    ]
+
+def test_segments_cover_every_day_once():
+    for mulai, selesai in [(date(2025, 7, 14), date(2026, 10, 18)), (date(2026, 2, 28), date(2026, 3, 1))]:
+        months, segments = split_range(mulai, selesai, TODAY)
+        days = sum((next_month(bulan) - bulan).days for bulan in months)
+        days += sum((end - start).days + 1 for start, end, _ in segments)
+        assert days == (selesai - mulai).days + 1
+        assert all(start.month == end.month and bulan == month_start(start) for start, end, bulan in segments)
@@ -0,0 +1,69 @@
+import numpy as np
+from app.services.grade_statistics import _percentile_ranks, _ranks, compute_grade_statistics
+
+NAN = np.nan
+
+def test_ranks_competition_ties():
+    scores = np.array([90.0, 85.0, 90.0, 70.0, 85.0])
+    groups = np.zeros(5, dtype=np.int64)
+    assert _ranks(scores, groups).tolist() == [1, 3, 1, 5, 3]
+
+def test_ranks_within_groups():
+    scores = np.array([80.0, 95.0, 80.0, 60.0, 95.0, 70.0])
+    groups = np.array([2, 1, 1, 2, 2, 1])
+    assert _ranks(scores, groups).tolist() == [2, 1, 2, 3, 1, 3]
+
+def test_ranks_nan_is_unranked_and_does_not_shift_others():
+    scores = np.array([NAN, 75.0, 90.0, NAN, 75.0])
+    groups = np.zeros(5, dtype=np.int64)
+    assert _ranks(scores, groups).tolist() == [0, 2, 1, 0, 2]
+
+def test_ranks_all_nan():
+    assert _ranks(np.array([NAN, NAN]), np.zeros(2, dtype=np.int64)).tolist() == [0, 0]
+
+def test_ranks_empty():
+    assert _ranks(np.empty(0), np.empty(0, dtype=np.int64)).tolist() == []
+
+def test_percentile_ranks_ties_count_half():
+    percentile = _percentile_ranks(np.array([60.0, 80.0, 80.0, 100.0]))
+    assert percentile.tolist() == [12.5, 50.0, 50.0, 87.5]
+
+def test_percentile_ranks_ignore_nan():
+    percentile = _percentile_ranks(np.array([NAN, 50.0, 70.0]))
+    assert np.isnan(percentile[0])
+    assert percentile[1:].tolist() == [25.0, 75.0]
+
+def test_percentile_ranks_all_nan():
+    assert np.isnan(_percentile_ranks(np.array([NAN, NAN]))).all()
+
+def test_compute_grade_statistics():
+    # (id_siswa, nisn, nama, id_kelas, id_mapel, nama_mapel, nilai_akhir)
+    rows = [
+        (1, "001", "Ani", 10, 1, "Matematika", 90),
+        (1, "001", "Ani", 10, 2, "Bahasa", 80),
+        (2, "002", "Budi", 10, 1, "Matematika", 85),
+        (2, "002", "Budi", 10, 2, "Bahasa", 85),
+        (3, "003", "Citra", 11, 1, "Matematika", 100),
+        (3, "003", "Citra", 11, 2, "Bahasa", None),
+        (4, "004", "Dedi", 11, None, None, None),
+    ]
+    stats = compute_grade_statistics(rows)
+    assert stats["jumlah_siswa"] == 4
+
+    siswa = {item["nama"]: item for item in stats["siswa"]}
+    assert [item["nama"] for item in stats["siswa"]] == ["Citra", "Ani", "Budi", "Dedi"]
+    assert (siswa["Ani"]["peringkat"], siswa["Budi"]["peringkat"]) == (2, 2)
+    assert (siswa["Ani"]["peringkat_kelas"], siswa["Citra"]["peringkat_kelas"]) == (1, 1)
+    assert siswa["Citra"]["jumlah_mapel"] == 1
+    assert siswa["Dedi"]["rata_rata"] is None
+    assert siswa["Dedi"]["peringkat"] is None and siswa["Dedi"]["persentil"] is None
+
+    mapel = {item["nama_mapel"]: item for item in stats["mapel"]}
+    assert mapel["Matematika"]["jumlah"] == 3
+    assert mapel["Matematika"]["median"] == 90
+    assert mapel["Bahasa"]["rata_rata"] == 82.5
+    assert sum(mapel["Bahasa"]["histogram"]) == 2
+    assert mapel["Matematika"]["histogram"][-1] == 2
+
+def test_compute_grade_statistics_empty():
+    assert compute_grade_statistics([])["siswa"] == []
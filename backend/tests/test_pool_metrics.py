@@ -0,0 +1,41 @@
+from sqlalchemy import create_engine, text
+from app.core.pool_metrics import InstrumentedQueuePool, PoolMonitor, current_request, current_route
+
+def _engine(tmp_path):
+    return create_engine(f"sqlite:///{tmp_path / 'pool.db'}", poolclass=InstrumentedQueuePool, pool_size=2, max_overflow=1)
+
+def test_monitor_survives_dispose(tmp_path):
+    engine = _engine(tmp_path)
+    monitor = PoolMonitor("test")
+    monitor.attach(engine)
+    with engine.connect() as connection:
+        connection.execute(text("SELECT 1"))
+    old_pool = engine.pool
+
+    engine.dispose()
+    assert engine.pool is not old_pool
+    with engine.connect() as connection:
+        connection.execute(text("SELECT 1"))
+        # Gauges come from the live pool, not the one dispose() discarded
+        assert monitor.snapshot()["checked_out"] == 1
+    assert monitor.snapshot()["checkouts"] == 2
+    engine.dispose()
+
+def test_hold_labels_use_route_template(tmp_path):
+    engine = _engine(tmp_path)
+    monitor = PoolMonitor("test")
+    monitor.attach(engine)
+
+    class Route:
+        path_format = "/{id_siswa}"
+
+    token = current_request.set({"method": "GET", "path": "/api/siswa/42", "route": Route()})
+    try:
+        assert current_route() == "GET /api/siswa/{id_siswa}"
+        with engine.connect() as connection:
+            connection.execute(text("SELECT 1"))
+    finally:
+        current_request.reset(token)
+    assert current_route() == "-"
+    assert list(monitor.snapshot()["hold_by_route"]) == ["GET /api/siswa/{id_siswa}"]
+    engine.dispose()
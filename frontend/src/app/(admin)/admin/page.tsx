@@ -121,7 +121,7 @@ export default function AdminDashboard() {
     }),
   );
 
-  const COLORS = ["#3b82f6", "#f97316"];
+  const COLORS = ["#3b82f6", "#f97316", "#94a3b8"];
 
   return (
     <DashboardLayout role="Admin">